@@ -0,0 +1,65 @@
+"""
+Test obciążeniowy algorytmów na bardzo długich i głęboko zagnieżdżonych formułach.
+
+Uruchomienie: PYTHONPATH=src python benchmarks/deep_formulas.py
+Żaden z mierzonych algorytmów nie powinien wymagać zmiany `sys.setrecursionlimit`.
+"""
+from __future__ import annotations
+
+import sys
+from time import perf_counter
+from typing import Callable
+
+from venice_turpentine.core.formula import Formula
+from venice_turpentine.core.token import Token
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+
+SIZES = (10_000, 30_000, 100_000)
+
+
+def to_formula(types: list[str]) -> Formula:
+    return Formula([Token.literal(i) for i in types], DebugFormalSystem())
+
+
+def negation_chain(n: int) -> Formula:
+    """neg neg ... neg a"""
+    return to_formula((n - 1) * ["neg"] + ["a"])
+
+
+def nested_brackets(n: int) -> Formula:
+    """( ( ... ( a and b ) ... ) and b )"""
+    depth = (n - 3) // 4
+    return to_formula(depth * ["("] + ["a"] + depth * ["and", "b", ")"])
+
+
+def right_nested(n: int) -> Formula:
+    """a imp ( a imp ( ... ) )"""
+    depth = (n - 1) // 4
+    return to_formula(depth * ["a", "imp", "("] + ["a"] + depth * [")"])
+
+
+def measure(name: str, formula: Formula, operation: Callable[[Formula], object]) -> None:
+    """Mierzy operację na świeżej kopii formuły, bez zapamiętanych wyników"""
+    formula = formula.copy()
+    formula.precedenceBaked = formula.bracketsBaked = formula.treeBaked = None
+    start = perf_counter()
+    operation(formula)
+    print(f"    {name:<22} {perf_counter() - start:8.4f} s")
+
+
+def main() -> None:
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    for size in SIZES:
+        for generator in (negation_chain, nested_brackets, right_nested):
+            formula = generator(size)
+            print(f"{generator.__name__} ({len(formula)} tokens, depth {max(formula.brackets().depth)})")
+            measure("precedence", formula, Formula.precedence)
+            measure("getMainConnective", formula, Formula.getMainConnective)
+            measure("tree", formula, Formula.tree)
+            measure("getComponents", formula, Formula.getComponents)
+            measure("removeMainUnary", formula, Formula.removeMainUnary)
+            measure("view.removeMainUnary", formula, lambda f: f.freeze().view().removeMainUnary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Test obciążeniowy przepisanych na iteracje funkcji z old_app na bardzo głębokich drzewach dowodu.
+
+Uruchomienie (moduły brakujące w old_app zastępuje old_tests/fixtures): python benchmarks/deep_proofs.py
+Żadna z mierzonych funkcji nie powinna wymagać zmiany `sys.setrecursionlimit`.
+Budowa łańcucha węzłów nie jest mierzona - anytree przy każdym dołączeniu sprawdza cykle po całej ścieżce,
+więc jest kwadratowa i ogranicza rozmiary testu.
+"""
+import os
+import sys
+from time import perf_counter
+
+sys.path.extend([os.path.abspath(os.path.join(os.path.dirname(__file__), i)) for i in ['../old_app/appdata', '../old_app/appdata/plugins/Formal', '../old_app/core', '../old_tests/fixtures', '../src']])
+from sentence import Sentence
+from tree import PrintedProofNode, ProofNode
+import plugins.Formal.__utils__ as formal_utils
+import plugins.Output.debug as debug
+import plugins.Output.TeX_forest as TeX_forest
+import plugins.Output.TeX_infer as TeX_infer
+
+SIZES = (1_000, 5_000, 10_000)
+
+
+class CollectingSentence(list):
+
+    def generate(self, type_):
+        return type_
+
+
+def proof_chain(n):
+    root = node = ProofNode(Sentence(['sentvar_p'], None), 'Green')
+    for i in range(n):
+        node = ProofNode(Sentence(['not_not', 'sentvar_p'], None), 'Green', i+1, parent=node)
+    return root
+
+
+def printed_chain(n):
+    node = PrintedProofNode(Sentence(['sentvar_p'], None), None, None)
+    for _ in range(n):
+        node = PrintedProofNode(Sentence(['not_not', 'sentvar_p'], None), (node,), '')
+    return node
+
+
+def measure(name, operation, *args):
+    start = perf_counter()
+    operation(*args)
+    print(f"    {name:<22} {perf_counter() - start:8.4f} s")
+
+
+def main():
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    for size in SIZES:
+        print(f"depth {size}")
+        proof, printed = proof_chain(size), printed_chain(size)
+        measure("ProofNode.gettree", proof.gettree)
+        measure("ProofNode.pop", proof.pop, size // 2)
+        measure("TeX_forest.write_tree", TeX_forest.write_tree, printed)
+        measure("TeX_infer.write_tree", TeX_infer.write_tree, printed)
+        measure("debug.get_nodes", debug.get_nodes, printed.sentence, printed.children)
+        measure("_into_sentence", formal_utils._into_sentence, CollectingSentence(), size*[1]+[0], {1: ['not']}, ['p'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Koszt walidacji zdania po edycji: `IncrementalFormula.edit` wobec ponownej tokenizacji i analizy całego zdania.
+
+Uruchomienie: PYTHONPATH=src python benchmarks/incremental.py
+Dla zdań różnej długości w środku zdania wpisywana jest negacja, a następnie usuwana (dwie edycje na pomiar).
+"""
+from __future__ import annotations
+
+from time import perf_counter
+
+from venice_turpentine.core.formula import Formula
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+from venice_turpentine.lexers.incremental import IncrementalFormula
+from venice_turpentine.lexers.wrapper import Lexicon
+
+SIZES = (100, 1000, 10000, 50000)
+EDITS = 200
+
+
+def lexicon() -> Lexicon:
+    lex = Lexicon()
+    lex["neg"] = "~"
+    lex["and"] = "&"
+    lex["or"] = r"\|"
+    lex["imp"] = "->"
+    lex["sentvar"] = r"[p-z]\d*"
+    return lex
+
+
+def full(lexer, system, text: str) -> None:
+    formula = Formula(lexer.tokenize(text), system)
+    formula.checkSyntax()
+    formula.getMainConnective()
+
+
+def main() -> None:
+    lexer = lexicon().compile(backend="re")
+    system = DebugFormalSystem()
+    print(f"{'tokens':>8} {'full':>12} {'incremental':>12}")
+    for size in SIZES:
+        text = " & ".join(f"(p{i} -> ~q{i})" for i in range(size // 7))
+        middle = text.index("(", len(text) // 2)
+        live = IncrementalFormula(lexer, system, text)
+
+        start = perf_counter()
+        for _ in range(EDITS):
+            full(lexer, system, text[:middle] + "~" + text[middle:])
+            full(lexer, system, text)
+        whole = (perf_counter() - start) / (2 * EDITS)
+
+        start = perf_counter()
+        for _ in range(EDITS):
+            live.edit(middle, middle, "~")
+            live.edit(middle, middle + 1, "")
+        incremental = (perf_counter() - start) / (2 * EDITS)
+        print(f"{len(live):>8} {whole * 1e3:>10.3f}ms {incremental * 1e3:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
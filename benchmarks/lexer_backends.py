@@ -0,0 +1,62 @@
+"""
+Porównanie silników tokenizacji "ply" i "re" (`Lexicon.compile(backend=...)`).
+
+Uruchomienie: PYTHONPATH=src python benchmarks/lexer_backends.py
+Czas uruchomienia jest mierzony w osobnym procesie (import pakietu i kompilacja leksera),
+bez pamięci podręcznej na dysku oraz z nią.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+
+from venice_turpentine.exceptions import LexiconError
+from venice_turpentine.lexers import BasicLex
+
+CORPUS = Path(__file__).parents[1] / "old_tests" / "tautologies_20_5-1.txt"
+REPEAT = 20
+CONSTRAINTS = {"use_language": ("propositional", "uses negation")}
+
+STARTUP = """
+from time import perf_counter
+start = perf_counter()
+from venice_turpentine.lexers import BasicLex
+imported = perf_counter()
+BasicLex.compile(backend={backend!r}, **{constraints!r}).tokenize("p and q")
+print(imported - start, perf_counter() - imported)
+"""
+
+
+def startup(backend: str, cache: str) -> str:
+    """Czas importu pakietu oraz kompilacji leksera (z importem silnika) w nowym procesie"""
+    env = {**os.environ, "VENICE_TURPENTINE_CACHE": cache}
+    code = STARTUP.format(backend=backend, constraints=CONSTRAINTS)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    imported, compiled = map(float, output.stdout.split())
+    return f"import {imported:8.4f} s, compile {compiled:8.4f} s"
+
+
+def main() -> None:
+    lines = CORPUS.read_text(encoding="utf-8").splitlines() * REPEAT
+    print(f"{len(lines)} formulas")
+    for backend in ("ply", "re"):
+        lexer = BasicLex.compile(backend=backend, **CONSTRAINTS)
+        tokens = sum(len(i) for _, i in lexer.tokenize_many(lines) if not isinstance(i, LexiconError))
+        start = perf_counter()
+        deque(lexer.tokenize_many(lines), maxlen=0)
+        elapsed = perf_counter() - start
+        print(f"  {backend}")
+        print(f"    throughput           {tokens / elapsed:12,.0f} tokens/s")
+        with tempfile.TemporaryDirectory() as cache:
+            print(f"    startup, no cache    {startup(backend, '')}")
+            startup(backend, cache)
+            print(f"    startup, disk cache  {startup(backend, cache)}")
+
+
+if __name__ == "__main__":
+    main()
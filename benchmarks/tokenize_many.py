@@ -0,0 +1,51 @@
+"""
+Porównanie przepustowości `BuiltLexer.tokenize_many` z wywoływaniem `tokenize` w pętli, dla każdego silnika.
+
+Uruchomienie: PYTHONPATH=src python benchmarks/tokenize_many.py
+Korpusem jest plik tautologii z old_tests, powielony `REPEAT` razy.
+"""
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+from venice_turpentine.exceptions import LexiconError
+from venice_turpentine.lexers import BasicLex
+
+CORPUS = Path(__file__).parents[1] / "old_tests" / "tautologies_20_5-1.txt"
+REPEAT = 20
+
+
+def tokenize_loop(lexer, lines: list[str]) -> None:
+    for line in lines:
+        try:
+            lexer.tokenize(line)
+        except LexiconError:
+            pass
+
+
+def tokenize_many(lexer, lines: list[str]) -> None:
+    deque(lexer.tokenize_many(lines), maxlen=0)
+
+
+def measure(name: str, operation: Callable[[], None], tokens: int) -> None:
+    start = perf_counter()
+    operation()
+    elapsed = perf_counter() - start
+    print(f"    {name:<16} {elapsed:8.4f} s  {tokens / elapsed:12,.0f} tokens/s")
+
+
+def main() -> None:
+    lines = CORPUS.read_text(encoding="utf-8").splitlines() * REPEAT
+    for backend in ("ply", "re", "longest"):
+        lexer = BasicLex.compile(backend=backend, use_language=("propositional", "uses negation"))
+        tokens = sum(len(i) for _, i in lexer.tokenize_many(lines) if not isinstance(i, LexiconError))
+        print(f"{backend}: {len(lines)} formulas, {tokens} tokens")
+        measure("tokenize loop", lambda: tokenize_loop(lexer, lines), tokens)
+        measure("tokenize_many", lambda: tokenize_many(lexer, lines), tokens)
+
+
+if __name__ == "__main__":
+    main()
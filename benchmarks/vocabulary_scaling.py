@@ -0,0 +1,53 @@
+"""
+Przepustowość tokenizacji w zależności od liczby leksemów słownika, dla każdego silnika (`scanners.SCANNERS`).
+
+Uruchomienie: PYTHONPATH=src python benchmarks/vocabulary_scaling.py
+Słownik zawiera spójniki z `BasicLex` oraz `n` losowych nazw predykatów; tekst to ciąg koniunkcji tych nazw.
+Pamięć podręczna na dysku jest wyłączona, więc czas kompilacji obejmuje budowę wyrażeń.
+"""
+from __future__ import annotations
+
+import os
+import random
+import string
+from time import perf_counter
+
+os.environ["VENICE_TURPENTINE_CACHE"] = ""
+
+from venice_turpentine.lexers.wrapper import Lexicon  # noqa: E402
+
+SIZES = (10, 100, 1000, 5000, 20000)
+BACKENDS = ("ply", "re", "longest")
+TOKENS = 20000
+
+
+def lexicon(size: int, rng: random.Random) -> tuple[Lexicon, list[str]]:
+    names: set[str] = set()
+    while len(names) < size:
+        names.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    lex = Lexicon()
+    lex["and"] = "oraz", "and", r"\^", "&"
+    lex["or"] = "lub", "or", r"\|"
+    lex["not"] = "not", "~", r"\!"
+    lex["predicate"] = sorted(names)
+    return lex, sorted(names)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'lexems':>8} {'backend':>8} {'compile':>10} {'tokens/s':>12}")
+    for size in SIZES:
+        lex, names = lexicon(size, rng)
+        text = " & ".join(rng.choices(names, k=TOKENS // 2))
+        for backend in BACKENDS:
+            start = perf_counter()
+            lexer = lex.compile(backend=backend)
+            compiled = perf_counter() - start
+            start = perf_counter()
+            tokens = len(lexer.tokenize(text))
+            elapsed = perf_counter() - start
+            print(f"{size:>8} {backend:>8} {compiled:>9.3f}s {tokens / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -502,23 +502,26 @@ def into_sentence(prefix: list[int], conn_dict: dict[int, tp.Iterable[str]], var
     return s
     
 def _into_sentence(s: Sentence, prefix: list[int], conn_dict: dict[int, tp.Iterable[str]], variables: list[str]):
-    l = prefix[0]
-    if l == 0:
-        s.append(rchoice(variables))
-    else:
-        possible_main = conn_dict[l]
-        main = s.generate(rchoice(possible_main))
-        if l == 2:
-            # INFIX
-            s.append('(')
-            _into_sentence(s, prefix[1:], conn_dict, variables)
-            s.append(main)
-            _into_sentence(s, prefix[1:], conn_dict, variables)
-            s.append(')')
+    # Jawny stos zamiast rekurencji; elementy to pozycja w prefiksie (int) lub token do dopisania (str)
+    stack: list[tp.Union[int, str]] = [0]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            s.append(item)
+            continue
+        l = prefix[item]
+        if l == 0:
+            s.append(rchoice(variables))
         else:
-            s.append(main)
-            for _ in range(l):
-                _into_sentence(s, prefix[1:], conn_dict, variables)
+            possible_main = conn_dict[l]
+            main = s.generate(rchoice(possible_main))
+            if l == 2:
+                # INFIX
+                s.append('(')
+                stack.extend((')', item+1, main, item+1))
+            else:
+                s.append(main)
+                stack.extend(l*[item+1])
             
 def generate_wff(sess, length: int, conn_dict: dict[int, tp.Iterable[str]], var_amount: int, var_type: str):
     prefix = generate_tree(length, conn_dict.keys())
@@ -117,22 +117,30 @@ def propagate_rule(proof: Proof, rule: Rule, containers: dict[str, list[utils.Si
 
 def _solver(proof: Proof, rule: Rule, containers: dict[str, list[utils.SignedSentence]], check_closure: Callable) -> bool:
     """ 
-    Rekurencyjna funkcja solvera, zwraca informację, czy dowód udało się ukończyć (powinna być zawsze True)
+    Funkcja solvera przeszukująca drzewo reguł w głąb, zwraca informację, czy dowód udało się ukończyć (powinna być zawsze True)
+    Zamiast rekurencji używa jawnego stosu ramek, więc liczba warstw reguł nie jest ograniczona limitem rekurencji.
     Używać solver zamiast tej.
     """
-    start_used = proof.metadata['usedrules'][:]
-    start_layer = start_used[-1].layer if start_used else 0
-
-    while any(len(containers[i.name]) > 0 for i in rule.path):
-        for past_rule in rule.path:
-            containers = propagate_rule(proof, past_rule, containers, check_closure)
-        if proof.nodes.is_closed():
-            return True
-
-    for child in rule.children:
-        if _solver(proof, child, containers, check_closure):
-            return True
-
-    proof.metadata['usedrules'] = start_used
-    proof.nodes.pop(start_layer+1)
-    return False
+    # Ramka: (pozostałe reguły potomne, kontenery po propagacji, stan do przywrócenia, warstwa startowa)
+    stack = []
+    while True:
+        start_used = proof.metadata['usedrules'][:]
+        start_layer = start_used[-1].layer if start_used else 0
+
+        while any(len(containers[i.name]) > 0 for i in rule.path):
+            for past_rule in rule.path:
+                containers = propagate_rule(proof, past_rule, containers, check_closure)
+            if proof.nodes.is_closed():
+                return True
+
+        stack.append((iter(rule.children), containers, start_used, start_layer))
+        while stack:
+            children, containers, start_used, start_layer = stack[-1]
+            rule = next(children, None)
+            if rule is not None:
+                break
+            stack.pop()
+            proof.metadata['usedrules'] = start_used
+            proof.nodes.pop(start_layer+1)
+        else:
+            return False
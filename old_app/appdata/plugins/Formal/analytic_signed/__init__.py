@@ -12,6 +12,7 @@ from analytic_freedom.syntax_check import reduce_, find_all
 from proof import Proof
 from rule import SentenceID, SentenceTupleStructure, TokenID
 from sentence import Sentence
+from tree import Branch
 from usedrule import UsedRule
 
 SOCKET = 'Formal'
@@ -217,14 +218,18 @@ def solver(proof: Proof) -> bool:
     return s
 
 
-def check_closure(branch: list[Sentence], used: History) -> tp.Union[None, tuple[utils.close.Close, str]]:
-    """Sprawdza możliwość zamknięcia gałęzi, zwraca obiekty zamknięcia oraz komunikat do wyświetlenia"""
-    for num1, statement_1 in enumerate(branch):
-        for num2, statement_2 in enumerate(branch[num1+1:]):
-            if statement_1[1:] == statement_2[1:] and statement_1[0] != statement_2[0]:
-                return utils.close.Contradiction(sentenceID1=num1+1, sentenceID2=num2+1), "Sentences contradict. The branch was closed."
+def literal_key(sentence: Sentence) -> tuple[tuple[str], bool, bool]:
+    """Rozkład zdania dla indeksu zamknięć w drzewie: formuła bez znaku, znak (True dla fałszu) oraz informacja, czy formuła jest atomowa"""
+    return tuple(sentence[1:]), sentence[0].startswith('signfalse'), len(sentence) == 2
 
-    if all(i in used or len(i)==2 for i in branch):
+
+def check_closure(branch: Branch, used: History) -> tp.Union[None, tuple[utils.close.Close, str]]:
+    """Sprawdza możliwość zamknięcia gałęzi, zwraca obiekty zamknięcia oraz komunikat do wyświetlenia. Korzysta z indeksu liścia zbudowanego przez `literal_key`, więc nie przegląda gałęzi"""
+    if branch.index.contradiction:
+        first, second = branch.index.contradiction
+        return utils.close.Contradiction(sentenceID1=first+1, sentenceID2=second+1), "Sentences contradict. The branch was closed."
+
+    if not branch.pending:
         return utils.close.Emptiness, "Nothing else to be done, branch was closed."
     return None
 
@@ -50,10 +50,22 @@ def write_tree(tree: utils.PrintedProofNode) -> list[str]:
     return [style, r'\begin{forest}', 'smullyan tableaux', _write_tree(tree.sentence, tree.children, tree.closer), r'\end{forest}']
 
 def _write_tree(sentence, children, close) -> str:
-    if children is not None:
-        return "[%s\n%s]" % (get_readable(sentence), "\n".join((_write_tree(i.sentence, i.children, i.closer) for i in children)))
-
-    if close:
-        return "[%s [%s]]" % (get_readable(sentence), close.replace('XXX', '\\times').replace(',', '{,}'))
-    else:
-        return "[%s]" % (get_readable(sentence))
+    # Jawny stos zamiast rekurencji; `written` przechowuje gotowe zapisy poddrzew
+    written = []
+    stack = [(sentence, children, close, None)]
+    while stack:
+        sentence, children, close, count = stack.pop()
+        if children is None:
+            if close:
+                written.append("[%s [%s]]" % (get_readable(sentence), close.replace('XXX', '\\times').replace(',', '{,}')))
+            else:
+                written.append("[%s]" % (get_readable(sentence)))
+        elif count is None:
+            children = tuple(children)
+            stack.append((sentence, children, close, len(children)))
+            stack.extend((i.sentence, i.children, i.closer, None) for i in reversed(children))
+        else:
+            parts = written[len(written)-count:]
+            del written[len(written)-count:]
+            written.append("[%s\n%s]" % (get_readable(sentence), "\n".join(parts)))
+    return written[0]
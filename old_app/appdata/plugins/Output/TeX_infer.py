@@ -52,7 +52,19 @@ def _gen_infer(s1, s2):
     return "\\infer{%s}{%s}" % (s1, s2)
 
 def _write_tree(sentence, children) -> str:
-    if children is None:
-        return _gen_infer(get_readable(sentence), "")
-    else:
-        return _gen_infer(get_readable(sentence), " & ".join((_write_tree(i.sentence, i.children) for i in children)))
+    # Jawny stos zamiast rekurencji; `written` przechowuje gotowe zapisy poddrzew
+    written = []
+    stack = [(sentence, children, None)]
+    while stack:
+        sentence, children, count = stack.pop()
+        if children is None:
+            written.append(_gen_infer(get_readable(sentence), ""))
+        elif count is None:
+            children = tuple(children)
+            stack.append((sentence, children, len(children)))
+            stack.extend((i.sentence, i.children, None) for i in reversed(children))
+        else:
+            parts = written[len(written)-count:]
+            del written[len(written)-count:]
+            written.append(_gen_infer(get_readable(sentence), " & ".join(parts)))
+    return written[0]
@@ -62,5 +62,17 @@ def get_nodes(sentence: list[str], children: list[utils.PrintedProofNode]) -> li
     :return: Lista dzieci do dodania do węzła
     :rtype: list[Node]
     """
-    ch = sum((get_nodes(child.sentence, child.children) for child in children), []) if children else []
-    return [Node(get_readable(sentence), children=ch)]
\ No newline at end of file
+    # Jawny stos zamiast rekurencji; `built` przechowuje gotowe węzły poddrzew
+    built = []
+    stack = [(sentence, children, None)]
+    while stack:
+        sentence, children, count = stack.pop()
+        if count is None:
+            children = tuple(children) if children else ()
+            stack.append((sentence, children, len(children)))
+            stack.extend((i.sentence, i.children, None) for i in reversed(children))
+        else:
+            ch = built[len(built)-count:]
+            del built[len(built)-count:]
+            built.append(Node(get_readable(sentence), children=ch))
+    return built
\ No newline at end of file
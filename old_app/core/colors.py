@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from heapq import heappush
 from typing import Iterable
 from random import Random
 
@@ -24,6 +25,47 @@ def get_branch_name(accessibility: int, used: Iterable[str]) -> Iterable[str]:
             yield i
 
 
+class BranchNames(object):
+    """
+    Przydziela nazwy gałęzi w kolejności `get_branch_name` bez przeglądania wszystkich używanych nazw.
+    Nazwy przed kursorem są zajęte lub trafiły na listę zwolnionych (kopiec pozycji), więc kolejne wolne nazwy leżą na kopcu albo tuż za kursorem.
+    """
+
+    def __init__(self, accessibility: int, used: Iterable[str] = ()) -> None:
+        self.accessibility = accessibility
+        self.order = list(get_branch_name(accessibility, ()))
+        self.rank = {name: num for num, name in enumerate(self.order)}
+        self.used = set()
+        self.free = []
+        self.cursor = 0
+        for i in used:
+            self.use(i)
+
+    def use(self, name: str) -> None:
+        """Oznacza nazwę jako zajętą"""
+        self.used.add(name)
+        while self.cursor < len(self.order) and self.order[self.cursor] in self.used:
+            self.cursor += 1
+
+    def release(self, name: str) -> None:
+        """Zwalnia nazwę, pozwalając na jej ponowne użycie"""
+        self.used.discard(name)
+        if self.rank.get(name, len(self.order)) < self.cursor:
+            heappush(self.free, self.rank[name])
+
+    def peek(self, amount: int) -> list[str]:
+        """Zwraca `amount` pierwszych wolnych nazw (lub mniej, jeśli nazwy się skończą) bez ich zajmowania"""
+        # Zwolnione nazwy mogły zostać ponownie zajęte; posortowana lista jest poprawnym kopcem
+        self.free = sorted({i for i in self.free if self.order[i] not in self.used})
+        names = [self.order[i] for i in self.free[:amount]]
+        num = self.cursor
+        while len(names) < amount and num < len(self.order):
+            if self.order[num] not in self.used:
+                names.append(self.order[num])
+            num += 1
+        return names[:amount]
+
+
 DEFAULT_COLOR = Color("Czarna", "#000000", True, 1)
 
 COLORS = {
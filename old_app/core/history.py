@@ -1,4 +1,6 @@
-from typing import Any, Callable, Union, Iterable
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Iterator, Union, Iterable
 from sentence import Sentence
 from constants import DEBUG
 def _f():
@@ -6,39 +8,71 @@ def _f():
 
 function = type(_f)
 
-class History(set):
-    """Zbiór reprezentujący historię"""
-    
+
+class Interner(dict):
+    """Słownik nadający kolejnym kluczom kolejne identyfikatory; `keys` pozwala na odwrotne wyszukiwanie"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.keys = []
+
+    def __missing__(self, key: Hashable) -> int:
+        self.keys.append(key)
+        value = self[key] = len(self.keys) - 1
+        return value
+
+
+class History(object):
+    """
+    Zbiór reprezentujący historię.
+    Wartości zdań są internowane w obrębie dowodu (`interner`), a historia przechowuje je jako bity liczby całkowitej. Liczba ta jest niezmienna, więc kopia historii współdzieli ją z oryginałem, a zmiana tworzy nową liczbę tylko dla zmienianej historii.
+    """
+
     OPS = {
         'pass':     0,
         'clear':    -1
     }
 
-    def __init__(self, iterable: Iterable[Any] = {}) -> None:
-        """Zbiór reprezentujący historię"""
-        super().__init__(iterable)
+    def __init__(self, iterable: Iterable[Any] = (), interner: Interner = None) -> None:
+        """Zbiór reprezentujący historię; `iterable` zawiera wartości zwracane przez `History.key`"""
+        self.interner = Interner() if interner is None else interner
+        self.bits = 0
+        for i in iterable:
+            self.bits |= 1 << self.interner[i]
+
+    @staticmethod
+    def key(element: Sentence) -> Any:
+        """Zwraca wartość, pod którą zdanie jest przechowywane w historii"""
+        if DEBUG:
+            return tuple(element.getUnique())
+        else:
+            return hash(element)
 
     def add_sentence(self, element: Sentence) -> None:
         """Dodaje zdanie `element` do zbioru, o ile już w nim nie jest. Konkretniej dodaje wartość hash zdania."""
         if not isinstance(element, Sentence):
             raise TypeError("History can only store sentences")
+        self.bits |= 1 << self.interner[self.key(element)]
 
-        if DEBUG:
-            return super().add(tuple(element.getUnique()))
-        else:
-            return super().add(hash(element))
+    def has_key(self, key: Any) -> bool:
+        """Sprawdza obecność wartości zwróconej przez `History.key`"""
+        num = self.interner.get(key)
+        return num is not None and bool(self.bits >> num & 1)
+
+    def clear(self) -> None:
+        self.bits = 0
 
     def __call__(self, *coms: tuple[Union[list, Sentence, int, Callable]]) -> None:
         """ Używane do manipulacji historią
 
             Możliwe argumenty:
-                - `Sentence`    - dodaje formułę do historii 
-                - `Callable`    - wykonuje operacje `callable(history)` na obiekcie historii, a wynik nadpisuje jako nową historię; traktuj ją jako `set`
+                - `Sentence`    - dodaje formułę do historii
+                - `Callable`    - wykonuje operacje `callable(history)` na kopii historii w postaci `set` kluczy (jak `History.key`), a wynik nadpisuje jako nową historię
                 - `int`         - wykonuje jedną z predefiniowanych operacji:
                     -  0 - operacja pusta
                     - -1 - czyszczenie historii
 
-            :raises TypeError: Typ nie jest obsługiwany 
+            :raises TypeError: Typ nie jest obsługiwany
         """
         for num, command in enumerate(coms):
             if isinstance(command, Sentence):
@@ -46,7 +80,7 @@ class History(set):
             elif isinstance(command, list):
                 self.add_sentence(Sentence(command))
             elif isinstance(command, function):
-                self = History(command(self))
+                self.bits = History(command(set(self)), self.interner).bits
             elif isinstance(command, int):
                 if command == -1:  # Clear set
                     self.clear()
@@ -55,14 +89,34 @@ class History(set):
             else:
                 raise TypeError(f"Historia nie przyjmuje typu {type(command).__name__} (komenda {num+1}.)")
 
+    def __iter__(self) -> Iterator[Any]:
+        """Zwraca wartości zdań w historii (jak `History.key`)"""
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield self.interner.keys[low.bit_length() - 1]
+            bits ^= low
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, History) and other.interner is self.interner:
+            return self.bits == other.bits
+        if isinstance(other, (History, set, frozenset)):
+            return set(self) == set(other)
+        return NotImplemented
+
+    __hash__ = None
+
     def __repr__(self) -> str:
-        return super().__repr__()
+        return f"History({set(self)!r})"
 
     def __contains__(self, item: Sentence) -> bool:
-        if DEBUG:
-            return super().__contains__(tuple(item.getUnique()))
-        
-        return super().__contains__(hash(item))
+        return self.has_key(self.key(item))
 
-    def copy(self):
-        return History(super().copy())
\ No newline at end of file
+    def copy(self) -> History:
+        """Zwraca kopię historii; kopia współdzieli bity, więc nie zależy od rozmiaru historii"""
+        new = History(interner=self.interner)
+        new.bits = self.bits
+        return new
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import typing as tp
+
+from history import History, Interner
+from sentence import Sentence
+
+# Rozkład zdania dostarczany przez plugin Formal: klucz formuły bez znaku, znak (True dla fałszu) oraz informacja, czy formuła jest atomowa
+LiteralKey = tp.Callable[[Sentence], tuple[tp.Hashable, bool, bool]]
+
+
+class Literals(object):
+    """Dane indeksu wspólne dla całego dowodu"""
+
+    def __init__(self, literal_key: LiteralKey, sentences: Interner) -> None:
+        self.literal_key = literal_key
+        self.formulas = Interner()  # Formuły bez znaku
+        self.sentences = sentences  # Klucze historii (`History.key`), wspólne z historiami węzłów
+
+
+class LiteralIndex(object):
+    """
+    Niezmienny indeks zdań gałęzi, dziedziczony przez węzły potomne.
+    Formuły są internowane w obrębie dowodu, a gałąź przechowuje je jako bity liczb całkowitych, więc dodanie zdania i wykrycie pary sprzecznych formuł nie zależy od długości gałęzi:
+        - `signs`       - bit `2*id+znak` oznacza formułę `id` o danym znaku
+        - `compound`    - bit `id` oznacza nieatomowe zdanie o kluczu historii `id`, co pozwala porównywać gałąź z bitami `History`
+    """
+    __slots__ = ('shared', 'signs', 'compound', 'own', 'closing', 'contradiction')
+
+    def __init__(self, literal_key: LiteralKey = None, sentences: Interner = None) -> None:
+        """Pusty indeks; bez funkcji `literal_key` indeks niczego nie zapamiętuje. `sentences` powinien być słownikiem internującym historii dowodu"""
+        self.shared = Literals(literal_key, Interner() if sentences is None else sentences) if literal_key else None
+        self.signs = 0
+        self.compound = 0
+        self.own = None             # Bit zdania, które rozszerzyło indeks
+        self.closing = False        # Czy to zdanie domknęło pierwszą parę sprzeczną
+        self.contradiction = None   # Pozycje pierwszej pary sprzecznej w gałęzi (uzupełnia węzeł)
+
+    def extend(self, sentence: Sentence) -> LiteralIndex:
+        """Zwraca indeks gałęzi przedłużonej o `sentence`"""
+        new = object.__new__(LiteralIndex)
+        new.shared = self.shared
+        new.signs, new.compound, new.own = self.signs, self.compound, None
+        new.closing, new.contradiction = False, self.contradiction
+        if self.shared is None:
+            return new
+
+        key, sign, atomic = self.shared.literal_key(sentence)
+        new.own = 2*self.shared.formulas[key] + sign
+        new.signs |= 1 << new.own
+        new.closing = self.contradiction is None and bool(self.signs >> (new.own ^ 1) & 1)
+        if not atomic:
+            new.compound |= 1 << self.shared.sentences[History.key(sentence)]
+        return new
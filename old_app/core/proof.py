@@ -22,8 +22,9 @@ class Proof(object):
         self.S = sentence.S # Session
         self.config = config or self.S.get_config()
         self.sentence = sentence
-        to_prove = self.S.acc('Formal').prepare_for_proving(sentence)
-        self.nodes = ProofNode(to_prove, next(get_branch_name(self.config['accessibility'], [])))
+        FormalSystem = self.S.acc('Formal')
+        to_prove = FormalSystem.prepare_for_proving(sentence)
+        self.nodes = ProofNode(to_prove, next(get_branch_name(self.config['accessibility'], [])), literal_key=getattr(FormalSystem, 'literal_key', None))
         self.metadata = dict(
             usedrules = [],
             decision_points = [],
@@ -46,22 +47,23 @@ class Proof(object):
 
     def deal_closure_func(self, func: Callable[[list[Sentence], History], Union[None, tuple[Close, str]]], branch_name: str) -> tuple[Close, str]:
         """Wywołuje proces sprawdzenia zamykalności gałęzi oraz (jeśli można) zamyka ją; Zwraca informacje o zamknięciu"""
+        leaf = self.nodes.getleaf(branch_name)
         try:
-            branch, _ = self.nodes.getleaf(branch_name).getbranch_sentences()
+            branch, _ = leaf.getbranch_sentences()
         except ValueError as e:
             if e.message == 'not enough values to unpack (expected 2, got 1)':
                 raise EngineError(
                     "Proof too short to check for contradictions")
             else:
                 raise e
-        used = self.nodes.getleaf(branch_name).gethistory()
+        used = leaf.gethistory()
         
         # Branch checking
         out = func(branch, used)
 
         if out:
             closure, info = out
-            self.nodes.getleaf(branch_name).close(closure)
+            leaf.close(closure)
             return closure, f"{branch_name}: {info}"
         else:
             return None, None
@@ -136,7 +138,7 @@ class Proof(object):
     
     def get_histories(self) -> dict[str, History]:
         """Zwraca historie wszystkich gałęzi"""
-        leaves = self.nodes.leaves
+        leaves = self.nodes.getleaves()
         return {leaf.branch:leaf.gethistory() for leaf in leaves}       
     
     
@@ -146,7 +148,7 @@ class Proof(object):
             assert len(self.nodes.getbranchnames()) == 1
             return self.nodes.getbranchnames()
         max_layer = self.metadata['usedrules'][-1].layer
-        return [i.branch for i in self.nodes.leaves if i.layer==max_layer]
+        return [i.branch for i in self.nodes.getleaves() if i.layer==max_layer]
     
     
     def copy(self) -> _Proof:
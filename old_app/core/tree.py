@@ -8,15 +8,108 @@ from collections import namedtuple
 from anytree import NodeMixin, util
 
 from close import *
-from colors import get_branch_name
+from colors import BranchNames
 from sentence import Sentence
 from history import *
+from literals import LiteralIndex, LiteralKey
 
 PrintedProofNode = namedtuple('PrintedProofNode', ('sentence', 'children', 'closer'))
 
 SentenceTupleStructure = tp.NewType('SentenceTupleStructure', tuple[tuple[Sentence]])
 HistoryTupleStructure = tp.NewType('HistoryTupleStructure', tuple[tuple[tp.Union[Sentence, int, tp.Callable]]])
 
+class Branch(list):
+    """Lista zdań gałęzi uzupełniona o indeks jej liścia (`index`) oraz liczbę nieatomowych zdań, których nie ma w historii liścia (`pending`)"""
+
+    def __init__(self, sentences: tp.Iterable[Sentence], index: LiteralIndex, pending: int) -> None:
+        super().__init__(sentences)
+        self.index = index
+        self.pending = pending
+
+
+class LeafIndex(object):
+    """
+    Wspólny dla całego drzewa indeks liści. Przechowuje liście w kolejności drzewa, słownik nazwa -> liść, zbiór otwartych liści, liczniki zamkniętych liści i najwyższą warstwę.
+    Aktualizowany przy dołączaniu węzła i zamykaniu gałęzi, a po usunięciu warstw (`ProofNode.pop`) budowany od nowa. Nazwy liści muszą być unikalne.
+    """
+
+    def __init__(self) -> None:
+        self.order = []
+        self.by_name = {}
+        self.open = set()
+        self.closed = 0
+        self.successful = 0
+        self.layer = 0
+        self.names = None
+
+    def attach(self, node: ProofNode) -> None:
+        """Rejestruje świeżo dołączony do drzewa węzeł `node`, który jest ostatnim dzieckiem swojego rodzica"""
+        parent = node.parent
+        if parent is None:
+            self.order.append(node)
+        elif len(parent.children) == 1:
+            self.order[self.order.index(parent)] = node
+            self._remove(parent)
+        else:
+            left = parent.children[-2]
+            while left.children:
+                left = left.children[-1]
+            self.order.insert(self.order.index(left)+1, node)
+        self._add(node)
+
+    def update(self, node: ProofNode, previous: Close) -> None:
+        """Uwzględnia zmianę zamknięcia liścia `node` z `previous`"""
+        self._count(previous, -1)
+        self._count(node.closed, 1)
+        if node.closed:
+            self.open.discard(node)
+        else:
+            self.open.add(node)
+
+    def rebuild(self, root: ProofNode) -> None:
+        """Buduje indeks od nowa na podstawie drzewa o korzeniu `root`"""
+        names = self.names
+        self.__init__()
+        # Jawny stos zamiast rekurencyjnego `PreOrderIter`, aby obsłużyć dowolnie głębokie drzewa
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            self.layer = max(self.layer, node.layer)
+            if node.is_leaf:
+                self.order.append(node)
+                self._add(node)
+            else:
+                stack.extend(reversed(node.children))
+        if names is not None:
+            self.names = BranchNames(names.accessibility, self.by_name)
+
+    def getnames(self, accessibility: int) -> BranchNames:
+        """Zwraca alokator nazw gałęzi dla danego poziomu dostępności"""
+        if self.names is None or self.names.accessibility != accessibility:
+            self.names = BranchNames(accessibility, self.by_name)
+        return self.names
+
+    def _add(self, node: ProofNode) -> None:
+        self.by_name[node.branch] = node
+        self.layer = max(self.layer, node.layer)
+        self.update(node, None)
+        if self.names is not None:
+            self.names.use(node.branch)
+
+    def _remove(self, node: ProofNode) -> None:
+        self._count(node.closed, -1)
+        self.open.discard(node)
+        if self.by_name.get(node.branch) is node:
+            del self.by_name[node.branch]
+            if self.names is not None:
+                self.names.release(node.branch)
+
+    def _count(self, closed: Close, sign: int) -> None:
+        if closed:
+            self.closed += sign
+            self.successful += sign*(closed.success is True)
+
+
 class ProofNodeError(Exception):
     def __init__(self, msg: str, *args, **kwargs):
         super().__init__(msg, *args, **kwargs)
@@ -26,14 +119,16 @@ class ProofBase(object):
     """Klasa macierzysta dla ProofNode implementująca wszystkie czysto dowodowe elementy"""
 
 
-    def __init__(self, sentence: Sentence, branch: str, layer: int = 0, history: History = None) -> None:
-        """Używaj ProofNode"""
+    def __init__(self, sentence: Sentence, branch: str, layer: int = 0, history: History = None, index: LiteralIndex = None, literal_key: LiteralKey = None) -> None:
+        """Używaj ProofNode; `index` opisuje gałąź kończącą się na poprzedniku, a `literal_key` służy do utworzenia indeksu dla korzenia"""
         super().__init__()
         self.sentence = sentence if isinstance(sentence, Sentence) else Sentence(sentence)
         self.branch = branch
         self.closed = None
         self.history = History() if history is None else history.copy()
         self.layer = layer
+        index = index or LiteralIndex(literal_key, self.history.interner)
+        self.index = index.extend(self.sentence)
 
     def close(self, close: Close = None, text: str = None, success: bool = None) -> None:
         """Zamyka gałąź używając obiektu `Close`, lub tekstu do wyświetlania użytkownikowi oraz informacje, czy można uznać to zamknięcie za sukces (dla przykładu: sprzeczność w tabeli analitycznej jest sukcesem, próba zapobiegnięcia pętli już nie)"""
@@ -47,7 +142,7 @@ class ProofBase(object):
 
     def gethistory(self) -> History:
         """
-        Zwraca hashowane wartości zdań znajdujących się w historii (w formie `History` - podklasy zbioru). Hashowaną wartość można uzyskać z `hash(Sentence)`.
+        Zwraca hashowane wartości zdań znajdujących się w historii (w formie `History`, po której można iterować jak po zbiorze). Hashowaną wartość można uzyskać z `History.key(Sentence)`.
         """
         return self.history.copy()
 
@@ -64,14 +159,23 @@ class ProofBase(object):
 
             :raises TypeError: Typ nie jest obsługiwany 
         """
-        self.history(*commands)
+        # Historia może być współdzielona z innymi węzłami, więc zmiany trafiają do kopii
+        history = self.history.copy()
+        history(*commands)
+        self.history = history
+
+
+    @property
+    def pending(self) -> int:
+        """Liczba nieatomowych zdań gałęzi, których nie ma w historii węzła"""
+        return (self.index.compound & ~self.history.bits).bit_count()
 
 
 
 class ProofNode(ProofBase, NodeMixin):
     """Reprezentacja pojedynczego zdania w drzewie"""
 
-    def __init__(self, sentence: Sentence, branch_name: str, layer: int = 0, history: History = None, parent: ProofNode = None, children: tp.Iterable[ProofNode] = []):
+    def __init__(self, sentence: Sentence, branch_name: str, layer: int = 0, history: History = None, parent: ProofNode = None, children: tp.Iterable[ProofNode] = [], literal_key: LiteralKey = None):
         """Reprezentacja pojedynczego zdania w drzewie
 
         :param sentence: Opisywane zdanie
@@ -86,10 +190,23 @@ class ProofNode(ProofBase, NodeMixin):
         :type parent: ProofNode, optional
         :param children: następniki węzłu w drzewie, defaults to []
         :type children: tp.Iterable[ProofNode], optional
+        :param literal_key: funkcja rozkładająca zdania na potrzeby indeksu zamknięć (`Formal.literal_key`), podawana tylko dla korzenia, defaults to None
+        :type literal_key: LiteralKey, optional
         """
-        super().__init__(sentence=sentence, branch=branch_name, layer=layer, history=history)
+        if parent is None:
+            super().__init__(sentence=sentence, branch=branch_name, layer=layer, history=history, literal_key=literal_key)
+        else:
+            # Cały dowód korzysta z jednego słownika internującego, co pozwala porównywać bity historii i indeksu
+            history = history or History(interner=parent.history.interner)
+            super().__init__(sentence=sentence, branch=branch_name, layer=layer, history=history, index=parent.index)
         self.parent = parent or None
         self.children = children
+        self.leaf_index = parent.leaf_index if parent else LeafIndex()
+        self.leaf_index.attach(self)
+        if self.index.closing:
+            complement = self.index.own ^ 1
+            first = next(i for i in self.path if i.index.own == complement)
+            self.index.contradiction = (first.depth, self.depth)
 
 
     def __repr__(self) -> str:
@@ -98,23 +215,30 @@ class ProofNode(ProofBase, NodeMixin):
 
     def gen_name(self, accessibility: int, am=2) -> tuple[str]:
         """Zwraca `am` nazw dla gałęzi z czego pierwsza jest nazwą aktualnej"""
-        names = []
-        for i in get_branch_name(accessibility, self.getbranchnames()):
-            if len(names) >= am-1:
-                break
-            names.append(i)
-        return self.branch, *names
+        return self.branch, *self.leaf_index.getnames(accessibility).peek(am-1)
     
     
+    def close(self, close: Close = None, text: str = None, success: bool = None) -> None:
+        """Zamyka gałąź (zob. `ProofBase.close`) i uwzględnia to w indeksie liści"""
+        previous = self.closed
+        super().close(close, text, success)
+        self.leaf_index.update(self, previous)
+
+
     # Static
     
     @staticmethod
     def insert_history(used_extention: HistoryTupleStructure, children: Iterable[ProofNode]):
         assert len(children) == len(used_extention), "Liczba gałęzi i list komend dla historii powinna być taka sama"
         for j, s in zip(children, used_extention):
+            before = j.history
             j.History(*s)
             for k in j.descendants:
-                k.History(*s)
+                # Potomkowie z tą samą historią co `j` współdzielą jej wynik zamiast powtarzać komendy
+                if k.history == before:
+                    k.history = j.history
+                else:
+                    k.History(*s)
 
 
     # Nawigacja
@@ -131,21 +255,28 @@ class ProofNode(ProofBase, NodeMixin):
         return [i for i in self.path], self.closed
 
 
-    def getbranch_sentences(self) -> tuple[list[Sentence], Close]:
+    def getbranch_sentences(self) -> tuple[Branch, Close]:
         """Zwraca gałąź dowodu z informacjami o jej zamknięciu"""
         assert self.is_leaf, "Gałąź nie jest kompletna, gdyż węzeł nie jest liściem"
-        return [i.sentence for i in self.path], self.closed
+        return Branch((i.sentence for i in self.path), self.index, self.pending), self.closed
 
 
     def gettree(self) -> PrintedProofNode:
-        """Rekurencyjnie opracowuje PrintedProofNode - jest to namedtuple wykorzystywana podczas printowania drzewa"""
-        if not self.is_leaf:
-            children = (i.gettree() for i in self.children)
-            closer = ''
-        else:
-            children = None
-            closer = str(self.closed) if self.closed else None
-        return PrintedProofNode(sentence=self.sentence, children=children, closer=closer)
+        """Opracowuje PrintedProofNode - jest to namedtuple wykorzystywana podczas printowania drzewa. Nie używa rekurencji"""
+        printed: dict[int, PrintedProofNode] = {}
+        stack = [(self, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node.is_leaf:
+                closer = str(node.closed) if node.closed else None
+                printed[id(node)] = PrintedProofNode(sentence=node.sentence, children=None, closer=closer)
+            elif visited:
+                children = tuple(printed.pop(id(i)) for i in node.children)
+                printed[id(node)] = PrintedProofNode(sentence=node.sentence, children=children, closer='')
+            else:
+                stack.append((node, True))
+                stack.extend((i, False) for i in node.children)
+        return printed[id(self)]
 
 
     def notused(self) -> list[ProofNode]:
@@ -158,21 +289,21 @@ class ProofNode(ProofBase, NodeMixin):
         :names: Iterable[str]
         :rtype: list[ProofNode]
         """
-        if names:
-            return [i for i in self.root.leaves if i.branch in names]
+        if len(names) == 1:
+            leaf = self.getleaf(names[0])
+            return [leaf] if leaf else []
+        elif names:
+            return [i for i in self.leaf_index.order if i.branch in names]
         else:
-            return self.root.leaves
+            return tuple(self.leaf_index.order)
 
     def getleaf(self, name: str) -> ProofNode:
-        branches = self.getleaves(name)
-        if branches:
-            return branches[0]
-        else:
-            return None
+        return self.leaf_index.by_name.get(name)
 
     def getopen(self) -> list[ProofNode]:
         """Zwraca listę *otwartych* liści całego drzewa"""
-        return [i for i in self.getleaves() if not i.closed]
+        is_open = self.leaf_index.open
+        return [i for i in self.leaf_index.order if i in is_open]
 
 
     def getneighbour(self, left_right: str) -> ProofNode:
@@ -197,12 +328,14 @@ class ProofNode(ProofBase, NodeMixin):
 
     def is_closed(self) -> bool:
         """Sprawdza, czy wszystkie gałęzie zamknięto"""
+        if self.is_root:
+            return not self.leaf_index.open
         return all((i.closed for i in self.leaves))
 
 
     def is_successful(self) -> bool:
         """Sprawdza, czy wszystkie liście zamknięto *ze względu na sukces*"""
-        return all((i.closed is not None and i.closed.success is True for i in self.getleaves()))
+        return self.leaf_index.successful == len(self.leaf_index.order)
 
 
     # Modyfikacja
@@ -210,7 +343,7 @@ class ProofNode(ProofBase, NodeMixin):
     def append(self, sentences: SentenceTupleStructure, accessibility: int) -> int:
         """Dodaje zdania do drzewa, zwraca warstwę"""
         names = self.gen_name(accessibility, am=len(sentences))
-        layer = max((i.layer for i in self.getleaves()))+1
+        layer = self.leaf_index.layer+1
         for i, branch in enumerate(sentences):
             par = self
             for sen in branch:
@@ -234,6 +367,12 @@ class ProofNode(ProofBase, NodeMixin):
         :param layer: Warstwa (najwyższą można uzyskać przez sprawdzenie wartości w stosie użytych reguł)
         :type layer: int
         """
-        self.children = [i for i in self.children if i.layer<layer]
-        for i in self.children:
-            i._pop(layer)
\ No newline at end of file
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            kept = [i for i in node.children if i.layer<layer]
+            # Przypisanie dzieci w anytree sprawdza cykle po całej ścieżce do korzenia, więc tylko tam, gdzie coś usunięto
+            if len(kept) != len(node.children):
+                node.children = kept
+            stack.extend(kept)
+        self.leaf_index.rebuild(self.root)
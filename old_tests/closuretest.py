@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.extend([os.path.abspath(os.path.join(os.path.dirname(__file__), i)) for i in ['../old_app/appdata', '../old_app/appdata/plugins/Formal', '../old_app/core', 'fixtures', '../src']])
+from sentence import Sentence
+from tree import ProofNode
+import plugins.Formal.analytic_signed as signed
+
+VARIABLES = ['sentvar_p', 'sentvar_q', 'sentvar_r']
+
+
+def pairwise_closure(branch, used):
+    """Wzorcowe sprawdzenie zamknięcia porównujące każdą parę zdań (pozycje pary mogą się różnić od indeksu, więc nie są zwracane)"""
+    for num1, statement_1 in enumerate(branch):
+        for num2, statement_2 in enumerate(branch[num1+1:], num1+1):
+            if statement_1[1:] == statement_2[1:] and statement_1[0] != statement_2[0]:
+                return 'contradiction', None
+    if all(i in used or len(i)==2 for i in branch):
+        return 'emptiness', None
+    return None
+
+
+def indexed_closure(branch, used):
+    out = signed.check_closure(branch, used)
+    if out is None:
+        return None
+    if out[0].success:
+        return 'contradiction', None
+    return 'emptiness', None
+
+
+def sentence(*tokens):
+    return Sentence(list(tokens), None)
+
+
+def random_sentence(rng):
+    sign = rng.choice(['signtrue_T', 'signfalse_F'])
+    if rng.random() < 0.5:
+        return sentence(sign, rng.choice(VARIABLES))
+    return sentence(sign, '(', rng.choice(VARIABLES), 'and_and', rng.choice(VARIABLES), ')')
+
+
+class TestClosureIndex(unittest.TestCase):
+
+    def test_contradiction(self):
+        root = ProofNode(sentence('signfalse_F', '(', 'sentvar_p', 'imp_->', 'sentvar_p', ')'), 'Niebieska', literal_key=signed.literal_key)
+        root.append(((sentence('signtrue_T', 'sentvar_p'), sentence('signfalse_F', 'sentvar_p')),), 1)
+        ProofNode.insert_history([[root.sentence]], root.children)
+        branch, _ = root.leaves[0].getbranch_sentences()
+        self.assertEqual(branch.index.contradiction, (1, 2))
+        self.assertEqual(branch.pending, 0)
+        self.assertTrue(signed.check_closure(branch, root.leaves[0].gethistory())[0].success)
+
+    def test_pending(self):
+        compound = sentence('signtrue_T', '(', 'sentvar_p', 'and_and', 'sentvar_q', ')')
+        root = ProofNode(compound, 'Niebieska', literal_key=signed.literal_key)
+        self.assertEqual(root.pending, 1)
+        root.append(((sentence('signtrue_T', 'sentvar_p'),),), 1)
+        leaf = root.leaves[0]
+        self.assertEqual(leaf.pending, 1)
+        leaf.History(compound)
+        self.assertEqual(leaf.pending, 0)
+        leaf.History(-1)
+        self.assertEqual(leaf.pending, 1)
+
+    def test_matches_pairwise(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            root = ProofNode(random_sentence(rng), 'Niebieska', literal_key=signed.literal_key)
+            for _ in range(rng.randint(0, 6)):
+                leaf = rng.choice(root.leaves)
+                branches = tuple(tuple(random_sentence(rng) for _ in range(rng.randint(1, 2))) for _ in range(rng.randint(1, 2)))
+                used = rng.choice(leaf.getbranch_sentences()[0])
+                leaf.append(branches, 4)
+                ProofNode.insert_history(len(branches)*[[rng.choice([used, 0, -1])]], leaf.children)
+            for leaf in root.leaves:
+                branch, _ = leaf.getbranch_sentences()
+                used = leaf.gethistory()
+                self.assertEqual(indexed_closure(branch, used), pairwise_closure(branch, used))
+                if branch.index.contradiction:
+                    first, second = branch.index.contradiction
+                    self.assertEqual(branch[first][1:], branch[second][1:])
+                    self.assertNotEqual(branch[first][0], branch[second][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
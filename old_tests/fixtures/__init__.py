@@ -0,0 +1,6 @@
+"""
+Minimalne zamienniki modułów starej aplikacji (`sentence`, `close`, `exceptions`), których brakuje w old_app.
+Katalog jest dodawany do `sys.path` przez testy old_tests, dzięki czemu można je uruchomić bez pełnego środowiska:
+
+    python -m pytest old_tests/closuretest.py old_tests/historytest.py
+"""
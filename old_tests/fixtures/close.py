@@ -0,0 +1 @@
+from venice_turpentine.core.close import *  # noqa: F401,F403
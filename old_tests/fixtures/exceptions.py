@@ -0,0 +1 @@
+from venice_turpentine.exceptions import *  # noqa: F401,F403
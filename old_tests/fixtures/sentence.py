@@ -0,0 +1,29 @@
+"""Zdanie starej aplikacji ograniczone do operacji używanych przez drzewo dowodu, historię i pluginy Output"""
+
+
+class Sentence(list):
+    """Lista tokenów w zapisie `typ_leksem`"""
+
+    def __init__(self, sentence=(), session=None):
+        super().__init__(sentence)
+        self.S = session
+
+    def getTypes(self) -> list[str]:
+        return [i.split('_', 1)[0] for i in self]
+
+    def getLexems(self) -> list[str]:
+        return [i.split('_', 1)[-1] for i in self]
+
+    def getUnique(self) -> list[str]:
+        return list(self)
+
+    def getReadable(self) -> str:
+        return " ".join(self.getLexems())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return Sentence(super().__getitem__(key), self.S)
+        return super().__getitem__(key)
+
+    def __hash__(self):
+        return hash(tuple(self))
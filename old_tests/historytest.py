@@ -0,0 +1,76 @@
+import os
+import sys
+import unittest
+
+sys.path.extend([os.path.abspath(os.path.join(os.path.dirname(__file__), i)) for i in ['../old_app/appdata', '../old_app/core', 'fixtures', '../src']])
+from history import History
+from sentence import Sentence
+from tree import ProofNode
+
+
+def sentence(*tokens):
+    return Sentence(list(tokens), None)
+
+
+P = sentence('sentvar_p')
+Q = sentence('sentvar_q')
+R = sentence('sentvar_r')
+
+
+class TestHistory(unittest.TestCase):
+
+    def test_commands(self):
+        history = History()
+        history(P, ['sentvar_q'], 0)
+        self.assertIn(P, history)
+        self.assertIn(Q, history)
+        self.assertNotIn(R, history)
+        self.assertEqual(len(history), 2)
+        history(-1, R)
+        self.assertEqual(set(history), {History.key(R)})
+        history(lambda used: used | {History.key(P)})
+        self.assertEqual(set(history), {History.key(P), History.key(R)})
+        history(lambda used: used - {History.key(R)}, lambda used: used.union([History.key(Q)]))
+        self.assertEqual(set(history), {History.key(P), History.key(Q)})
+        with self.assertRaises(TypeError):
+            history(1.5)
+
+    def test_copy_is_independent(self):
+        history = History()
+        history(P)
+        copied = history.copy()
+        copied(Q)
+        self.assertNotIn(Q, history)
+        self.assertIn(Q, copied)
+        copied(-1)
+        self.assertIn(P, history)
+        self.assertEqual(history, {History.key(P)})
+
+
+class TestTreeHistory(unittest.TestCase):
+
+    def test_shared_between_nodes(self):
+        root = ProofNode(P, 'Niebieska')
+        root.append(((Q, Q, Q), (R, R)), 4)
+        ProofNode.insert_history([[P], [0]], root.children)
+        left, right = root.children
+        self.assertIn(P, left.leaves[0].history)
+        self.assertNotIn(P, right.leaves[0].history)
+        self.assertNotIn(P, root.history)
+        # Węzły z jednakową historią współdzielą jeden obiekt
+        self.assertEqual(len({id(i.history) for i in left.path[1:] + left.descendants}), 1)
+
+    def test_node_commands_do_not_leak(self):
+        root = ProofNode(P, 'Niebieska')
+        root.append(((Q, R),), 4)
+        ProofNode.insert_history([[P]], root.children)
+        leaf = root.leaves[0]
+        leaf.History(-1)
+        self.assertNotIn(P, leaf.history)
+        self.assertIn(P, leaf.parent.history)
+        leaf.History(Q)
+        self.assertEqual(set(leaf.gethistory()), {History.key(Q)})
+
+
+if __name__ == "__main__":
+    unittest.main()
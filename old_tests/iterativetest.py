@@ -0,0 +1,262 @@
+import os
+import random
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.extend([os.path.abspath(os.path.join(os.path.dirname(__file__), i)) for i in ['../old_app/appdata', '../old_app/appdata/plugins/Formal', '../old_app/core', 'fixtures', '../src']])
+from anytree import RenderTree
+from sentence import Sentence
+from tree import PrintedProofNode, ProofNode
+import plugins.Formal.__utils__ as formal_utils
+import plugins.Formal.analytic_freedom.solver as freedom_solver
+import plugins.Formal.analytic_signed.solver as signed_solver
+import plugins.Output.debug as debug
+import plugins.Output.TeX_forest as TeX_forest
+import plugins.Output.TeX_infer as TeX_infer
+
+# Głębokość przekraczająca domyślny limit rekurencji
+DEEP = 3000
+
+
+# Rekurencyjne wersje wzorcowe
+
+
+def recursive_gettree(node):
+    if not node.is_leaf:
+        children = tuple(recursive_gettree(i) for i in node.children)
+        closer = ''
+    else:
+        children = None
+        closer = str(node.closed) if node.closed else None
+    return PrintedProofNode(sentence=node.sentence, children=children, closer=closer)
+
+
+def recursive_infer(sentence, children):
+    if children is None:
+        return TeX_infer._gen_infer(TeX_infer.get_readable(sentence), "")
+    return TeX_infer._gen_infer(TeX_infer.get_readable(sentence), " & ".join(recursive_infer(i.sentence, i.children) for i in children))
+
+
+def recursive_forest(sentence, children, close):
+    if children is not None:
+        return "[%s\n%s]" % (TeX_forest.get_readable(sentence), "\n".join(recursive_forest(i.sentence, i.children, i.closer) for i in children))
+    if close:
+        return "[%s [%s]]" % (TeX_forest.get_readable(sentence), close.replace('XXX', '\\times').replace(',', '{,}'))
+    return "[%s]" % (TeX_forest.get_readable(sentence))
+
+
+def recursive_nodes(sentence, children):
+    ch = sum((recursive_nodes(child.sentence, child.children) for child in children), []) if children else []
+    return [debug.Node(debug.get_readable(sentence), children=ch)]
+
+
+def recursive_into_sentence(s, prefix, conn_dict, variables):
+    l = prefix[0]
+    if l == 0:
+        s.append(random.choice(variables))
+    else:
+        main = s.generate(random.choice(conn_dict[l]))
+        if l == 2:
+            s.append('(')
+            recursive_into_sentence(s, prefix[1:], conn_dict, variables)
+            s.append(main)
+            recursive_into_sentence(s, prefix[1:], conn_dict, variables)
+            s.append(')')
+        else:
+            s.append(main)
+            for _ in range(l):
+                recursive_into_sentence(s, prefix[1:], conn_dict, variables)
+
+
+def recursive_solver(module, proof, rule, containers, check_closure):
+    start_used = proof.metadata['usedrules'][:]
+    start_layer = start_used[-1].layer if start_used else 0
+    while any(len(containers[i.name]) > 0 for i in rule.path):
+        for past_rule in rule.path:
+            containers = module.propagate_rule(proof, past_rule, containers, check_closure)
+        if proof.nodes.is_closed():
+            return True
+    for child in rule.children:
+        if recursive_solver(module, proof, child, containers, check_closure):
+            return True
+    proof.metadata['usedrules'] = start_used
+    proof.nodes.pop(start_layer+1)
+    return False
+
+
+# Dane testowe
+
+
+def sentence(*tokens):
+    return Sentence(list(tokens), None)
+
+
+def small_printed_tree():
+    return PrintedProofNode(sentence('sentvar_p', 'and_and', 'sentvar_q'), (
+        PrintedProofNode(sentence('sentvar_p'), (
+            PrintedProofNode(sentence('sentvar_q'), None, 'XXX'),
+            PrintedProofNode(sentence('not_not', 'sentvar_q'), None, None),
+        ), ''),
+        PrintedProofNode(sentence('sentvar_r'), None, 'a,b'),
+    ), '')
+
+
+def deep_printed_tree(depth):
+    node = PrintedProofNode(sentence('sentvar_p'), None, None)
+    for _ in range(depth):
+        node = PrintedProofNode(sentence('not_not', 'sentvar_p'), (node,), '')
+    return node
+
+
+class CollectingSentence(list):
+    """Zastępuje Sentence w _into_sentence - generuje przewidywalne leksemy"""
+
+    def generate(self, type_):
+        return f"{type_}_{len(self)}"
+
+
+class FakeRule(object):
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = ()
+        if parent is not None:
+            parent.children += (self,)
+
+    @property
+    def path(self):
+        node, path = self, []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        return tuple(reversed(path))
+
+
+class TestProofTree(unittest.TestCase):
+
+    def test_gettree_matches_recursive(self):
+        root = ProofNode(sentence('sentvar_p'), 'Green')
+        left = ProofNode(sentence('sentvar_q'), 'Green', 1, parent=root)
+        ProofNode(sentence('sentvar_r'), 'Blue', 1, parent=root)
+        ProofNode(sentence('sentvar_s'), 'Green', 2, parent=left)
+        self.assertEqual(root.gettree(), recursive_gettree(root))
+
+    def test_gettree_deep(self):
+        root = node = ProofNode(sentence('sentvar_p'), 'Green')
+        for i in range(DEEP):
+            node = ProofNode(sentence('sentvar_p'), 'Green', i+1, parent=node)
+        printed, depth = root.gettree(), 0
+        while printed.children:
+            printed, depth = printed.children[0], depth+1
+        self.assertEqual(depth, DEEP)
+
+    def test_pop_deep(self):
+        root = node = ProofNode(sentence('sentvar_p'), 'Green')
+        for i in range(DEEP):
+            node = ProofNode(sentence('sentvar_p'), 'Green', i+1, parent=node)
+        root.pop(10)
+        self.assertEqual(len(root.leaves[0].ancestors), 9)
+
+
+class TestOutput(unittest.TestCase):
+
+    def test_tex_infer(self):
+        tree = small_printed_tree()
+        self.assertEqual(TeX_infer._write_tree(tree.sentence, tree.children), recursive_infer(tree.sentence, tree.children))
+        TeX_infer.write_tree(deep_printed_tree(DEEP))
+
+    def test_tex_forest(self):
+        tree = small_printed_tree()
+        self.assertEqual(
+            TeX_forest._write_tree(tree.sentence, tree.children, tree.closer),
+            recursive_forest(tree.sentence, tree.children, tree.closer)
+        )
+        TeX_forest.write_tree(deep_printed_tree(DEEP))
+
+    def test_debug(self):
+        tree = small_printed_tree()
+        render = lambda nodes: [f"{pre}{node.name}" for pre, _, node in RenderTree(nodes[0])]
+        self.assertEqual(
+            render(debug.get_nodes(tree.sentence, tree.children)),
+            render(recursive_nodes(tree.sentence, tree.children))
+        )
+        # `leaves` z anytree jest rekurencyjne, więc głębokość liczona jest ręcznie
+        node, depth = debug.get_nodes(*deep_printed_tree(DEEP)[:2])[0], 0
+        while node.children:
+            node, depth = node.children[0], depth+1
+        self.assertEqual(depth, DEEP)
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_into_sentence_matches_recursive(self):
+        conn_dict = {1: ['not'], 2: ['and', 'or', 'imp']}
+        prefix = [2, 1, 2, 0, 0]
+        random.seed(3)
+        expected = CollectingSentence()
+        recursive_into_sentence(expected, prefix, conn_dict, ['p', 'q'])
+        random.seed(3)
+        result = CollectingSentence()
+        formal_utils._into_sentence(result, prefix, conn_dict, ['p', 'q'])
+        self.assertEqual(result, expected)
+
+    def test_into_sentence_deep(self):
+        result = CollectingSentence()
+        formal_utils._into_sentence(result, DEEP*[1]+[0], {1: ['not']}, ['p'])
+        self.assertEqual(len(result), DEEP+1)
+
+
+class TestSolver(unittest.TestCase):
+
+    def run_solver(self, solver, module, root, closing):
+        """Uruchamia solver na zaślepkach dowodu i zwraca wynik wraz z dziennikiem wywołań"""
+        log, seen = [], set()
+        proof = SimpleNamespace(
+            metadata={'usedrules': []},
+            nodes=SimpleNamespace(is_closed=lambda: closing in seen, pop=lambda layer: log.append(('pop', layer)))
+        )
+
+        def propagate(proof, rule, containers, check_closure):
+            log.append(rule.name)
+            seen.add(rule.name)
+            if not containers[rule.name]:
+                # Kopia słownika byłaby taka sama; pominięcie jej utrzymuje test_deep w czasie kwadratowym
+                return containers
+            proof.metadata['usedrules'].append(SimpleNamespace(layer=len(proof.metadata['usedrules'])+1))
+            return {**containers, rule.name: []}
+
+        rules, stack = [], [root]
+        while stack:
+            rules.append(stack.pop())
+            stack.extend(rules[-1].children)
+        containers = {i.name: [i.name] for i in rules}
+        with mock.patch.object(module, 'propagate_rule', propagate):
+            result = solver(proof, root, containers, None)
+        return result, log
+
+    def small_rules(self):
+        root = FakeRule('root')
+        a, b = FakeRule('a', root), FakeRule('b', root)
+        FakeRule('a1', a), FakeRule('a2', a), FakeRule('b1', b)
+        return root
+
+    def test_matches_recursive(self):
+        for module in (freedom_solver, signed_solver):
+            for closing in ('a2', 'b1', 'never'):
+                expected = self.run_solver(lambda *args: recursive_solver(module, *args), module, self.small_rules(), closing)
+                result = self.run_solver(module._solver, module, self.small_rules(), closing)
+                self.assertEqual(result, expected)
+
+    def test_deep(self):
+        root = rule = FakeRule('r0')
+        for i in range(1, DEEP // 2):
+            rule = FakeRule(f'r{i}', rule)
+        for module in (freedom_solver, signed_solver):
+            result, log = self.run_solver(module._solver, module, root, rule.name)
+            self.assertTrue(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.extend([os.path.abspath(os.path.join(os.path.dirname(__file__), i)) for i in ['../old_app/appdata', '../old_app/core', 'fixtures', '../src']])
+from close import Contradiction, Emptiness
+from colors import BranchNames, get_branch_name
+from sentence import Sentence
+from tree import ProofNode
+
+
+def sentence(*tokens):
+    return Sentence(list(tokens), None)
+
+
+def traversed(root):
+    """Wzorcowe wartości obliczane przez przejście całego drzewa"""
+    leaves = root.leaves
+    return dict(
+        names=[i.branch for i in leaves],
+        open=[i for i in leaves if not i.closed],
+        closed=all(i.closed for i in leaves),
+        successful=all(i.closed is not None and i.closed.success is True for i in leaves),
+        layer=max(i.layer for i in leaves),
+    )
+
+
+def indexed(root):
+    return dict(
+        names=root.getbranchnames(),
+        open=root.getopen(),
+        closed=root.is_closed(),
+        successful=root.is_successful(),
+        layer=root.leaf_index.layer,
+    )
+
+
+class TestBranchNames(unittest.TestCase):
+
+    def test_matches_generator(self):
+        rng = random.Random(5)
+        names = BranchNames(2)
+        used = set()
+        for _ in range(500):
+            expected = list(get_branch_name(2, used))[:3]
+            self.assertEqual(names.peek(3), expected)
+            if used and rng.random() < 0.4:
+                name = rng.choice(sorted(used))
+                used.discard(name)
+                names.release(name)
+            elif expected:
+                name = rng.choice(expected)
+                used.add(name)
+                names.use(name)
+
+
+class TestLeafIndex(unittest.TestCase):
+
+    def test_matches_traversal(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            root = ProofNode(sentence('sentvar_p'), next(get_branch_name(4, [])))
+            layers = [0]
+            for _ in range(40):
+                action = rng.random()
+                if action < 0.6 and root.getopen():
+                    leaf = rng.choice(root.getopen())
+                    used = root.getbranchnames()
+                    expected = [leaf.branch] + list(get_branch_name(4, used))[:2]
+                    branches = tuple((sentence('sentvar_q'),)*rng.randint(1, 3) for _ in range(rng.randint(1, 3)))
+                    self.assertEqual(list(leaf.gen_name(4, len(branches))), expected[:len(branches)])
+                    layers.append(leaf.append(branches, 4))
+                elif action < 0.85 and root.getopen():
+                    rng.choice(root.getopen()).close(rng.choice([Contradiction, Emptiness]))
+                elif len(layers) > 1:
+                    root.pop(layers.pop())
+                self.assertEqual(indexed(root), traversed(root))
+                for leaf in root.leaves:
+                    self.assertIs(root.getleaf(leaf.branch), leaf)
+
+    def test_rebuild_deep(self):
+        root = node = ProofNode(sentence('sentvar_p'), 'Green')
+        for i in range(3000):
+            node = ProofNode(sentence('sentvar_p'), 'Green', i+1, parent=node)
+        root.pop(2000)
+        self.assertEqual(indexed(root)['layer'], 1999)
+        self.assertEqual(root.getopen(), [root.getleaf('Green')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Katalog pamięci podręcznej współdzielonej między procesami (zweryfikowane wtyczki, skompilowane leksery).
+
+Domyślnie `~/.cache/venice_turpentine`; można go wskazać zmienną środowiskową `VENICE_TURPENTINE_CACHE`,
+a pustą wartością wyłączyć zapisywanie. Brak możliwości zapisu (np. w Pyodide) nie jest błędem -
+pamięć podręczna jest wtedy po prostu pomijana.
+"""
+from __future__ import annotations
+
+import json
+import os
+from contextlib import suppress
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Optional
+
+from loguru import logger
+
+ENVIRONMENT_VARIABLE = "VENICE_TURPENTINE_CACHE"
+
+
+def cache_dir() -> Optional[Path]:
+    """Zwraca katalog pamięci podręcznej lub None, jeśli jest wyłączona"""
+    configured = os.environ.get(ENVIRONMENT_VARIABLE)
+    if configured is not None:
+        return Path(configured) if configured else None
+    return Path.home() / ".cache" / "venice_turpentine"
+
+
+def read_json(name: str) -> Any:
+    """Odczytuje plik z pamięci podręcznej; None jeśli go nie ma lub jest uszkodzony"""
+    directory = cache_dir()
+    if directory is None:
+        return None
+    try:
+        with open(directory / name, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(name: str, data: Any) -> None:
+    """Zapisuje plik w pamięci podręcznej atomowo (przez plik tymczasowy)"""
+    directory = cache_dir()
+    if directory is None:
+        return
+    temporary = None
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Plik tymczasowy ma unikalną nazwę, więc wątki jednego procesu mogą zapisywać ten sam plik jednocześnie
+        with NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, prefix=f"{name}.", suffix=".tmp", delete=False
+        ) as file:
+            temporary = file.name
+            json.dump(data, file)
+        os.replace(temporary, directory / name)
+    except OSError as error:
+        logger.debug(f"Cache file {name} not written: {error}")
+        if temporary is not None:
+            with suppress(OSError):
+                os.unlink(temporary)
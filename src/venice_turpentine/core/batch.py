@@ -0,0 +1,136 @@
+"""
+Wektoryzowane (NumPy) obliczanie siły wiązania spójników i głównych spójników dla wielu formuł naraz.
+
+Wymaga opcjonalnej zależności `numpy` (`pip install venice-turpentine[batch]`).
+Wyniki są identyczne z `Formula.precedence` oraz `Formula.getMainConnective`.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from ..formal_systems import FormalSystem
+from .packed import PackedFormula
+from .token import Token
+
+# Kody typów tokenów w tablicy wsadowej
+PADDING = 0
+LEFT = 1
+RIGHT = 2
+OTHER = 3
+FIRST_CONNECTIVE = 4
+
+
+class FormulaBatch(object):
+    """Zbiór formuł upakowany w tablice o wspólnej długości wierszy"""
+
+    def __init__(
+        self,
+        formulas: Sequence[Union[Sequence[Token], PackedFormula]],
+        formal_system: FormalSystem,
+    ) -> None:
+        super().__init__()
+        self.formal_system = formal_system
+
+        spec = formal_system.spec
+        self._codes = {"(": LEFT, ")": RIGHT}
+        for type_, connective in spec.ids.items():
+            self._codes[type_] = FIRST_CONNECTIVE + connective
+
+        # Tablice przeglądowe indeksowane kodem typu
+        size = FIRST_CONNECTIVE + len(spec.types)
+        self._delta = np.zeros(size, dtype=np.int64)
+        self._delta[LEFT], self._delta[RIGHT] = 1, -1
+        self._levels = np.full(size, np.nan)
+        self._unary = np.zeros(size, dtype=bool)
+        for connective in range(len(spec.types)):
+            self._levels[FIRST_CONNECTIVE + connective] = spec.values[connective]
+            self._unary[FIRST_CONNECTIVE + connective] = spec.isUnary(connective)
+
+        self.lengths = np.fromiter((len(i) for i in formulas), dtype=np.int64, count=len(formulas))
+        width = int(self.lengths.max()) if len(formulas) else 0
+        self.codes = np.zeros((len(formulas), width), dtype=np.int16)
+        for row, formula in enumerate(formulas):
+            self.codes[row, : len(formula)] = self._encode(formula)
+
+        self._values: Optional[np.ndarray] = None
+        self._main: Optional[np.ndarray] = None
+
+    def _encode(self, formula: Union[Sequence[Token], PackedFormula]) -> np.ndarray:
+        if isinstance(formula, PackedFormula):
+            lookup = np.fromiter(
+                (self._codes.get(i, OTHER) for i in formula.symbols.types),
+                dtype=np.int16,
+                count=len(formula.symbols.types),
+            )
+            return lookup[np.frombuffer(formula.types, dtype=np.uint16)]
+        return np.fromiter(
+            (self._codes.get(i.type_, OTHER) for i in formula),
+            dtype=np.int16,
+            count=len(formula),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def depth(self) -> np.ndarray:
+        """Poziom zagnieżdżenia przed każdym tokenem"""
+        delta = self._delta[self.codes]
+        return np.cumsum(delta, axis=1) - delta
+
+    def values(self) -> np.ndarray:
+        """Siła wiązania spójników (`lvl + prec/scale`); NaN dla pozostałych tokenów"""
+        if self._values is None:
+            self._values = self.depth() + self._levels[self.codes]
+        return self._values
+
+    def mainConnectives(self) -> np.ndarray:
+        """Indeksy głównych spójników; -1 dla formuł bez spójników"""
+        if self._main is not None:
+            return self._main
+
+        values = self.values()
+        if values.shape[1] == 0:
+            self._main = np.full(len(self), -1, dtype=np.int64)
+            return self._main
+        is_connective = ~np.isnan(values)
+        masked = np.where(is_connective, values, np.inf)
+        lowest = masked.min(axis=1, initial=np.inf)
+        is_lowest = is_connective & (masked == lowest[:, None])
+
+        # Spójniki jednoargumentowe jako jedyne działają "od prawej"
+        only_unary = ~(is_lowest & ~self._unary[self.codes]).any(axis=1)
+        width = self.codes.shape[1]
+        leftmost = is_lowest.argmax(axis=1)
+        rightmost = width - 1 - is_lowest[:, ::-1].argmax(axis=1)
+
+        main = np.where(only_unary, leftmost, rightmost)
+        self._main = np.where(is_lowest.any(axis=1), main, -1)
+        return self._main
+
+    def precedence(self) -> list[dict[int, float]]:
+        """Słowniki siły wiązania spójników, jak w `Formula.precedence`"""
+        values = self.values()
+        rows, cols = np.nonzero(~np.isnan(values))
+        result: list[dict[int, float]] = [{} for _ in range(len(self))]
+        for row, col, val in zip(rows.tolist(), cols.tolist(), values[rows, cols].tolist()):
+            result[row][col] = val
+        return result
+
+
+def batch_precedence(
+    formulas: Sequence[Union[Sequence[Token], PackedFormula]], formal_system: FormalSystem
+) -> list[dict[int, float]]:
+    """Oblicza siłę wiązania spójników dla wielu formuł naraz"""
+    return FormulaBatch(formulas, formal_system).precedence()
+
+
+def batch_main_connective(
+    formulas: Sequence[Union[Sequence[Token], PackedFormula]], formal_system: FormalSystem
+) -> list[int | None]:
+    """Wyznacza główne spójniki wielu formuł naraz; None dla formuł bez spójników"""
+    return [
+        None if i == -1 else i
+        for i in FormulaBatch(formulas, formal_system).mainConnectives().tolist()
+    ]
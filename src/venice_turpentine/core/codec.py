@@ -0,0 +1,179 @@
+"""
+Zwarty format binarny ciągów tokenów.
+
+Układ danych (liczby zapisane jako varint, LEB128):
+    MAGIC
+    tablica typów, tablica leksemów, identyfikatory typów literałów, tablica nazw systemów formalnych
+    liczba rekordów, a dla każdego rekordu:
+        flagi, [indeks systemu], długość, pary (typ, leksem), [sekcja siły wiązania]
+
+Sekcja siły wiązania zawiera indeksy spójników (jako różnice) oraz ich poziom zagnieżdżenia (zigzag),
+z których wartości odtwarza się bez przeglądania nawiasów.
+"""
+from __future__ import annotations
+
+from typing import Iterable, NamedTuple, Optional
+
+from ..exceptions import FormulaError
+from .symbols import SymbolTable
+from .token import Token
+
+MAGIC = b"VTF\x01"
+
+_HAS_SYSTEM = 1
+_HAS_PRECEDENCE = 2
+
+
+class Record(NamedTuple):
+    """Zdekodowany ciąg tokenów"""
+
+    tokens: list[Token]
+    system: Optional[str]  # Nazwa zarejestrowanego systemu formalnego
+    levels: Optional[dict[int, int]]  # Indeks spójnika -> poziom zagnieżdżenia
+
+
+# MARK: Varint
+
+
+def _write_uint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_int(out: bytearray, value: int) -> None:
+    _write_uint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8")
+    _write_uint(out, len(encoded))
+    out += encoded
+
+
+class _Reader(object):
+    def __init__(self, data: bytes, pos: int = 0) -> None:
+        self.data = memoryview(data)
+        self.pos = pos
+
+    def read_uint(self) -> int:
+        result = shift = 0
+        data = self.data
+        try:
+            while True:
+                byte = data[self.pos]
+                self.pos += 1
+                result |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    return result
+                shift += 7
+        except IndexError:
+            raise FormulaError("Truncated formula data") from None
+
+    def read_int(self) -> int:
+        value = self.read_uint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def read_str(self) -> str:
+        length = self.read_uint()
+        if self.pos + length > len(self.data):
+            raise FormulaError("Truncated formula data")
+        value = bytes(self.data[self.pos : self.pos + length]).decode("utf-8")
+        self.pos += length
+        return value
+
+
+# MARK: Kodowanie
+
+
+def encode(records: Iterable[Record]) -> bytes:
+    """Koduje ciągi tokenów wraz ze wspólną tablicą symboli"""
+    symbols = SymbolTable()
+    systems: dict[str, int] = {}
+    body = bytearray()
+    count = 0
+
+    for tokens, system, levels in records:
+        count += 1
+        flags = (_HAS_SYSTEM if system is not None else 0) | (
+            _HAS_PRECEDENCE if levels is not None else 0
+        )
+        _write_uint(body, flags)
+        if system is not None:
+            _write_uint(body, systems.setdefault(system, len(systems)))
+        _write_uint(body, len(tokens))
+        for token in tokens:
+            type_id, lexem_id = symbols.encode_token(token)
+            _write_uint(body, type_id)
+            _write_uint(body, lexem_id)
+        if levels is not None:
+            _write_uint(body, len(levels))
+            previous = 0
+            for index in sorted(levels):
+                _write_uint(body, index - previous)
+                _write_int(body, levels[index])
+                previous = index
+
+    out = bytearray(MAGIC)
+    for names in (symbols.types, symbols.lexems):
+        _write_uint(out, len(names))
+        for name in names:
+            _write_str(out, name)
+    literals = [i for i in range(len(symbols.types)) if symbols.is_literal(i)]
+    _write_uint(out, len(literals))
+    for i in literals:
+        _write_uint(out, i)
+    _write_uint(out, len(systems))
+    for name in systems:
+        _write_str(out, name)
+    _write_uint(out, count)
+    out += body
+    return bytes(out)
+
+
+def decode(data: bytes) -> list[Record]:
+    """Dekoduje dane zapisane przez `encode`; tokeny są internowane"""
+    if data[: len(MAGIC)] != MAGIC:
+        raise FormulaError("Not a serialised formula")
+    reader = _Reader(data, len(MAGIC))
+
+    types = [reader.read_str() for _ in range(reader.read_uint())]
+    lexems = [reader.read_str() for _ in range(reader.read_uint())]
+    literals = {reader.read_uint() for _ in range(reader.read_uint())}
+    systems = [reader.read_str() for _ in range(reader.read_uint())]
+    tokens_cache: dict[tuple[int, int], Token] = {}
+
+    records = []
+    for _ in range(reader.read_uint()):
+        flags = reader.read_uint()
+        system = None
+        if flags & _HAS_SYSTEM:
+            try:
+                system = systems[reader.read_uint()]
+            except IndexError:
+                raise FormulaError("Corrupted formula data") from None
+        tokens = []
+        for _ in range(reader.read_uint()):
+            ids = reader.read_uint(), reader.read_uint()
+            try:
+                token = tokens_cache[ids]
+            except KeyError:
+                try:
+                    token = Token(types[ids[0]], lexems[ids[1]], ids[0] in literals)
+                except IndexError:
+                    raise FormulaError("Corrupted formula data") from None
+                tokens_cache[ids] = token
+            tokens.append(token)
+        levels = None
+        if flags & _HAS_PRECEDENCE:
+            levels = {}
+            index = 0
+            for _ in range(reader.read_uint()):
+                index += reader.read_uint()
+                levels[index] = reader.read_int()
+        records.append(Record(tokens, system, levels))
+
+    if reader.pos != len(data):
+        raise FormulaError("Trailing bytes after formula data")
+    return records
@@ -1,30 +1,116 @@
 from __future__ import annotations
 
-from collections import OrderedDict
-from functools import cached_property
-from typing import Any, Callable, Optional, SupportsIndex, TypeVar, Union, overload
-
-from ..exceptions import FormulaError
-from ..formal_systems import FormalSystem
-from .token import Token
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import wraps
+from itertools import islice
+from math import floor
+from operator import index as to_index
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    Optional,
+    SupportsIndex,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from ..exceptions import FormulaError, UserMistake
+from ..formal_systems import FormalSystem, formal_system_name, get_formal_system
+from . import codec
+from .parser import parse
+from .syntax_tree import SyntaxNode
+from .token import LEFT_BRACKET, RIGHT_BRACKET, Token
 
 T = TypeVar("T")
-V = TypeVar("V")
-Z = TypeVar("Z")
 
-def apply_on_keys(dictionary: dict[T, Z], op: Callable[[T], V]) -> dict[V, Z]:
-    return {op(i): j for i, j in dictionary.items()}
+# Typy, których leksemy nie wpływają na zapis unikalny zdania
+UNIQUE_BY_TYPE = frozenset(("indvar", "constant", "predicate", "function", "sentvar"))
+
+def pick_main_connective(
+    precedence: dict[int, float],
+    type_at: Callable[[int], str],
+    unary_operators: Iterable[str],
+) -> int | None:
+    """
+    Wybiera główny spójnik na podstawie siły wiązania spójników.
+    W przypadku równych sił wiązania zwraca indeks najbardziej na prawo, z wyjątkiem jednoargumentowych spójników
+    """
+    if not precedence:
+        return None
+
+    min_prec = min(precedence.values())
+    min_prec_indexes = [i for i, j in precedence.items() if j == min_prec]
+
+    # Spójniki jednoargumentowe jako jedyne działają "od prawej"
+    if all(type_at(i) in unary_operators for i in min_prec_indexes):
+        return min(min_prec_indexes)
+    else:
+        return max(min_prec_indexes)
+
+@dataclass(init=True, repr=False, frozen=True, slots=True)
+class BracketIndex:
+    """Indeks nawiasów zdania obliczany w jednym przebiegu"""
+
+    # Indeks pasującego nawiasu lub -1 (dla pozostałych tokenów i nawiasów bez pary)
+    match: tuple[int, ...]
+    # Poziom zagnieżdżenia przed tokenem o danym indeksie; ostatni element to bilans całego zdania
+    depth: tuple[int, ...]
+    # Najniższy osiągnięty poziom zagnieżdżenia (ujemny, jeśli jakiś nawias nie został otwarty)
+    lowest: int
+    # Pierwszy indeks `depth`, w którym poziom spada poniżej poziomu w danym indeksie (len(depth), jeśli brak)
+    drop: tuple[int, ...]
+
+    @classmethod
+    def build(cls, tokens: Sequence[Token]) -> BracketIndex:
+        match = [-1] * len(tokens)
+        depth = [0] * (len(tokens) + 1)
+        opened: list[int] = []
+        lvl = lowest = 0
+        for i, token in enumerate(tokens):
+            if token.type_ == "(":
+                opened.append(i)
+                lvl += 1
+            elif token.type_ == ")":
+                if opened:
+                    j = opened.pop()
+                    match[i], match[j] = j, i
+                lvl -= 1
+                lowest = min(lowest, lvl)
+            depth[i + 1] = lvl
+
+        drop = [len(depth)] * len(depth)
+        waiting: list[int] = []
+        for i, lvl in enumerate(depth):
+            while waiting and lvl < depth[waiting[-1]]:
+                drop[waiting.pop()] = i
+            waiting.append(i)
+        return cls(tuple(match), tuple(depth), lowest, tuple(drop))
+
+    def isBalanced(self, start: int, stop: int) -> bool:
+        """Sprawdza w czasie stałym, czy nawiasy w przedziale [start, stop) są sparowane"""
+        return self.depth[stop] == self.depth[start] and self.drop[start] > stop
+
+
+def _invalidating(method: Callable[..., T]) -> Callable[..., T]:
+    """Opakowuje metodę modyfikującą listę tak, aby unieważniała zapamiętane wyniki obliczeń"""
+
+    @wraps(method)
+    def wrapper(self: Formula, *args: Any, **kwargs: Any) -> T:
+        self._invalidate()
+        return method(self, *args, **kwargs)
+
+    return wrapper
 
-def slice_dict_by_key(
-    dictionary: dict[int, T], key: int
-) -> tuple[dict[int, T], dict[int, T]]:
-    return (
-        {i: j for i, j in dictionary.items() if i < key},  # left
-        {i - key - 1: j for i, j in dictionary.items() if i > key},  # right
-    )
 
 class Formula(list[Token]):
 
+    __slots__ = ("formal_system", "precedenceBaked", "bracketsBaked", "treeBaked", "mistakeBaked")
+
     def __init__(
         self,
         token_list: list[Token],
@@ -33,7 +119,12 @@ class Formula(list[Token]):
     ):
         self.formal_system = formal_system
         # Indeksy spójników oraz siła wiązania - im wyższa wartość, tym mocniej wiąże
-        self.precedenceBaked = precedenceBaked or {}
+        # None oznacza, że siła wiązania nie została jeszcze obliczona
+        self.precedenceBaked = precedenceBaked
+        self.bracketsBaked: Optional[BracketIndex] = None
+        self.treeBaked: Optional[SyntaxNode] = None
+        # Błąd składni niepoprawnego zdania; _NOT_COMPUTED, jeśli składnia nie została jeszcze sprawdzona
+        self.mistakeBaked: Any = _NOT_COMPUTED
         super().__init__(token_list)
 
     # MARK: Getters
@@ -57,18 +148,16 @@ class Formula(list[Token]):
         """Zwraca zapis unikalny dla tego zdania; odporne na różnice w formacie zapisu"""
         ret = []
         for token in self:
-            if token.type_ in (
-                "indvar",
-                "constant",
-                "predicate",
-                "function",
-                "sentvar",
-            ):
+            if token.type_ in UNIQUE_BY_TYPE:
                 ret.append(token.type_)
             else:
                 ret.append(token.lexem)
         return ret
 
+    def uniqueKey(self) -> tuple[str, ...]:
+        """Zwraca zapis unikalny w postaci nadającej się na klucz słownika"""
+        return tuple(self.getUnique())
+
     def isLiteral(self) -> bool:
         main = self.getMainConnective()
         return main is None or (main == 0 and len(self.precedence()) == 1)
@@ -78,69 +167,154 @@ class Formula(list[Token]):
     def calcPrecedenceVal(
         self, connective: str, lvl: int = 0
     ) -> float:
-        return lvl + self.formal_system.operator_precedence[connective] / self.formal_system.operator_precedence_scale
+        return self.formal_system.spec.value(connective, lvl)
     
-    def precedence(self) -> dict[int, float]:
-        """Oblicza siłę wiązania spójników w zdaniu, zwraca słownik indeksów spójników i ich sił wiązania"""
-        if self.precedenceBaked:
-            return self.precedenceBaked
-        self.precedenceBaked = {}
-
-        lvl = 0
-        for i, t in enumerate(self.getTypes()):
+    def _scanPrecedence(self, tokens: list[Token], lvl: int = 0) -> dict[int, float]:
+        spec = self.formal_system.spec
+        ids, values = spec.ids, spec.values
+        precedence = {}
+        for i, token in enumerate(tokens):
+            t = token.type_
             if t == "(":
                 lvl += 1
             elif t == ")":
                 lvl -= 1
-            elif t in self.formal_system.operator_precedence:
-                self.precedenceBaked[i] = self.calcPrecedenceVal(
-                    t, lvl
-                )
+            elif (connective := ids.get(t)) is not None:
+                precedence[i] = lvl + values[connective]
+        return precedence
 
+    def precedence(self) -> dict[int, float]:
+        """Oblicza siłę wiązania spójników w zdaniu, zwraca słownik indeksów spójników i ich sił wiązania"""
+        if self.precedenceBaked is None:
+            self.precedenceBaked = self._scanPrecedence(self)
         return self.precedenceBaked
 
-    # MARK: Usuwanie nawiasów
-
-    @staticmethod
-    def _fixPrecedence_reduceBrackets(precedenceBaked: dict[int, float], removed_brackets_count: int, lowest_unopened_left: int) -> dict[int, float]:
-        return apply_on_keys(
-                precedenceBaked, lambda x: x - (removed_brackets_count - lowest_unopened_left)
+    def _derivePrecedence(
+        self, start: int, stop: int, key_shift: int, lvl_shift: int
+    ) -> Optional[dict[int, float]]:
+        """
+        Przenosi obliczoną siłę wiązania spójników z przedziału [start, stop) do formuły pochodnej,
+        przesuwając indeksy o `key_shift`, a poziom zagnieżdżenia o `lvl_shift`.
+        Zwraca None, jeśli siła wiązania nie została jeszcze obliczona.
+        """
+        if self.precedenceBaked is None:
+            return None
+        return {
+            i + key_shift: self.calcPrecedenceVal(
+                self[i].type_, floor(val) + lvl_shift
             )
+            for i, val in self.precedenceBaked.items()
+            if start <= i < stop
+        }
+
+    def _repeatPrecedence(self, n: SupportsIndex) -> Optional[dict[int, float]]:
+        """Siła wiązania spójników w formule powtórzonej `n` razy"""
+        if self.precedenceBaked is None:
+            return None
+        balance = self.depthAt(len(self))
+        precedence: dict[int, float] = {}
+        for k in range(to_index(n)):
+            derived = self._derivePrecedence(0, len(self), k * len(self), k * balance)
+            if derived is not None:
+                precedence.update(derived)
+        return precedence
+
+    # MARK: Nawiasy
+
+    def brackets(self) -> BracketIndex:
+        """Oblicza indeks nawiasów w zdaniu: pary nawiasów oraz poziom zagnieżdżenia każdego tokenu"""
+        if self.bracketsBaked is None:
+            self.bracketsBaked = BracketIndex.build(self)
+        return self.bracketsBaked
+
+    def matchingBracket(self, index: int) -> int | None:
+        """Zwraca indeks nawiasu pasującego do nawiasu o podanym indeksie. None jeśli nie ma pary"""
+        match = self.brackets().match[index]
+        return None if match == -1 else match
+
+    def depthAt(self, index: int) -> int:
+        """Zwraca poziom zagnieżdżenia przed tokenem o podanym indeksie"""
+        return self.brackets().depth[index]
+
+    def outerBrackets(self) -> int:
+        """Zwraca liczbę par nawiasów obejmujących całe zdanie"""
+        match = self.brackets().match
+        last = len(self) - 1
+        count = 0
+        while count < last - count and match[count] == last - count:
+            count += 1
+        return count
+
+    def isWrapped(self) -> bool:
+        """Sprawdza, czy całe zdanie jest objęte nawiasem"""
+        return len(self) > 1 and self.brackets().match[0] == len(self) - 1
+
+    # MARK: Drzewo składniowe
+
+    def tree(self) -> SyntaxNode:
+        """
+        Zwraca drzewo składniowe zdania; budowane jednokrotnie, na niezmiennej kopii zdania.
+        Węzły przechowują główny spójnik, argumenty i zakres tokenów, więc rozkład zdania na podformuły
+        nie wymaga ponownego przeglądania tokenów.
+
+        :raises FormulaError: Zdanie nie jest poprawnie zbudowane
+        """
+        mistake = self.checkSyntax()
+        if mistake is not None:
+            raise FormulaError(mistake.default)
+        assert self.treeBaked is not None
+        return self.treeBaked
+
+    def checkSyntax(self) -> Optional[UserMistake]:
+        """Sprawdza poprawność zapisu zdania, zwraca informacje o pierwszym błędzie lub None; wynik jest zapamiętywany"""
+        if self.treeBaked is not None:
+            return None
+        if self.mistakeBaked is _NOT_COMPUTED:
+            result = parse(self.freeze())
+            self.treeBaked, self.mistakeBaked = result.tree, result.mistake
+            if self.precedenceBaked is None:
+                self.precedenceBaked = result.precedence
+        return self.mistakeBaked
+
+    # MARK: Usuwanie nawiasów
 
     def reduceBrackets(self) -> Formula:
-        """Minimalizuje nawiasy w zdaniu; zakłada poprawność ich rozmieszczenia"""
+        """
+        Minimalizuje nawiasy w zdaniu; zakłada poprawność ich rozmieszczenia.
+        Brakujące nawiasy są dopisywane, a obejmujące całe zdanie usuwane w tym samym wywołaniu.
+        """
 
         if len(self) < 2:
             return self[:]
 
-        reduced = self[:]
-
-        # Deleting brackets
-        removed_brackets_count = 0
-        while reduced[0] == Token.LEFT_BRACKET() and reduced[-1] == Token.RIGHT_BRACKET():
-            reduced = reduced[1:-1]
-            removed_brackets_count += 1
+        # Pary nawiasów obejmujące całe zdanie - ich wnętrze nigdy nie schodzi poniżej ich poziomu
+        outer = self.outerBrackets()
+        if outer:
+            return self[outer : len(self) - outer]
 
-        # Poszukuje
         # Wprowadzone aby obsługiwać przypadki typu "((A))or((A))"
-        opened_left = 0
-        opened_right = 0
-        lowest_unopened_left = 0
-        for i in reduced:
-            if i == Token.LEFT_BRACKET():
-                opened_left += 1
-            elif i == Token.RIGHT_BRACKET():
-                opened_right += 1
-            else:
-                continue
-            unopened_left =  opened_right - opened_left
-            lowest_unopened_left = max(lowest_unopened_left, unopened_left)
-
-        unclosed_right = opened_left - opened_right + lowest_unopened_left
-        return Formula(
-            lowest_unopened_left * [Token.LEFT_BRACKET()] + reduced + unclosed_right * [Token.RIGHT_BRACKET()],
-            self.formal_system, self._fixPrecedence_reduceBrackets(self.precedenceBaked, removed_brackets_count, lowest_unopened_left)
+        index = self.brackets()
+        lowest_unopened_left = -index.lowest
+        unclosed_right = index.depth[-1] + lowest_unopened_left
+        if not lowest_unopened_left and not unclosed_right:
+            return self[:]
+        completed = Formula(
+            lowest_unopened_left * [LEFT_BRACKET] + self + unclosed_right * [RIGHT_BRACKET],
+            self.formal_system,
+            self._derivePrecedence(0, len(self), lowest_unopened_left, lowest_unopened_left),
         )
+        # Dopisane nawiasy mogą objąć całe zdanie - usuwamy je od razu, bez ponownego wywołania
+        outer = completed.outerBrackets()
+        return completed[outer : len(completed) - outer] if outer else completed
+
+    def minimal(self) -> FrozenFormula:
+        """
+        Zwraca zdanie zapisane z minimalną liczbą nawiasów, wyznaczoną ze struktury zdania.
+        Wynik jest zapamiętywany w drzewie składniowym, podobnie jak zapisy jego podformuł.
+
+        :raises FormulaError: Zdanie nie jest poprawnie zbudowane
+        """
+        return self.tree().minimal()
 
     # MARK: Operacje na zdaniu
 
@@ -149,33 +323,24 @@ class Formula(list[Token]):
         Zwraca indeks głównego spójnika w zdaniu. None jeśli zdanie jest literałem.
         W przypadku równych sił wiązania zwraca indeks najbardziej na prawo, z wyjątkiem jednoargumentowych spójników
         """
-        if not self.precedence():
-            return None
-        
-        min_prec = min(self.precedence().values())
-        min_prec_indexes = [i for i, j in self.precedence().items() if j == min_prec]
-        
-        # Spójniki jednoargumentowe jako jedyne działają "od prawej"
-        if all(self[i].type_ in self.formal_system.unary_operators for i in min_prec_indexes):
-            return min(min_prec_indexes)
-        else:
-            return max(min_prec_indexes)
+        return pick_main_connective(
+            self.precedence(),
+            lambda i: self[i].type_,
+            self.formal_system.spec.unary_types,
+        )
 
     def splitByIndex(self, index: int) -> tuple[Formula | None, Formula | None]:
         """Dzieli zdanie na dwa na podstawie podanego indeksu. Zwraca lewą i prawą część"""
-        p_left, p_right = slice_dict_by_key(self.precedenceBaked, index)
+        # Części dziedziczą siłę wiązania spójników, więc jest ona liczona tylko raz
+        self.precedence()
         left = (
-            Formula(self[:index], self.formal_system, p_left)
-            .reduceBrackets()
-            .reduceBrackets() # Podwójne wywołanie najpierw normalizuje nawiasy, a potem usuwa zbędne
-            if self[:index]
+            self[:index].reduceBrackets()
+            if index > 0
             else None
         )
         right = (
-            Formula(self[index + 1 :], self.formal_system, p_right)
-            .reduceBrackets()
-            .reduceBrackets() # Podwójne wywołanie najpierw normalizuje nawiasy, a potem usuwa zbędne
-            if self[index + 1 :]
+            self[index + 1 :].reduceBrackets()
+            if index + 1 < len(self)
             else None
         )
         return left, right
@@ -194,52 +359,123 @@ class Formula(list[Token]):
         :return: Główny spójnik oraz powstałe zdania; None jeśli dane zdanie nie istnieje
         :rtype: tuple[Optional[str], Optional[tuple[Formula, Formula]]]
         """
+        # Poprawne zdania są rozkładane na podstawie drzewa składniowego - części są kopiowane z jego widoków
+        if self.checkSyntax() is None:
+            connective, (left, right) = self.componentsView()
+            return connective, (_materialize(left), _materialize(right))
+
+        self.precedence()
         sentence = self.reduceBrackets()
-        con_index = self.getMainConnective()
+        con_index = sentence.getMainConnective()
         if con_index is None:
             return None, (None, None)
         return sentence[con_index], sentence.splitByIndex(con_index)
 
-    def removeMainUnary(self, selected_unary_operators: Optional[list[str]] = None) -> Formula:
+    def componentsView(
+        self,
+    ) -> tuple[Token | None, tuple[Union[FormulaView, Formula, None], Union[FormulaView, Formula, None]]]:
+        """
+        Działa jak `getComponents`, ale dla poprawnych zdań zwraca części jako widoki (`FormulaView`) na niezmienną
+        kopię zdania - bez kopiowania tokenów, a ich dalszy rozkład korzysta z drzewa składniowego.
+        """
+        if self.checkSyntax() is None:
+            assert self.treeBaked is not None
+            return self.treeBaked.getComponents()
+        return self.getComponents()
+
+    def removeMainUnary(
+        self, selected_unary_operators: Optional[list[str]] = None
+    ) -> Union[Formula, FormulaView]:
         """
         Usuwa spójniki jednoargumentowe obejmujące całe zdanie
         """
-        selected_unary_operators = selected_unary_operators or self.formal_system.unary_operators
-        conn, new = self.getComponents()
-        if not conn or conn.type_ not in selected_unary_operators:
-            return self.reduceBrackets()
-        else:
-            if new[1] is None:
-                raise FormulaError("Unary operator without argument")
-            return new[1].removeMainUnary(selected_unary_operators)
+        return _removeMainUnary(self, selected_unary_operators or self.formal_system.spec.unary_types)
 
     def combine(self, x: list[Token]) -> Formula:
         if not all(isinstance(i, Token) for i in x):
             raise FormulaError("List must contain only Token objects")
-        return Formula(super().__add__(x), self.formal_system)
+        precedence = None
+        if self.precedenceBaked is not None:
+            precedence = self.precedenceBaked | {
+                i + len(self): val
+                for i, val in self._scanPrecedence(x, self.depthAt(len(self))).items()
+            }
+        return Formula(super().__add__(x), self.formal_system, precedence)
 
     # MARK: Overwriting list methods
 
+    def _invalidate(self) -> None:
+        """Zapomina siłę wiązania, indeks nawiasów i drzewo składniowe po modyfikacji zdania"""
+        self.precedenceBaked = None
+        self.bracketsBaked = None
+        self.treeBaked = None
+        self.mistakeBaked = _NOT_COMPUTED
+
+    __setitem__ = _invalidating(list.__setitem__)
+    __delitem__ = _invalidating(list.__delitem__)
+    __iadd__ = _invalidating(list.__iadd__)
+    __imul__ = _invalidating(list.__imul__)
+    append = _invalidating(list.append)
+    extend = _invalidating(list.extend)
+    insert = _invalidating(list.insert)
+    pop = _invalidating(list.pop)
+    remove = _invalidating(list.remove)
+    clear = _invalidating(list.clear)
+    sort = _invalidating(list.sort)
+    reverse = _invalidating(list.reverse)
+
     def __hash__(self):
         return hash(" ".join(self.getUnique()))
 
     def __eq__(self, o) -> bool:
         if isinstance(o, Formula):
             return self.getUnique() == o.getUnique()
+        elif isinstance(o, FormulaView):
+            return o == self
         else:
             return list(self) == o
 
     def __mul__(self, n: SupportsIndex) -> Formula:
-        return Formula(super().__mul__(n), self.formal_system)
+        return Formula(super().__mul__(n), self.formal_system, self._repeatPrecedence(n))
 
     def copy(self) -> Formula:
         return Formula(super().copy(), self.formal_system, self.precedenceBaked)
 
+    def view(self) -> FormulaView:
+        """Zwraca widok na całe zdanie; podformuły wyznaczane z widoku nie kopiują tokenów"""
+        return FormulaView(self.freeze())
+
+    def _record(self, system: Optional[str]) -> codec.Record:
+        levels = None
+        if self.precedenceBaked is not None:
+            levels = {i: floor(val) for i, val in self.precedenceBaked.items()}
+        return codec.Record(list(self), system, levels)
+
+    def __reduce__(self):
+        name = formal_system_name(self.formal_system)
+        if name is None:
+            # Niezarejestrowany system formalny jest serializowany razem z formułą
+            return _loadFormula, (type(self), codec.encode([self._record(None)]), self.formal_system)
+        return _loadFormula, (type(self), codec.encode([self._record(name)]))
+
+    def __copy__(self) -> Formula:
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Formula:
+        # Tokeny są internowane, a system formalny jest współdzielony - kopia listy wystarcza
+        return self.copy()
+
+    def freeze(self) -> FrozenFormula:
+        """Zwraca niezmienną kopię zdania"""
+        frozen = FrozenFormula(self, self.formal_system, self.precedenceBaked)
+        frozen.bracketsBaked = self.bracketsBaked
+        return frozen
+
     def __repr__(self) -> str:
         return f'Formula[{str(self)}]'
 
     def __rmul__(self, n: SupportsIndex) -> Formula:
-        return Formula(super().__rmul__(n), self.formal_system)
+        return Formula(super().__rmul__(n), self.formal_system, self._repeatPrecedence(n))
 
     def __str__(self) -> str:
         return " ".join(self.getLexems())
@@ -250,6 +486,506 @@ class Formula(list[Token]):
     def __getitem__(self, key: slice) -> Formula: ...
     def __getitem__(self, key):
         if isinstance(key, slice):
-            return Formula(super().__getitem__(key), self.formal_system)
+            start, stop, step = key.indices(len(self))
+            precedence = None
+            if step == 1 and self.precedenceBaked is not None:
+                stop = max(start, stop)
+                offset = self.depthAt(start)
+                precedence = self._derivePrecedence(start, stop, -start, -offset)
+            return Formula(super().__getitem__(key), self.formal_system, precedence)
         elif isinstance(key, int):
             return super().__getitem__(key)
+
+
+_NOT_COMPUTED = object()
+
+
+def _immutable(name: str) -> Callable[..., Any]:
+    def method(self, *args, **kwargs):
+        raise FormulaError(f"FrozenFormula is immutable, '{name}' is not supported")
+
+    method.__name__ = name
+    return method
+
+
+class FrozenFormula(Formula):
+    """
+    Niezmienna wersja `Formula`.
+    Hash, zapis unikalny, zapis tekstowy oraz indeks głównego spójnika są liczone przy pierwszym użyciu
+    i zapamiętywane, więc wielokrotne porównania i wyszukiwania w historii nie budują ich od nowa.
+    """
+
+    __slots__ = ("_hash", "_unique", "_str", "_mainConnective")
+
+    def __init__(
+        self,
+        token_list: list[Token],
+        formal_system: FormalSystem,
+        precedenceBaked: Optional[dict[int, float]] = None,
+    ):
+        super().__init__(token_list, formal_system, precedenceBaked)
+        self._hash: Optional[int] = None
+        self._unique: Optional[tuple[str, ...]] = None
+        self._str: Optional[str] = None
+        self._mainConnective: Any = _NOT_COMPUTED
+
+    def uniqueKey(self) -> tuple[str, ...]:
+        if self._unique is None:
+            self._unique = tuple(super().getUnique())
+        return self._unique
+
+    def getUnique(self) -> list[str]:
+        return list(self.uniqueKey())
+
+    def getMainConnective(self) -> int | None:
+        if self._mainConnective is _NOT_COMPUTED:
+            self._mainConnective = super().getMainConnective()
+        return self._mainConnective
+
+    def freeze(self) -> FrozenFormula:
+        return self
+
+    def copy(self) -> FrozenFormula:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> FrozenFormula:
+        return self
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(" ".join(self.uniqueKey()))
+        return self._hash
+
+    def __eq__(self, o) -> bool:
+        if isinstance(o, FrozenFormula):
+            return self is o or (hash(self) == hash(o) and self.uniqueKey() == o.uniqueKey())
+        elif isinstance(o, (Formula, FormulaView)):
+            return self.uniqueKey() == o.uniqueKey()
+        else:
+            return list(self) == o
+
+    def __str__(self) -> str:
+        if self._str is None:
+            self._str = super().__str__()
+        return self._str
+
+    def __repr__(self) -> str:
+        return f'FrozenFormula[{str(self)}]'
+
+    __setitem__ = _immutable("__setitem__")
+    __delitem__ = _immutable("__delitem__")
+    __iadd__ = _immutable("__iadd__")
+    __imul__ = _immutable("__imul__")
+    append = _immutable("append")
+    extend = _immutable("extend")
+    insert = _immutable("insert")
+    pop = _immutable("pop")
+    remove = _immutable("remove")
+    clear = _immutable("clear")
+    sort = _immutable("sort")
+    reverse = _immutable("reverse")
+
+
+def _copyOnWrite(name: str) -> Callable[..., Any]:
+    """Wykonuje metodę modyfikującą na kopii fragmentu i przepina widok na zmienioną kopię"""
+
+    def method(self: FormulaView, *args, **kwargs):
+        formula = self.materialize()
+        result = getattr(formula, name)(*args, **kwargs)
+        self._rebind(formula.freeze())
+        # Operatory przypisania zwracają zmieniany obiekt, czyli widok
+        return self if result is formula else result
+
+    method.__name__ = name
+    return method
+
+
+class FormulaView(Sequence[Token]):
+    """
+    Widok na fragment `start:stop` niezmiennego zdania.
+
+    Wycinanie, usuwanie nawiasów obejmujących i rozkład na podformuły przesuwają jedynie granice widoku,
+    więc nie kopiują tokenów. Kopia powstaje dopiero przy `materialize`, lub gdy trzeba dopisać brakujące
+    nawiasy (`reduceBrackets` na fragmencie z niesparowanymi nawiasami).
+    Metody modyfikujące działają jak w `Formula`, ale najpierw kopiują fragment (copy-on-write) - bufor
+    i inne widoki na niego pozostają bez zmian.
+    """
+
+    __slots__ = ("buffer", "start", "stop", "_precedence", "_node", "_brackets", "_mistake")
+
+    def __init__(
+        self,
+        buffer: FrozenFormula,
+        start: int = 0,
+        stop: Optional[int] = None,
+        node: Optional[SyntaxNode] = None,
+    ) -> None:
+        self.buffer = buffer
+        self.start = start
+        self.stop = len(buffer) if stop is None else stop
+        self._precedence: Optional[dict[int, float]] = None
+        # Węzeł drzewa składniowego odpowiadający widokowi, jeśli widok powstał z drzewa lub je zbudował
+        self._node = node
+        self._brackets: Optional[BracketIndex] = None
+        self._mistake: Any = _NOT_COMPUTED
+
+    @property
+    def formal_system(self) -> FormalSystem:
+        return self.buffer.formal_system
+
+    def _coversBuffer(self) -> bool:
+        return self.start == 0 and self.stop == len(self.buffer)
+
+    def _rebind(self, buffer: FrozenFormula) -> None:
+        """Przepina widok na całość nowego bufora i zapomina wyniki obliczeń"""
+        self.buffer = buffer
+        self.start, self.stop = 0, len(buffer)
+        self._precedence = None
+        self._node = None
+        self._brackets = None
+        self._mistake = _NOT_COMPUTED
+
+    def materialize(self) -> Formula:
+        """Zwraca modyfikowalną kopię fragmentu"""
+        return self.buffer[self.start : self.stop]
+
+    def freeze(self) -> FrozenFormula:
+        if self._coversBuffer():
+            return self.buffer
+        return self.materialize().freeze()
+
+    def view(self) -> FormulaView:
+        return self
+
+    def copy(self) -> FormulaView:
+        """Zwraca nowy widok na ten sam fragment; dzięki copy-on-write nie kopiuje tokenów"""
+        copied = FormulaView(self.buffer, self.start, self.stop, self._node)
+        copied._precedence = self._precedence
+        return copied
+
+    def combine(self, x: list[Token]) -> Formula:
+        return self.materialize().combine(x)
+
+    # MARK: Getters
+
+    def getTypes(self) -> list[str]:
+        """Zwraca listę kolejno występujących typów w zdaniu"""
+        return [i.type_ for i in self]
+
+    def getLexems(self) -> list[str]:
+        """Zwraca ze zdania leksemy użyte przez użytkownika"""
+        return [i.lexem for i in self]
+
+    def getItems(self) -> list[tuple[str, str]]:
+        """Zwraca listę kolejno występujących par typów i leksemów"""
+        return [(i.type_, i.lexem) for i in self]
+
+    def getUnique(self) -> list[str]:
+        """Zwraca zapis unikalny dla tego zdania; odporne na różnice w formacie zapisu"""
+        return [i.type_ if i.type_ in UNIQUE_BY_TYPE else i.lexem for i in self]
+
+    def uniqueKey(self) -> tuple[str, ...]:
+        """Zwraca zapis unikalny w postaci nadającej się na klucz słownika"""
+        return tuple(self.getUnique())
+
+    def isLiteral(self) -> bool:
+        main = self.getMainConnective()
+        return main is None or (main == 0 and len(self.precedence()) == 1)
+
+    # MARK: Kolejność wykonywania działań
+
+    def precedence(self) -> dict[int, float]:
+        """Siła wiązania spójników fragmentu, wyznaczona z indeksów bufora"""
+        if self._precedence is None:
+            baked = self.buffer.precedence()
+            offset = self.buffer.depthAt(self.start)
+            calc = self.buffer.calcPrecedenceVal
+            self._precedence = {
+                i - self.start: calc(self.buffer[i].type_, floor(baked[i]) - offset)
+                for i in range(self.start, self.stop)
+                if i in baked
+            }
+        return self._precedence
+
+    def getMainConnective(self) -> int | None:
+        """
+        Zwraca indeks głównego spójnika w zdaniu. None jeśli zdanie jest literałem.
+        W przypadku równych sił wiązania zwraca indeks najbardziej na prawo, z wyjątkiem jednoargumentowych spójników
+        """
+        return pick_main_connective(
+            self.precedence(),
+            lambda i: self.buffer[self.start + i].type_,
+            self.formal_system.spec.unary_types,
+        )
+
+    # MARK: Nawiasy
+
+    def brackets(self) -> BracketIndex:
+        """Zwraca indeks nawiasów fragmentu; widok na całe zdanie korzysta z indeksu bufora"""
+        if self._coversBuffer():
+            return self.buffer.brackets()
+        if self._brackets is None:
+            self._brackets = BracketIndex.build(self)
+        return self._brackets
+
+    def depthAt(self, index: int) -> int:
+        """Zwraca poziom zagnieżdżenia przed tokenem o podanym indeksie"""
+        return self.buffer.depthAt(self.start + index) - self.buffer.depthAt(self.start)
+
+    def matchingBracket(self, index: int) -> int | None:
+        """Zwraca indeks nawiasu pasującego do nawiasu o podanym indeksie. None jeśli nie ma pary w widoku"""
+        match = self.buffer.matchingBracket(self.start + index)
+        if match is None or not self.start <= match < self.stop:
+            return None
+        return match - self.start
+
+    def outerBrackets(self) -> int:
+        """Zwraca liczbę par nawiasów obejmujących cały fragment"""
+        match = self.buffer.brackets().match
+        first, last = self.start, self.stop - 1
+        count = 0
+        while first + count < last - count and match[first + count] == last - count:
+            count += 1
+        return count
+
+    def isWrapped(self) -> bool:
+        """Sprawdza, czy cały fragment jest objęty nawiasem"""
+        return len(self) > 1 and self.matchingBracket(0) == len(self) - 1
+
+    def reduceBrackets(self) -> Union[FormulaView, Formula]:
+        """Minimalizuje nawiasy we fragmencie; zakłada poprawność ich rozmieszczenia"""
+        if len(self) < 2:
+            return self
+
+        outer = self.outerBrackets()
+        if outer:
+            return FormulaView(self.buffer, self.start + outer, self.stop - outer)
+
+        if self.buffer.brackets().isBalanced(self.start, self.stop):
+            return self
+        # Brakujące nawiasy wymagają kopii
+        return self.materialize().reduceBrackets()
+
+    # MARK: Drzewo składniowe
+
+    def tree(self) -> SyntaxNode:
+        """
+        Zwraca drzewo składniowe fragmentu, analogicznie do `Formula.tree`
+
+        :raises FormulaError: Fragment nie jest poprawnie zbudowany
+        """
+        mistake = self.checkSyntax()
+        if mistake is not None:
+            raise FormulaError(mistake.default)
+        assert self._node is not None
+        return self._node
+
+    def checkSyntax(self) -> Optional[UserMistake]:
+        """Sprawdza poprawność zapisu fragmentu, zwraca informacje o pierwszym błędzie lub None; wynik jest zapamiętywany"""
+        if self._node is not None:
+            return None
+        if self._mistake is _NOT_COMPUTED:
+            if self._coversBuffer():
+                self._mistake = self.buffer.checkSyntax()
+                self._node = self.buffer.treeBaked
+            else:
+                # Drzewo powstaje na osobnym widoku, którego nie zmienia copy-on-write tego obiektu
+                result = parse(FormulaView(self.buffer, self.start, self.stop))
+                self._mistake, self._node = result.mistake, result.tree
+        return self._mistake
+
+    def minimal(self) -> FrozenFormula:
+        """
+        Zwraca fragment zapisany z minimalną liczbą nawiasów, analogicznie do `Formula.minimal`
+
+        :raises FormulaError: Fragment nie jest poprawnie zbudowany
+        """
+        return self.tree().minimal()
+
+    # MARK: Operacje na zdaniu
+
+    def splitByIndex(
+        self, index: int
+    ) -> tuple[Union[FormulaView, Formula, None], Union[FormulaView, Formula, None]]:
+        """Dzieli fragment na dwa na podstawie podanego indeksu. Zwraca lewą i prawą część"""
+        left = (
+            FormulaView(self.buffer, self.start, self.start + index).reduceBrackets()
+            if index > 0
+            else None
+        )
+        right = (
+            FormulaView(self.buffer, self.start + index + 1, self.stop).reduceBrackets()
+            if index + 1 < len(self)
+            else None
+        )
+        return left, right
+
+    def getComponents(
+        self,
+    ) -> tuple[Token | None, tuple[Union[FormulaView, Formula, None], Union[FormulaView, Formula, None]]]:
+        """Wyznacza główny spójnik oraz dzieli fragment na dwie części, analogicznie do `Formula.getComponents`"""
+        if self.checkSyntax() is None:
+            assert self._node is not None
+            return self._node.getComponents()
+        sentence = self.reduceBrackets()
+        con_index = sentence.getMainConnective()
+        if con_index is None:
+            return None, (None, None)
+        return sentence[con_index], sentence.splitByIndex(con_index)
+
+    def removeMainUnary(
+        self, selected_unary_operators: Optional[list[str]] = None
+    ) -> Union[FormulaView, Formula]:
+        """
+        Usuwa spójniki jednoargumentowe obejmujące cały fragment
+        """
+        return _removeMainUnary(self, selected_unary_operators or self.formal_system.spec.unary_types)
+
+    # MARK: Sequence
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __iter__(self) -> Iterator[Token]:
+        return islice(self.buffer, self.start, self.stop)
+
+    @overload
+    def __getitem__(self, key: int) -> Token: ...
+    @overload
+    def __getitem__(self, key: slice) -> FormulaView: ...
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return self.materialize()[key]
+            return FormulaView(self.buffer, self.start + start, self.start + max(start, stop))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("FormulaView index out of range")
+        return self.buffer[self.start + key]
+
+    def __mul__(self, n: SupportsIndex) -> Formula:
+        return self.materialize() * n
+
+    def __rmul__(self, n: SupportsIndex) -> Formula:
+        return n * self.materialize()
+
+    # MARK: Copy-on-write
+
+    __setitem__ = _copyOnWrite("__setitem__")
+    __delitem__ = _copyOnWrite("__delitem__")
+    __iadd__ = _copyOnWrite("__iadd__")
+    __imul__ = _copyOnWrite("__imul__")
+    append = _copyOnWrite("append")
+    extend = _copyOnWrite("extend")
+    insert = _copyOnWrite("insert")
+    pop = _copyOnWrite("pop")
+    remove = _copyOnWrite("remove")
+    clear = _copyOnWrite("clear")
+    sort = _copyOnWrite("sort")
+    reverse = _copyOnWrite("reverse")
+
+    def __hash__(self):
+        return hash(" ".join(self.getUnique()))
+
+    def __eq__(self, o) -> bool:
+        if isinstance(o, (Formula, FormulaView)):
+            return self.uniqueKey() == o.uniqueKey()
+        else:
+            return list(self) == o
+
+    def __str__(self) -> str:
+        return " ".join(self.getLexems())
+
+    def __repr__(self) -> str:
+        return f'FormulaView[{str(self)}]'
+
+
+def _materialize(part: Union[Formula, FormulaView, None]) -> Optional[Formula]:
+    """Zamienia widok na modyfikowalną kopię; `Formula` i None zwraca bez zmian"""
+    return part.materialize() if isinstance(part, FormulaView) else part
+
+
+# MARK: Spójniki jednoargumentowe
+
+
+def _removeMainUnary(
+    formula: Union[Formula, FormulaView], selected_unary_operators: Collection[str]
+) -> Union[Formula, FormulaView]:
+    """
+    Zdejmuje kolejne spójniki główne bez rekurencji. Dla poprawnych zdań schodzi po drzewie składniowym,
+    dzięki czemu długie łańcuchy negacji są obsługiwane w czasie liniowym.
+    """
+    root = formula.tree() if formula.checkSyntax() is None else None
+    if root is not None:
+        node = root
+        while (token := node.token) is not None and token.type_ in selected_unary_operators:
+            assert node.right is not None
+            node = node.right
+        if node is root:
+            return formula.reduceBrackets()
+        return node.toFormula().reduceBrackets()
+
+    current = formula
+    while True:
+        conn, (_, right) = current.getComponents()
+        if not conn or conn.type_ not in selected_unary_operators:
+            return current.reduceBrackets()
+        if right is None:
+            raise FormulaError("Unary operator without argument")
+        current = right
+
+
+# MARK: Serializacja
+
+
+def _fromRecord(
+    record: codec.Record,
+    cls: Optional[type[Formula]] = None,
+    formal_system: Optional[FormalSystem] = None,
+) -> Formula:
+    tokens, system, levels = record
+    if formal_system is None:
+        if system is None:
+            raise FormulaError("Serialised formula doesn't name its formal system")
+        formal_system = get_formal_system(system)
+    formula = (cls or Formula)(tokens, formal_system)
+    if levels is not None:
+        try:
+            formula.precedenceBaked = {
+                i: formula.calcPrecedenceVal(tokens[i].type_, lvl) for i, lvl in levels.items()
+            }
+        except (IndexError, KeyError):
+            raise FormulaError("Corrupted formula data") from None
+    return formula
+
+
+def _loadFormula(
+    cls: type[Formula], data: bytes, formal_system: Optional[FormalSystem] = None
+) -> Formula:
+    (record,) = codec.decode(data)
+    return _fromRecord(record, cls, formal_system)
+
+
+def dumps(formulas: Iterable[Formula]) -> bytes:
+    """
+    Zapisuje formuły w zwartym formacie binarnym (`core.codec`) ze wspólną tablicą symboli.
+    Systemy formalne są zapisywane jako nazwy z rejestru, a obliczona siła wiązania spójników jest zachowywana.
+
+    :raises FormulaError: System formalny formuły nie jest zarejestrowany
+    """
+    records = []
+    for formula in formulas:
+        name = formal_system_name(formula.formal_system)
+        if name is None:
+            raise FormulaError(
+                f"Formal system {type(formula.formal_system).__name__} is not registered"
+            )
+        records.append(formula._record(name))
+    return codec.encode(records)
+
+
+def loads(data: bytes) -> list[Formula]:
+    """Odczytuje formuły zapisane przez `dumps`"""
+    return [_fromRecord(i) for i in codec.decode(data)]
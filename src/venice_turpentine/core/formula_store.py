@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Union
+
+from .formula import Formula, FormulaView, FrozenFormula
+from .token import Token
+
+
+class FormulaStore(object):
+    """
+    Magazyn współdzielonych formuł (hash-consing).
+
+    Formuły o tym samym zapisie unikalnym (`Formula.getUnique`) są reprezentowane przez jedną kanoniczną
+    instancję o stałym identyfikatorze liczbowym. Równość formuł z magazynu sprowadza się do porównania
+    identyfikatorów, a pamięć rośnie z liczbą różnych podformuł, a nie liczbą ich wystąpień.
+    Kanoniczne instancje są niezmienne (`FrozenFormula`).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._ids: dict[tuple[str, ...], int] = {}
+        self._formulas: list[FrozenFormula] = []
+        self._components: dict[int, tuple[Token | None, tuple[FrozenFormula | None, FrozenFormula | None]]] = {}
+
+    @staticmethod
+    def _key(formula: Union[Formula, FormulaView]) -> tuple[str, ...]:
+        return formula.uniqueKey()
+
+    def intern(self, formula: Union[Formula, FormulaView]) -> FrozenFormula:
+        """Zwraca kanoniczną instancję formuły, w razie potrzeby dodając ją do magazynu"""
+        return self._formulas[self.get_id(formula)]
+
+    def get_id(self, formula: Union[Formula, FormulaView]) -> int:
+        """Zwraca identyfikator formuły, w razie potrzeby dodając ją do magazynu"""
+        key = self._key(formula)
+        try:
+            return self._ids[key]
+        except KeyError:
+            # Zamrożona kopia chroni kanoniczną instancję przed późniejszą modyfikacją oryginału
+            self._formulas.append(formula.freeze())
+            self._ids[key] = len(self._formulas) - 1
+            return self._ids[key]
+
+    def find_id(self, formula: Union[Formula, FormulaView]) -> int | None:
+        """Zwraca identyfikator formuły lub None, jeśli nie ma jej w magazynie"""
+        return self._ids.get(self._key(formula))
+
+    def get_ids(self, formulas: Iterable[Union[Formula, FormulaView]]) -> set[int]:
+        """Zwraca zbiór identyfikatorów formuł, np. do szybkiego sprawdzania historii"""
+        return {self.get_id(i) for i in formulas}
+
+    def components(
+        self, formula: Union[Formula, FormulaView]
+    ) -> tuple[Token | None, tuple[FrozenFormula | None, FrozenFormula | None]]:
+        """
+        Zwraca wynik `getComponents` z kanonicznymi instancjami podformuł.
+        Rozkład każdej różnej formuły jest liczony tylko raz.
+        """
+        formula_id = self.get_id(formula)
+        try:
+            return self._components[formula_id]
+        except KeyError:
+            pass
+        connective, (left, right) = self._formulas[formula_id].getComponents()
+        result = connective, (
+            None if left is None else self.intern(left),
+            None if right is None else self.intern(right),
+        )
+        self._components[formula_id] = result
+        return result
+
+    def __getitem__(self, formula_id: int) -> FrozenFormula:
+        return self._formulas[formula_id]
+
+    def __contains__(self, formula: object) -> bool:
+        return isinstance(formula, (Formula, FormulaView)) and self.find_id(formula) is not None
+
+    def __len__(self) -> int:
+        return len(self._formulas)
+
+    def __iter__(self) -> Iterator[FrozenFormula]:
+        return iter(self._formulas)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Iterator, Optional, Sequence, TypeVar, Union, overload
+
+from ..formal_systems import FormalSystem
+from .formula import UNIQUE_BY_TYPE, Formula, pick_main_connective
+from .symbols import SymbolTable
+from .token import Token
+
+T = TypeVar("T")
+
+
+class ColumnView(Sequence[T]):
+    """Widok tylko do odczytu na kolumnę liczb dekodowaną przy dostępie"""
+
+    __slots__ = ("_column", "_decode")
+
+    def __init__(self, column: array, decode: Callable[[int], T]) -> None:
+        self._column = column
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._column)
+
+    @overload
+    def __getitem__(self, key: int) -> T: ...
+    @overload
+    def __getitem__(self, key: slice) -> list[T]: ...
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._decode(i) for i in self._column[key]]
+        return self._decode(self._column[key])
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self._decode, self._column)
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, Sequence):
+            return len(self) == len(o) and all(i == j for i, j in zip(self, o))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class PackedFormula(Sequence[Token]):
+    """
+    Formuła przechowywana jako dwie kolumny liczb (typów i leksemów) kodowanych tablicą symboli leksera.
+    Gettery zwracają widoki na kolumny, a porównania, hashowanie i kolejność działań operują na liczbach.
+    """
+
+    __slots__ = ("types", "lexems", "symbols", "formal_system", "_unique", "_hash", "_precedence")
+
+    def __init__(
+        self,
+        types: array,
+        lexems: array,
+        symbols: SymbolTable,
+        formal_system: FormalSystem,
+    ) -> None:
+        if len(types) != len(lexems):
+            raise ValueError("Type and lexem columns must have the same length")
+        self.types = types
+        self.lexems = lexems
+        self.symbols = symbols
+        self.formal_system = formal_system
+        self._unique: Optional[bytes] = None
+        self._hash: Optional[int] = None
+        self._precedence: Optional[dict[int, float]] = None
+
+    @classmethod
+    def from_tokens(
+        cls, tokens: Sequence[Token], symbols: SymbolTable, formal_system: FormalSystem
+    ) -> PackedFormula:
+        return cls(*symbols.encode(tokens), symbols, formal_system)
+
+    @classmethod
+    def from_formula(cls, formula: Formula, symbols: SymbolTable) -> PackedFormula:
+        return cls.from_tokens(formula, symbols, formula.formal_system)
+
+    def unpack(self) -> Formula:
+        """Zwraca formułę opartą na liście tokenów"""
+        return Formula(list(self), self.formal_system)
+
+    @property
+    def nbytes(self) -> int:
+        """Rozmiar kolumn w bajtach"""
+        return (len(self.types) + len(self.lexems)) * self.types.itemsize
+
+    # MARK: Getters
+
+    def getTypes(self) -> ColumnView[str]:
+        """Zwraca widok na kolejno występujące typy w zdaniu"""
+        return ColumnView(self.types, self.symbols.types.__getitem__)
+
+    def getLexems(self) -> ColumnView[str]:
+        """Zwraca widok na leksemy użyte przez użytkownika"""
+        return ColumnView(self.lexems, self.symbols.lexems.__getitem__)
+
+    def getItems(self) -> list[tuple[str, str]]:
+        """Zwraca listę kolejno występujących par typów i leksemów"""
+        return list(zip(self.getTypes(), self.getLexems()))
+
+    def getUnique(self) -> list[str]:
+        """Zwraca zapis unikalny dla tego zdania; odporne na różnice w formacie zapisu"""
+        types, lexems = self.symbols.types, self.symbols.lexems
+        return [
+            types[t] if types[t] in UNIQUE_BY_TYPE else lexems[lex]
+            for t, lex in zip(self.types, self.lexems)
+        ]
+
+    def uniqueKey(self) -> bytes:
+        """Zwraca zapis unikalny zakodowany liczbowo; ważny w obrębie jednej tablicy symboli"""
+        if self._unique is None:
+            types = self.symbols.types
+            key = array("I")
+            for t, lex in zip(self.types, self.lexems):
+                # Najniższy bit odróżnia identyfikatory typów od identyfikatorów leksemów
+                key.append(t << 1 | 1 if types[t] in UNIQUE_BY_TYPE else lex << 1)
+            self._unique = key.tobytes()
+        return self._unique
+
+    # MARK: Kolejność wykonywania działań
+
+    def precedence(self) -> dict[int, float]:
+        """Oblicza siłę wiązania spójników w zdaniu, zwraca słownik indeksów spójników i ich sił wiązania"""
+        if self._precedence is not None:
+            return self._precedence
+
+        levels = self.symbols.connective_levels(self.formal_system)
+        left = self.symbols.type_id("(")
+        right = self.symbols.type_id(")")
+        precedence = {}
+        lvl = 0
+        for i, t in enumerate(self.types):
+            if t == left:
+                lvl += 1
+            elif t == right:
+                lvl -= 1
+            elif (val := levels[t]) is not None:
+                precedence[i] = lvl + val
+
+        self._precedence = precedence
+        return precedence
+
+    def getMainConnective(self) -> int | None:
+        """
+        Zwraca indeks głównego spójnika w zdaniu. None jeśli zdanie jest literałem.
+        W przypadku równych sił wiązania zwraca indeks najbardziej na prawo, z wyjątkiem jednoargumentowych spójników
+        """
+        types = self.symbols.types
+        return pick_main_connective(
+            self.precedence(),
+            lambda i: types[self.types[i]],
+            self.formal_system.spec.unary_types,
+        )
+
+    # MARK: Sequence
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __iter__(self) -> Iterator[Token]:
+        return map(self.symbols.decode_token, self.types, self.lexems)
+
+    @overload
+    def __getitem__(self, key: int) -> Token: ...
+    @overload
+    def __getitem__(self, key: slice) -> PackedFormula: ...
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return PackedFormula(
+                self.types[key], self.lexems[key], self.symbols, self.formal_system
+            )
+        return self.symbols.decode_token(self.types[key], self.lexems[key])
+
+    def __hash__(self) -> int:
+        # Zgodne z hashem z innych tablic symboli, więc liczone na napisach, ale tylko raz
+        if self._hash is None:
+            self._hash = hash(" ".join(self.getUnique()))
+        return self._hash
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, PackedFormula):
+            if o.symbols is self.symbols:
+                return self.uniqueKey() == o.uniqueKey()
+            return self.getUnique() == o.getUnique()
+        return list(self) == o
+
+    def __str__(self) -> str:
+        return " ".join(self.getLexems())
+
+    def __repr__(self) -> str:
+        return f"PackedFormula[{str(self)}]"
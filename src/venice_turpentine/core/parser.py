@@ -0,0 +1,166 @@
+"""
+Jednoprzebiegowy parser zdań (Pratt / wspinaczka po sile wiązania z jawnym stosem).
+
+W jednym liniowym przebiegu sprawdza poprawność składni, oblicza siłę wiązania spójników
+(jak `Formula.precedence`) oraz buduje drzewo składniowe. Nie używa rekurencji, więc głębokość
+zagnieżdżenia nie jest ograniczona limitem rekurencji interpretera.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from ..exceptions import UserMistake
+from .syntax_tree import SyntaxNode
+
+if TYPE_CHECKING:
+    from .formula import Formula, FormulaView
+
+
+class ParseResult(NamedTuple):
+    tree: Optional[SyntaxNode]  # None, jeśli zdanie zawiera błąd
+    precedence: dict[int, float]
+    mistake: Optional[UserMistake]
+
+
+# Kolejność zgłaszania błędów, gdy w zdaniu jest ich kilka
+MISTAKE_PRIORITY = (
+    "no variables",
+    "nothing between formulas",
+    "bracket left open",
+    "bracket not opened",
+    "no right",
+    "no left",
+)
+
+
+def _mistake(name: str, pos: int) -> UserMistake:
+    if name == "nothing between formulas":
+        return UserMistake(
+            name,
+            "W zdaniu znajdują się dwie zmienne lub formuły niepołączone spójnikiem",
+            {"pos": pos},
+        )
+    elif name == "bracket left open":
+        return UserMistake(name, f"Otwarcie nawiasu na pozycji {pos+1} nie ma zamknięcia", {"pos": pos})
+    elif name == "bracket not opened":
+        return UserMistake(name, f"Zamknięcie nawiasu na pozycji {pos+1} nie ma otwarcia", {"pos": pos})
+    elif name == "no right":
+        return UserMistake(name, f"Spójnik na pozycji {pos+1} nie ma prawego argumentu", {"pos": pos})
+    elif name == "no left":
+        return UserMistake(
+            name, f"Spójnik dwuargumentowy na pozycji {pos+1} nie ma lewego argumentu", {"pos": pos}
+        )
+    else:
+        return UserMistake("no variables", "Zdanie nie zawiera żadnych zmiennych")
+
+
+def parse(formula: Union[Formula, FormulaView]) -> ParseResult:
+    """
+    Parsuje zdanie w jednym przebiegu.
+
+    Spójniki dwuargumentowe o równej sile wiązania łączą w lewo (główny jest najbardziej na prawo),
+    a jednoargumentowe są prefiksowe - zgodnie z `Formula.getMainConnective`.
+    Przy błędzie drzewo nie jest budowane, a zwracany jest pierwszy błąd według `MISTAKE_PRIORITY`.
+    """
+    spec = formula.formal_system.spec
+    ids, precedence_table, values = spec.ids, spec.precedence, spec.values
+
+    precedence: dict[int, float] = {}
+    mistakes: dict[str, int] = {}  # kategoria -> pozycja pierwszego wystąpienia
+
+    # (węzeł, początek, koniec) - zakres obejmuje nawiasy wokół węzła
+    operands: list[tuple[SyntaxNode, int, int]] = []
+    # (indeks, siła wiązania, czy jednoargumentowy); nawiasy mają siłę wiązania None
+    operators: list[tuple[int, Optional[int], bool]] = []
+    has_atoms = False
+    lvl = 0
+
+    def report(name: str, pos: int) -> None:
+        mistakes.setdefault(name, pos)
+
+    def reduce() -> None:
+        index, _, is_unary = operators.pop()
+        if mistakes:
+            return
+        if is_unary:
+            child, _, stop = operands.pop()
+            operands.append((SyntaxNode(formula, index, stop, index, (child,)), index, stop))
+        else:
+            right, _, stop = operands.pop()
+            left, start, _ = operands.pop()
+            operands.append((SyntaxNode(formula, start, stop, index, (left, right)), start, stop))
+
+    expect_operand = True
+    for i, token in enumerate(formula):
+        t = token.type_
+        connective = ids.get(t)
+
+        if t == "(":
+            if not expect_operand:
+                report("nothing between formulas", i)
+            operators.append((i, None, False))
+            expect_operand = True
+            lvl += 1
+        elif t == ")":
+            lvl -= 1
+            if expect_operand:
+                if operators and operators[-1][1] is not None:
+                    report("no right", operators[-1][0])
+                elif operators:
+                    # Pusty nawias, jak w starym sprawdzaniu składni, zgłaszany jest jako niezamknięty
+                    report("bracket left open", operators[-1][0])
+            while operators and operators[-1][1] is not None:
+                reduce()
+            if not operators:
+                report("bracket not opened", i)
+                expect_operand = False
+                continue
+            opening, _, _ = operators.pop()
+            if not mistakes:
+                node, _, _ = operands.pop()
+                operands.append((node, opening, i + 1))
+            expect_operand = False
+        elif connective is not None:
+            prec = precedence_table[connective]
+            precedence[i] = lvl + values[connective]
+            if spec.unary >> connective & 1:
+                if not expect_operand:
+                    report("nothing between formulas", i)
+                operators.append((i, prec, True))
+            else:
+                if expect_operand:
+                    report("no left", i)
+                while operators and (top := operators[-1][1]) is not None and top >= prec:
+                    reduce()
+                operators.append((i, prec, False))
+            expect_operand = True
+        else:
+            # Każdy token niebędący spójnikiem ani nawiasem jest osobną zmienną
+            has_atoms = True
+            if not expect_operand:
+                report("nothing between formulas", i)
+            elif not mistakes:
+                operands.append((SyntaxNode(formula, i, i + 1, None), i, i + 1))
+            expect_operand = False
+
+    if expect_operand and operators and operators[-1][1] is not None:
+        report("no right", operators[-1][0])
+    opened = [i for i, prec, _ in operators if prec is None]
+    if opened:
+        report("bracket left open", opened[0])
+    if not has_atoms:
+        report("no variables", 0)
+
+    if mistakes:
+        name = min(mistakes, key=MISTAKE_PRIORITY.index)
+        return ParseResult(None, precedence, _mistake(name, mistakes[name]))
+
+    while operators:
+        reduce()
+    root, _, _ = operands.pop()
+    return ParseResult(root, precedence, None)
+
+
+def check_syntax(formula: Union[Formula, FormulaView]) -> Optional[UserMistake]:
+    """Sprawdza poprawność zapisu zdania, zwraca informacje o pierwszym błędzie lub None"""
+    return parse(formula).mistake
@@ -0,0 +1,107 @@
+"""
+Wypisywanie zdań z minimalną liczbą nawiasów na podstawie drzewa składniowego.
+
+Zapis kanoniczny zależy wyłącznie od struktury zdania i siły wiązania spójników z systemu formalnego,
+więc nie wymaga wielokrotnej normalizacji nawiasów (`reduceBrackets`) w podformułach powstających
+przy stosowaniu reguł. Wynik jest zapamiętywany w węźle drzewa.
+"""
+from __future__ import annotations
+
+from math import inf
+from typing import TYPE_CHECKING, Union
+
+from ..formal_systems import FormalSpec
+from .syntax_tree import SyntaxNode
+from .token import LEFT_BRACKET, RIGHT_BRACKET, Token
+
+if TYPE_CHECKING:
+    from .formula import FrozenFormula
+
+
+def _precedenceOf(node: SyntaxNode, spec: FormalSpec) -> int:
+    token = node.token
+    assert token is not None
+    return spec.precedence[spec.ids[token.type_]]
+
+
+def _needsBrackets(parent: SyntaxNode, child: SyntaxNode, is_left: bool, spec: FormalSpec) -> bool:
+    """
+    Sprawdza, czy argument spójnika musi zostać objęty nawiasem, aby zachować strukturę zdania.
+    Zasady odpowiadają parserowi: spójniki dwuargumentowe o równej sile wiązania łączą w lewo,
+    a spójnik jednoargumentowy obejmuje wszystkie następujące po nim spójniki wiążące mocniej od niego.
+    """
+    if child.connective is None:
+        return False
+    parent_prec = _precedenceOf(parent, spec)
+    if len(child.children) == 2:
+        child_prec = _precedenceOf(child, spec)
+        if len(parent.children) == 1 or not is_left:
+            return child_prec <= parent_prec
+        if child_prec < parent_prec:
+            return True
+    # Niezamknięty spójnik jednoargumentowy na końcu lewego argumentu przejąłby spójnik rodzica
+    return is_left and child._tail is not None and child._tail < parent_prec
+
+
+def _bakeTails(root: SyntaxNode, spec: FormalSpec) -> None:
+    """
+    Oblicza (bez rekurencji) najmniejszą siłę wiązania spójnika jednoargumentowego, który kończy zapis
+    podformuły bez zamykającego nawiasu - tylko taki spójnik może przejąć spójnik stojący za podformułą.
+    """
+    stack: list[tuple[SyntaxNode, bool]] = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node._tail is not None:
+            continue
+        if not visited and node.children:
+            stack.append((node, True))
+            stack.extend((i, False) for i in node.children if i._tail is None)
+            continue
+        tail = inf
+        if node.children:
+            last = node.children[-1]
+            if not _needsBrackets(node, last, False, spec) and last._tail is not None:
+                tail = last._tail
+            if len(node.children) == 1:
+                tail = min(tail, _precedenceOf(node, spec))
+        object.__setattr__(node, "_tail", tail)
+
+
+def minimal(root: SyntaxNode) -> FrozenFormula:
+    """Zwraca podformułę zapisaną z minimalną liczbą nawiasów jako niezmienną formułę"""
+    from .formula import FrozenFormula
+
+    if root._minimal is not None:
+        return root._minimal
+    spec = root.formula.formal_system.spec
+    _bakeTails(root, spec)
+
+    tokens: list[Token] = []
+    stack: list[Union[SyntaxNode, Token]] = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Token):
+            tokens.append(item)
+        elif item._minimal is not None:
+            tokens.extend(item._minimal)
+        elif item.connective is None:
+            tokens.extend(item.formula[i] for i in range(item.start, item.stop))
+        else:
+            # Elementy odkładane są na stos w odwrotnej kolejności
+            connective = item.formula[item.connective]
+            parts: list[Union[SyntaxNode, Token]] = []
+            if len(item.children) == 1:
+                parts.append(connective)
+            for n, child in enumerate(item.children):
+                if n == 1:
+                    parts.append(connective)
+                is_left = n == 0 and len(item.children) == 2
+                if _needsBrackets(item, child, is_left, spec):
+                    parts.extend((LEFT_BRACKET, child, RIGHT_BRACKET))
+                else:
+                    parts.append(child)
+            stack.extend(reversed(parts))
+
+    result = FrozenFormula(tokens, root.formula.formal_system)
+    object.__setattr__(root, "_minimal", result)
+    return result
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from array import array
+from threading import Lock
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from ..exceptions import FormulaError
+from .token import Token
+
+if TYPE_CHECKING:
+    from ..formal_systems import FormalSystem
+
+# Maksymalna liczba symboli mieszcząca się w typie 'H' tablicy array
+MAX_SYMBOLS = 2**16
+
+
+class SymbolTable(object):
+    """
+    Tablica symboli przypisująca typom i leksemom małe liczby całkowite.
+    Jest współdzielona przez wszystkie formuły tokenizowane danym lekserem.
+    """
+
+    def __init__(self, types: Iterable[str] = (), literals: Iterable[str] = ()) -> None:
+        super().__init__()
+        self.types: list[str] = []
+        self.lexems: list[str] = []
+        self._type_ids: dict[str, int] = {}
+        self._lexem_ids: dict[str, int] = {}
+        self._literal_types: set[int] = set()
+        self._tokens: dict[tuple[int, int], Token] = {}
+        self._levels: dict[int, tuple[FormalSystem, list[Optional[float]]]] = {}
+        # Tablica jest współdzielona przez wątki tokenizujące jednym lekserem; chroni dodawanie symboli
+        self._lock = Lock()
+
+        for type_ in types:
+            self.type_id(type_)
+        for literal in literals:
+            self.encode_token(Token.literal(literal))
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def _add(self, name: str, names: list[str], ids: dict[str, int]) -> int:
+        with self._lock:
+            if name in ids:
+                return ids[name]
+            if len(names) >= MAX_SYMBOLS:
+                raise FormulaError(f"Symbol table can't hold more than {MAX_SYMBOLS} symbols")
+            names.append(name)
+            ids[name] = len(names) - 1
+            return ids[name]
+
+    def type_id(self, type_: str) -> int:
+        """Zwraca identyfikator typu, w razie potrzeby dodając go do tablicy"""
+        try:
+            return self._type_ids[type_]
+        except KeyError:
+            return self._add(type_, self.types, self._type_ids)
+
+    def lexem_id(self, lexem: str) -> int:
+        """Zwraca identyfikator leksemu, w razie potrzeby dodając go do tablicy"""
+        try:
+            return self._lexem_ids[lexem]
+        except KeyError:
+            return self._add(lexem, self.lexems, self._lexem_ids)
+
+    def is_literal(self, type_id: int) -> bool:
+        return type_id in self._literal_types
+
+    def encode_token(self, token: Token) -> tuple[int, int]:
+        """Zwraca parę identyfikatorów (typ, leksem) dla tokenu"""
+        ids = self.type_id(token.type_), self.lexem_id(token.lexem)
+        if token.is_literal:
+            self._literal_types.add(ids[0])
+        self._tokens[ids] = token
+        return ids
+
+    def decode_token(self, type_id: int, lexem_id: int) -> Token:
+        """Zwraca (internowany) token dla pary identyfikatorów"""
+        try:
+            return self._tokens[type_id, lexem_id]
+        except KeyError:
+            token = Token(
+                self.types[type_id],
+                self.lexems[lexem_id],
+                type_id in self._literal_types,
+            )
+            self._tokens[type_id, lexem_id] = token
+            return token
+
+    def encode(self, tokens: Iterable[Token]) -> tuple[array, array]:
+        """Koduje ciąg tokenów jako dwie kolumny liczb: typów i leksemów"""
+        types, lexems = array("H"), array("H")
+        for token in tokens:
+            type_id, lexem_id = self.encode_token(token)
+            types.append(type_id)
+            lexems.append(lexem_id)
+        return types, lexems
+
+    def connective_levels(self, formal_system: FormalSystem) -> list[Optional[float]]:
+        """
+        Zwraca listę indeksowaną identyfikatorem typu zawierającą siłę wiązania spójnika
+        (`prec/scale`, jak w `Formula.calcPrecedenceVal`) lub None dla pozostałych typów
+        """
+        cached = self._levels.get(id(formal_system))
+        if cached is not None and cached[0] is formal_system:
+            levels = cached[1]
+        else:
+            levels = []
+            self._levels[id(formal_system)] = formal_system, levels
+
+        if len(levels) < len(self.types):
+            spec = formal_system.spec
+            for type_ in self.types[len(levels):]:
+                connective = spec.connective(type_)
+                levels.append(None if connective is None else spec.values[connective])
+        return levels
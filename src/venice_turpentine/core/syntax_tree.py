@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Union
+
+from ..exceptions import FormulaError
+from .token import Token
+
+if TYPE_CHECKING:
+    from .formula import Formula, FormulaView, FrozenFormula
+
+
+@dataclass(init=True, repr=False, frozen=True, eq=False, slots=True)
+class SyntaxNode:
+    """
+    Niezmienny węzeł drzewa składniowego zdania.
+    Zakres `start:stop` wskazuje tokeny podformuły w zdaniu źródłowym, bez obejmujących ją nawiasów.
+    `Formula.tree` buduje drzewo na niezmiennej kopii zdania, więc późniejsze modyfikacje go nie psują.
+    """
+
+    formula: Union[Formula, FormulaView]
+    start: int
+    stop: int
+    connective: Optional[int]  # Indeks głównego spójnika w zdaniu źródłowym, None dla atomów
+    children: tuple[SyntaxNode, ...] = ()
+    # Zapamiętane wyniki `printer` - zapis z minimalną liczbą nawiasów
+    _tail: Optional[float] = field(default=None, init=False, repr=False)
+    _minimal: Optional[FrozenFormula] = field(default=None, init=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        """Liczba tokenów podformuły"""
+        return self.stop - self.start
+
+    @property
+    def token(self) -> Optional[Token]:
+        """Główny spójnik podformuły"""
+        return None if self.connective is None else self.formula[self.connective]
+
+    def isAtom(self) -> bool:
+        return self.connective is None
+
+    @property
+    def left(self) -> Optional[SyntaxNode]:
+        """Lewy argument spójnika dwuargumentowego"""
+        return self.children[0] if len(self.children) == 2 else None
+
+    @property
+    def right(self) -> Optional[SyntaxNode]:
+        """Prawy argument spójnika (jedyny w przypadku spójników jednoargumentowych)"""
+        return self.children[-1] if self.children else None
+
+    def toFormula(self) -> Union[Formula, FormulaView]:
+        """Zwraca podformułę jako obiekt `Formula` (lub widok, jeśli drzewo zbudowano na widoku)"""
+        return self.formula[self.start : self.stop]
+
+    def view(self) -> Union[FormulaView, Formula]:
+        """
+        Zwraca podformułę jako widok bez kopiowania tokenów.
+        Widok pamięta węzeł, więc jego dalszy rozkład również odbywa się w czasie stałym.
+        """
+        from .formula import FormulaView, FrozenFormula
+
+        if isinstance(self.formula, FrozenFormula):
+            return FormulaView(self.formula, self.start, self.stop, self)
+        return self.formula[self.start : self.stop]
+
+    def minimal(self) -> FrozenFormula:
+        """Zwraca podformułę zapisaną z minimalną liczbą nawiasów (zob. `printer.minimal`); wynik jest zapamiętywany"""
+        from .printer import minimal
+
+        return minimal(self)
+
+    def getComponents(
+        self,
+    ) -> tuple[Token | None, tuple[Union[FormulaView, Formula, None], Union[FormulaView, Formula, None]]]:
+        """
+        Zwraca główny spójnik oraz argumenty podformuły, analogicznie do `Formula.getComponents`.
+        Działa w czasie stałym - argumenty są wyznaczone przy budowie drzewa i zwracane jako widoki.
+        """
+        if self.connective is None:
+            return None, (None, None)
+        left, right = self.left, self.right
+        return self.token, (
+            None if left is None else left.view(),
+            None if right is None else right.view(),
+        )
+
+    def __repr__(self) -> str:
+        token = self.token
+        if token is None:
+            return f"Atom[{self.toFormula()}]"
+        return f"{token.type_.upper()}({', '.join(map(repr, self.children))})"
+
+    @classmethod
+    def build(cls, formula: Union[Formula, FormulaView]) -> SyntaxNode:
+        """
+        Buduje drzewo składniowe w jednym przebiegu (zob. `parser.parse`).
+        Kolejność działań jest zgodna z `Formula.getMainConnective` - spójniki dwuargumentowe o równej sile
+        wiązania łączą w lewo, a jednoargumentowe są prefiksowe.
+
+        :raises FormulaError: Zdanie nie jest poprawnie zbudowane
+        """
+        from .parser import parse
+
+        result = parse(formula)
+        if result.tree is None:
+            raise FormulaError(result.mistake.default if result.mistake else "Formula is malformed")
+        return result.tree
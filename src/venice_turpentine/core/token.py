@@ -1,13 +1,54 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError
+from sys import intern
+from typing import Any
 
 
-@dataclass(init=True, repr=False, frozen=True)
 class Token:
-    """Instancja elementu alfabetu formalnego"""
+    """
+    Instancja elementu alfabetu formalnego
+
+    Tokeny są internowane - każda trójka `(type_, lexem, is_literal)` istnieje w procesie dokładnie raz,
+    dzięki czemu porównanie sprowadza się do porównania tożsamości
+    """
+
+    __slots__ = ("type_", "lexem", "is_literal")
+
+    # Tablica symboli wspólna dla całego procesu
+    _INTERNED: dict[tuple[str, str, bool], Token] = {}
 
     type_: str
     lexem: str
-    is_literal: bool = False
+    is_literal: bool
+
+    def __new__(cls, type_: str, lexem: str, is_literal: bool = False) -> Token:
+        key = (type_, lexem, is_literal)
+        try:
+            return cls._INTERNED[key]
+        except KeyError:
+            pass
+        self = super().__new__(cls)
+        object.__setattr__(self, "type_", intern(type_))
+        object.__setattr__(self, "lexem", intern(lexem))
+        object.__setattr__(self, "is_literal", is_literal)
+        # setdefault zapobiega powstaniu dwóch instancji przy równoległym tworzeniu
+        return cls._INTERNED.setdefault(key, self)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __reduce__(self):
+        return Token, (self.type_, self.lexem, self.is_literal)
+
+    def __copy__(self) -> Token:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Token:
+        return self
 
     def __str__(self):
         return self.lexem
@@ -21,11 +62,20 @@ class Token:
     @classmethod
     def literal(cls, s: str):
         return cls(s, s, is_literal=True)
-    
+
     @classmethod
     def LEFT_BRACKET(cls):
-        return cls.literal("(")
-    
+        return LEFT_BRACKET
+
     @classmethod
     def RIGHT_BRACKET(cls):
-        return cls.literal(")")
+        return RIGHT_BRACKET
+
+    @classmethod
+    def interned_count(cls) -> int:
+        """Zwraca liczbę tokenów w tablicy symboli"""
+        return len(cls._INTERNED)
+
+
+LEFT_BRACKET = Token.literal("(")
+RIGHT_BRACKET = Token.literal(")")
@@ -16,6 +16,14 @@ class LexiconError(Exception):
     pass
 
 
+class SymbolsExhausted(LexiconError):
+    """Brak nowych symboli danego typu"""
+
+
+class PluginError(Exception):
+    pass
+
+
 class FormulaError(Exception):
     pass
 
@@ -1,3 +1,10 @@
-__all__ = ["FormalSystem"]
+__all__ = [
+    "FormalSystem",
+    "FormalSpec",
+    "register_formal_system",
+    "get_formal_system",
+    "formal_system_name",
+]
 
-from .base import FormalSystem
+from .base import FormalSpec, FormalSystem
+from .registry import formal_system_name, get_formal_system, register_formal_system
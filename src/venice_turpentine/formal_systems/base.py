@@ -1,4 +1,61 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+
+@dataclass(init=True, repr=False, frozen=True, slots=True)
+class FormalSpec:
+    """
+    Skompilowane tablice systemu formalnego, liczone raz na instancję (`FormalSystem.spec`).
+    Spójniki mają kolejne identyfikatory, a tablice poniżej są indeksowane tymi identyfikatorami.
+    """
+
+    # Typ spójnika -> identyfikator
+    ids: Mapping[str, int]
+    types: tuple[str, ...]
+    precedence: tuple[int, ...]
+    # Siła wiązania na poziomie zerowym - `prec/scale`, jak w `Formula.calcPrecedenceVal`
+    values: tuple[float, ...]
+    arity: tuple[int, ...]
+    # Bit o numerze identyfikatora jest ustawiony dla spójników jednoargumentowych
+    unary: int
+    unary_types: frozenset[str]
+    scale: int
+
+    @classmethod
+    def compile(cls, operator_precedence: Mapping[str, int], unary_operators: list[str]) -> FormalSpec:
+        types = tuple(operator_precedence)
+        precedence = tuple(operator_precedence[i] for i in types)
+        scale = max(precedence) + 1 if precedence else 1
+        unary = 0
+        for i, type_ in enumerate(types):
+            if type_ in unary_operators:
+                unary |= 1 << i
+        return cls(
+            ids=MappingProxyType({type_: i for i, type_ in enumerate(types)}),
+            types=types,
+            precedence=precedence,
+            values=tuple(i / scale for i in precedence),
+            arity=tuple(1 if unary >> i & 1 else 2 for i in range(len(types))),
+            unary=unary,
+            unary_types=frozenset(i for i in types if i in unary_operators),
+            scale=scale,
+        )
+
+    def connective(self, type_: str) -> Optional[int]:
+        """Zwraca identyfikator spójnika lub None, jeśli typ nie jest spójnikiem"""
+        return self.ids.get(type_)
+
+    def isUnary(self, connective: int) -> bool:
+        return bool(self.unary >> connective & 1)
+
+    def value(self, type_: str, lvl: int = 0) -> float:
+        """Siła wiązania spójnika na danym poziomie zagnieżdżenia"""
+        return lvl + self.values[self.ids[type_]]
 
 
 class FormalSystem(ABC):
@@ -13,6 +70,14 @@ class FormalSystem(ABC):
     def unary_operators(self) -> list[str]:
         pass
 
+    @cached_property
+    def spec(self) -> FormalSpec:
+        """
+        Tablice systemu skompilowane przy pierwszym użyciu; z nich korzystają operacje na formułach.
+        Zakłada, że system formalny nie zmienia się po utworzeniu instancji.
+        """
+        return FormalSpec.compile(self.operator_precedence, self.unary_operators)
+
     @property
     def operator_precedence_scale(self) -> int:
-        return max(self.operator_precedence.values()) + 1
+        return self.spec.scale
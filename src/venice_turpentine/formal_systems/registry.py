@@ -0,0 +1,28 @@
+from typing import Union
+
+from ..exceptions import FormalError, PluginError
+from ..plugins import formal_systems
+from .base import FormalSystem
+
+# Systemy formalne są wtyczkami z grupy punktów wejścia `plugins.FORMAL_SYSTEMS`, importowanymi przy pierwszym użyciu
+
+
+def register_formal_system(name: str, cls: Union[type[FormalSystem], str]) -> None:
+    """Rejestruje system formalny pod nazwą używaną m.in. przy serializacji formuł"""
+    try:
+        formal_systems.register(name, cls)
+    except PluginError as error:
+        raise FormalError(str(error)) from None
+
+
+def get_formal_system(name: str) -> FormalSystem:
+    """Zwraca współdzieloną instancję systemu formalnego o podanej nazwie"""
+    try:
+        return formal_systems.get(name)
+    except PluginError as error:
+        raise FormalError(str(error)) from None
+
+
+def formal_system_name(system: FormalSystem) -> str | None:
+    """Zwraca nazwę, pod którą zarejestrowano klasę systemu formalnego; None jeśli nie jest zarejestrowana"""
+    return formal_systems.nameOf(system)
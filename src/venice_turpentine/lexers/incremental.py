@@ -0,0 +1,375 @@
+"""
+Przyrostowa analiza zdania edytowanego na żywo (walidacja w interfejsie WWW, podpowiedzi w CLI).
+
+`IncrementalFormula` przechowuje tekst oraz tokeny z zakresami znaków, podzielone na bloki po `BLOCK` tokenów.
+Każdy blok ma podsumowanie: bilans i minimum poziomu nawiasów, najsłabiej wiążący spójnik oraz błędy wykryte
+w parach sąsiednich tokenów. Edycja tekstu tokenizuje ponownie tylko uszkodzony fragment - od tokenu
+poprzedzającego zmianę do pierwszego dawnego tokenu, od którego tokenizacja pokrywa się z poprzednią - i przelicza
+podsumowania tylko zmienionych bloków. Błędy składni i główny spójnik są składane z podsumowań, więc koszt
+edycji zależy od jej rozmiaru i liczby bloków, a nie od liczby tokenów.
+
+Wyniki są zgodne z `Formula.checkSyntax` i `Formula.getMainConnective` dla całego zdania; jedynym dodatkowym
+błędem jest "not tokenizable" dla tekstu, którego lekser nie rozpoznaje.
+"""
+from __future__ import annotations
+
+from typing import Iterator, NamedTuple, Optional
+
+from ..core.formula import Formula
+from ..core.parser import MISTAKE_PRIORITY, _mistake
+from ..core.token import Token
+from ..exceptions import LexiconError, UserMistake
+from ..formal_systems import FormalSpec, FormalSystem
+from .wrapper.lexer import BuiltLexer
+from .wrapper.scanners import IGNORE
+
+# Docelowa liczba tokenów w bloku
+BLOCK = 64
+
+# Rodzaje tokenów; EDGE oznacza początek lub koniec zdania
+ATOM, OPEN, CLOSE, UNARY, BINARY, EDGE = range(6)
+
+# (rodzaj poprzedniego tokenu, rodzaj tokenu) -> (błąd, czy zgłaszany na poprzednim tokenie); zob. `parser.parse`
+PAIRS: dict[tuple[int, int], tuple[str, bool]] = {}
+for _prev in (ATOM, CLOSE):
+    PAIRS[_prev, OPEN] = PAIRS[_prev, UNARY] = PAIRS[_prev, ATOM] = ("nothing between formulas", False)
+for _prev in (EDGE, OPEN, UNARY, BINARY):
+    PAIRS[_prev, BINARY] = ("no left", False)
+for _prev in (UNARY, BINARY):
+    PAIRS[_prev, CLOSE] = PAIRS[_prev, EDGE] = ("no right", True)
+PAIRS[OPEN, CLOSE] = ("bracket left open", True)
+
+
+class Update(NamedTuple):
+    start: int  # Indeks pierwszego zmienionego tokenu
+    removed: int  # Liczba usuniętych tokenów
+    inserted: tuple[Token, ...]  # Tokeny wstawione w miejsce usuniętych
+    mistake: Optional[UserMistake]  # Pierwszy błąd w zdaniu po edycji lub None
+    main_connective: Optional[int]  # Indeks głównego spójnika, jak `Formula.getMainConnective`
+
+
+class _Block(object):
+    """Ciąg tokenów z podsumowaniem; poziomy nawiasów i indeksy są względne wobec początku bloku"""
+
+    __slots__ = (
+        "tokens", "kinds", "values", "gaps", "sizes", "chars", "balance", "low", "low_last", "low_after",
+        "best", "best_first", "best_last", "best_unary", "atoms", "mistakes",
+    )
+
+    def __init__(
+        self,
+        tokens: list[Token],
+        kinds: list[int],
+        values: list[Optional[float]],
+        gaps: list[int],
+        sizes: list[int],
+    ) -> None:
+        super().__init__()
+        self.tokens = tokens
+        self.kinds = kinds
+        self.values = values
+        # Liczba znaków przed tokenem (od końca poprzedniego tokenu) oraz długość tokenu
+        self.gaps = gaps
+        self.sizes = sizes
+        self.chars = sum(gaps) + sum(sizes)
+        self.atoms = 0
+        # Najniższy poziom przed tokenem i ostatni token, przed którym go osiągnięto; najniższy poziom po tokenie
+        self.low = self.low_last = 0
+        self.low_after = 0
+        # Najsłabiej wiążący spójnik: (poziom, siła wiązania), pierwszy i ostatni indeks, czy wszystkie jednoargumentowe
+        self.best: Optional[tuple[int, float]] = None
+        self.best_first = self.best_last = -1
+        self.best_unary = True
+        # Błąd -> pierwszy indeks, dla par tokenów wewnątrz bloku
+        self.mistakes: dict[str, int] = {}
+
+        depth = 0
+        prev = None
+        for k, kind in enumerate(kinds):
+            if prev is not None and (pair := PAIRS.get((prev, kind))) is not None:
+                self.mistakes.setdefault(pair[0], k - 1 if pair[1] else k)
+            if depth <= self.low:
+                self.low, self.low_last = depth, k
+            if kind == OPEN:
+                depth += 1
+            elif kind == CLOSE:
+                depth -= 1
+            elif kind == ATOM:
+                self.atoms += 1
+            else:
+                value = values[k]
+                assert value is not None
+                key = (depth, value)
+                if self.best is None or key < self.best:
+                    self.best, self.best_first, self.best_last = key, k, k
+                    self.best_unary = kind == UNARY
+                elif key == self.best:
+                    self.best_last = k
+                    self.best_unary &= kind == UNARY
+            self.low_after = min(self.low_after, depth)
+            prev = kind
+        self.balance = depth
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+class IncrementalFormula(object):
+    """
+    Zdanie edytowane na żywo: poprzednie tokeny i stan analizy wraz z edycją tekstu dają nowe tokeny,
+    błędy składni i główny spójnik.
+    """
+
+    def __init__(self, lexer: BuiltLexer, formal_system: FormalSystem, text: str = "") -> None:
+        super().__init__()
+        self.lexer = lexer
+        self.formal_system = formal_system
+        self.text = ""
+        self._normalized = ""
+        self._blocks: list[_Block] = []
+        self._length = 0
+        # Zakres znaków, którego nie udało się stokenizować; pokryty przez odstęp przed następnym tokenem
+        self._broken: Optional[tuple[int, int]] = None
+        self.mistake: Optional[UserMistake] = None
+        self.main_connective: Optional[int] = None
+        self.edit(0, 0, text)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tokens(self) -> list[Token]:
+        return [token for block in self._blocks for token in block.tokens]
+
+    def formula(self) -> Formula:
+        return Formula(self.tokens(), self.formal_system)
+
+    # MARK: Edycja
+
+    def edit(self, start: int, stop: int, text: str) -> Update:
+        """
+        Zastępuje znaki [start, stop) tekstu podanym tekstem
+
+        :raises IndexError: Zakres wykracza poza tekst
+        :return: Zmiana tokenów oraz wynik analizy całego zdania po edycji
+        """
+        if not 0 <= start <= stop <= len(self.text):
+            raise IndexError(f"Edit range [{start}, {stop}) is outside the text")
+        delta = len(text) - (stop - start)
+        normalized = self.lexer.normalize(text)
+        if len(normalized) != len(text):
+            normalized = text
+        self.text = self.text[:start] + text + self.text[stop:]
+        self._normalized = self._normalized[:start] + normalized + self._normalized[stop:]
+
+        # Uszkodzony zakres w dawnych współrzędnych obejmuje też nierozpoznany wcześniej tekst
+        damaged_start, damaged_stop = start, stop
+        if self._broken is not None:
+            damaged_start = min(damaged_start, self._broken[0])
+            damaged_stop = max(damaged_stop, self._broken[1])
+        self._broken = None
+
+        layout = self._layout()
+        first = self._firstTouching(layout, damaged_start)
+        # Token poprzedzający zmianę może połączyć się z nowym tekstem, więc też jest tokenizowany ponownie
+        index = max(first - 1, 0)
+        origin = self._start(layout, index) if first > 0 else 0
+
+        inserted: list[tuple[Token, int, int]] = []
+        old = self._spans(layout, index)
+        candidate = next(old, None)
+        while candidate is not None and candidate[1] < damaged_stop:
+            candidate = next(old, None)
+        pos = origin
+        try:
+            for token, token_start, token_stop in self.lexer.scan_from(self._normalized, origin):
+                while candidate is not None and candidate[1] + delta < token_start:
+                    candidate = next(old, None)
+                if candidate is not None and candidate[1] + delta == token_start:
+                    break
+                inserted.append((token, token_start, token_stop))
+                pos = token_stop
+        except LexiconError:
+            while pos < len(self._normalized) and self._normalized[pos] in IGNORE:
+                pos += 1
+            while candidate is not None and candidate[1] + delta <= pos:
+                candidate = next(old, None)
+            self._broken = (pos, len(self.text) if candidate is None else candidate[1] + delta)
+        sync = self._length if candidate is None else candidate[0]
+
+        self._splice(layout, index, sync, inserted, delta)
+        self._analyze()
+        return Update(index, sync - index, tuple(i[0] for i in inserted), self.mistake, self.main_connective)
+
+    def _layout(self) -> list[tuple[int, int]]:
+        """Indeks pierwszego tokenu i pozycja początku (końca poprzedniego tokenu) każdego bloku"""
+        layout = []
+        base = origin = 0
+        for block in self._blocks:
+            layout.append((base, origin))
+            base += len(block)
+            origin += block.chars
+        return layout
+
+    def _firstTouching(self, layout: list[tuple[int, int]], pos: int) -> int:
+        """Indeks pierwszego tokenu kończącego się nie wcześniej niż na pozycji `pos`"""
+        for block, (base, origin) in zip(self._blocks, layout):
+            if origin + block.chars >= pos:
+                for k in range(len(block)):
+                    origin += block.gaps[k] + block.sizes[k]
+                    if origin >= pos:
+                        return base + k
+        return self._length
+
+    def _start(self, layout: list[tuple[int, int]], index: int) -> int:
+        """Pozycja początku tokenu o danym indeksie"""
+        number = self._blockOf(layout, index)
+        base, origin = layout[number]
+        block = self._blocks[number]
+        for k in range(index - base):
+            origin += block.gaps[k] + block.sizes[k]
+        return origin + block.gaps[index - base]
+
+    def _blockOf(self, layout: list[tuple[int, int]], index: int) -> int:
+        """Numer bloku zawierającego token o danym indeksie (ostatni blok dla indeksu równego długości zdania)"""
+        for number in range(len(layout) - 1, 0, -1):
+            if layout[number][0] <= index:
+                return number
+        return 0
+
+    def _spans(self, layout: list[tuple[int, int]], index: int) -> Iterator[tuple[int, int, int]]:
+        """Kolejne tokeny od danego indeksu jako trójki (indeks, początek, koniec), w dawnych współrzędnych"""
+        if not self._blocks:
+            return
+        number = self._blockOf(layout, index)
+        for block, (base, origin) in zip(self._blocks[number:], layout[number:]):
+            for k in range(len(block)):
+                start = origin + block.gaps[k]
+                origin = start + block.sizes[k]
+                if base + k >= index:
+                    yield base + k, start, origin
+
+    def _splice(
+        self,
+        layout: list[tuple[int, int]],
+        index: int,
+        sync: int,
+        inserted: list[tuple[Token, int, int]],
+        delta: int,
+    ) -> None:
+        """Zastępuje tokeny [index, sync) nowymi i dzieli zmienione bloki na nowo"""
+        if self._blocks:
+            first = self._blockOf(layout, index)
+            # Odstęp przed pierwszym zachowanym tokenem się zmienia, więc jego blok też jest przebudowywany
+            last = self._blockOf(layout, min(sync, self._length - 1))
+            base, origin = layout[first]
+        else:
+            first, last, base, origin = 0, -1, 0, 0
+
+        # Wpisy (token, początek, koniec) przebudowywanych bloków w dawnych współrzędnych
+        spans: list[tuple[Token, int, int]] = []
+        pos = origin
+        for block in self._blocks[first:last + 1]:
+            for k, token in enumerate(block.tokens):
+                start = pos + block.gaps[k]
+                pos = start + block.sizes[k]
+                spans.append((token, start, pos))
+        kept_after = [(token, start + delta, stop + delta) for token, start, stop in spans[sync - base:]]
+        spans = spans[: index - base] + inserted + kept_after
+
+        spec = self.formal_system.spec
+        blocks: list[_Block] = []
+        for chunk in range(0, len(spans), BLOCK):
+            part = spans[chunk:chunk + BLOCK]
+            kinds, values, gaps, sizes = [], [], [], []
+            for token, start, stop in part:
+                kind, value = self._classify(token, spec)
+                kinds.append(kind)
+                values.append(value)
+                gaps.append(start - origin)
+                sizes.append(stop - start)
+                origin = stop
+            blocks.append(_Block([i[0] for i in part], kinds, values, gaps, sizes))
+        self._blocks[first:last + 1] = blocks
+        self._length += len(inserted) - (sync - index)
+
+    @staticmethod
+    def _classify(token: Token, spec: FormalSpec) -> tuple[int, Optional[float]]:
+        if token.type_ == "(":
+            return OPEN, None
+        if token.type_ == ")":
+            return CLOSE, None
+        connective = spec.ids.get(token.type_)
+        if connective is None:
+            return ATOM, None
+        return (UNARY if spec.unary >> connective & 1 else BINARY), spec.values[connective]
+
+    # MARK: Analiza
+
+    def _analyze(self) -> None:
+        """Składa błędy i główny spójnik całego zdania z podsumowań bloków"""
+        mistakes: dict[str, int] = {}
+        depth = base = atoms = 0
+        prev = EDGE
+        # Najniższy poziom przed tokenem (lub na końcu zdania) i ostatnie miejsce, w którym go osiągnięto
+        low, low_last = 0, 0
+        unopened: Optional[tuple[_Block, int, int]] = None
+        best: Optional[tuple[int, float]] = None
+        best_first = best_last = -1
+        best_unary = True
+
+        for block in self._blocks:
+            if (pair := PAIRS.get((prev, block.kinds[0]))) is not None:
+                mistakes.setdefault(pair[0], base - 1 if pair[1] else base)
+            for name, k in block.mistakes.items():
+                mistakes.setdefault(name, base + k)
+            if depth + block.low <= low:
+                low, low_last = depth + block.low, base + block.low_last
+            if unopened is None and depth + block.low_after <= -1:
+                unopened = block, depth, base
+            if block.best is not None:
+                key = (depth + block.best[0], block.best[1])
+                if best is None or key < best:
+                    best, best_unary = key, block.best_unary
+                    best_first, best_last = base + block.best_first, base + block.best_last
+                elif key == best:
+                    best_last = base + block.best_last
+                    best_unary &= block.best_unary
+            atoms += block.atoms
+            depth += block.balance
+            base += len(block)
+            prev = block.kinds[-1]
+
+        if (pair := PAIRS.get((prev, EDGE))) is not None:
+            mistakes.setdefault(pair[0], base - 1)
+        if depth <= low:
+            low, low_last = depth, base
+        if low_last < base:
+            mistakes.setdefault("bracket left open", low_last)
+        if unopened is not None:
+            block, depth, base = unopened
+            for k, kind in enumerate(block.kinds):
+                if kind == CLOSE:
+                    depth -= 1
+                    if depth == -1:
+                        mistakes["bracket not opened"] = base + k
+                        break
+                elif kind == OPEN:
+                    depth += 1
+        if not atoms:
+            mistakes["no variables"] = 0
+
+        if self._broken is not None:
+            pos = self._broken[0]
+            self.mistake = UserMistake(
+                "not tokenizable", f"Nie rozpoznano tekstu od znaku na pozycji {pos+1}", {"pos": pos}
+            )
+        elif mistakes:
+            name = min(mistakes, key=MISTAKE_PRIORITY.index)
+            self.mistake = _mistake(name, mistakes[name])
+        else:
+            self.mistake = None
+
+        if best is None:
+            self.main_connective = None
+        else:
+            self.main_connective = best_first if best_unary else best_last
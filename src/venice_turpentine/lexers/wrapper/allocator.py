@@ -0,0 +1,102 @@
+"""
+Przydzielanie nowych symboli (stałych, zmiennych itp.) dla typów określonych w kontekście `find_new`.
+
+Kolejne leksemy wyrażenia generującego są wyliczane przez exrex tylko raz na lekser i zapamiętywane,
+a `FreshSymbols` przechowuje zbiór leksemów użytych w formule lub dowodzie oraz pozycję w wyliczeniu
+dla każdego typu, więc przydzielenie k symboli kosztuje O(k) zamiast przeglądania listy leksemów
+dla każdego kandydata.
+"""
+from __future__ import annotations
+
+from threading import Lock
+from typing import Iterable, Iterator, Optional
+
+from exrex import generate
+
+from ...core.token import Token
+from ...exceptions import LexiconError, SymbolsExhausted
+
+
+class Enumeration(object):
+    """Leniwie wyliczana, zapamiętywana lista leksemów pasujących do wyrażenia generującego"""
+
+    def __init__(self, regex: str) -> None:
+        super().__init__()
+        self.items: list[str] = []
+        self._source: Optional[Iterator[str]] = generate(regex)
+        self._lock = Lock()
+
+    @property
+    def complete(self) -> bool:
+        """Czy wyliczono już wszystkie leksemy"""
+        return self._source is None
+
+    def get(self, index: int) -> Optional[str]:
+        """Zwraca leksem o danym numerze; None, jeśli wyrażenie ma mniej leksemów"""
+        if index < len(self.items):
+            return self.items[index]
+        with self._lock:
+            while index >= len(self.items) and self._source is not None:
+                try:
+                    self.items.append(next(self._source))
+                except StopIteration:
+                    self._source = None
+        return self.items[index] if index < len(self.items) else None
+
+
+class FreshSymbols(object):
+    """
+    Przydziela symbole nieużyte w danej formule lub dowodzie.
+    Przydzielone symbole są od razu oznaczane jako użyte.
+    """
+
+    def __init__(self, enumerations: dict[str, Enumeration], used: Iterable[str] = ()) -> None:
+        super().__init__()
+        self._enumerations = enumerations
+        self.used: set[str] = set(used)
+        # Typ -> numer pierwszego leksemu, który może być jeszcze wolny
+        self._cursor: dict[str, int] = {}
+
+    def use(self, lexems: Iterable[str]) -> None:
+        """Oznacza leksemy jako użyte, np. po dodaniu nowych zdań do dowodu"""
+        self.used.update(lexems)
+
+    def _next(self, type_: str) -> Optional[str]:
+        enumeration = self._enumerations.get(type_)
+        if enumeration is None:
+            raise LexiconError(f"Type {type_} is not generatable as a new symbol")
+        index = self._cursor.get(type_, 0)
+        while (lexem := enumeration.get(index)) is not None and lexem in self.used:
+            index += 1
+        self._cursor[type_] = index
+        return lexem
+
+    def isExhausted(self, type_: str) -> bool:
+        """Sprawdza, czy zabrakło nowych symboli danego typu"""
+        return self._next(type_) is None
+
+    def take(self, type_: str) -> Token:
+        """
+        Przydziela nowy symbol danego typu
+
+        :raises SymbolsExhausted: Wszystkie symbole tego typu są użyte
+        """
+        return self.take_many(type_, 1)[0]
+
+    def take_many(self, type_: str, count: int) -> list[Token]:
+        """
+        Przydziela `count` różnych nowych symboli danego typu; przy braku symboli nie przydziela żadnego
+
+        :raises SymbolsExhausted: Brakuje symboli tego typu
+        """
+        taken: list[str] = []
+        start = self._cursor.get(type_, 0)
+        for _ in range(count):
+            lexem = self._next(type_)
+            if lexem is None:
+                self.used.difference_update(taken)
+                self._cursor[type_] = start
+                raise SymbolsExhausted(f"Need more lexems for the {type_} type")
+            self.used.add(lexem)
+            taken.append(lexem)
+        return [Token(type_, i) for i in taken]
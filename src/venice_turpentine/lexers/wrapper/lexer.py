@@ -1,15 +1,27 @@
+from __future__ import annotations
+
+import hashlib
 import re
-from collections import Counter
+from collections import Counter, OrderedDict
+from collections.abc import MutableSequence
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Iterable, TypeVar
+from threading import Lock
+from typing import Any, ClassVar, Iterable, Iterator, Optional, TypeVar, Union
 
-import ply.lex as plex
-from exrex import generate, getone
-from ply.lex import LexError
+from exrex import getone
+from loguru import logger
 
+from ...cache import read_json, write_json
 from ...core.formula import Formula
+from ...core.packed import PackedFormula
+from ...core.symbols import SymbolTable
 from ...core.token import Token
 from ...exceptions import LexiconError
+from ...formal_systems import FormalSystem
+from .allocator import Enumeration, FreshSymbols
+from .patterns import regex_from_list
+from .scanners import LARGE_VOCABULARY, SCANNERS, BatchScanner, Scanner, backend_version
 
 T = TypeVar("T")
 V = TypeVar("V")
@@ -46,11 +58,51 @@ def sep_items(tuples: dict[T, V | Iterable[V]]) -> list[tuple[T, V]]:
     return d
 
 
+# Wersja formatu `BuiltLexer.dump`; jej zmiana unieważnia leksery zapisane na dysku
+CACHE_VERSION = 2
+
+# Ograniczenia (constraint, tag) nałożone przez aktywne konteksty `use_language`, `find_new` i `no_generation`.
+# Zmienna kontekstowa sprawia, że słowniki budowane jednocześnie w różnych wątkach nie dzielą ograniczeń.
+CONSTRAINTS: ContextVar[tuple[tuple[str, str], ...]] = ContextVar("lexicon_constraints", default=())
+
+
+class _ConstraintStack(MutableSequence):
+    """
+    Zgodność wsteczna z dawną listą `Lexicon.STACK`: zmiany trafiają do `CONSTRAINTS`,
+    więc dotyczą tylko bieżącego wątku (kontekstu), a nie wszystkich słowników
+    """
+
+    @staticmethod
+    def _change(index: Any, change: Any) -> None:
+        items = list(CONSTRAINTS.get())
+        change(items, index)
+        CONSTRAINTS.set(tuple(items))
+
+    def __getitem__(self, index: Any) -> Any:
+        return CONSTRAINTS.get()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._change(index, lambda items, i: items.__setitem__(i, value))
+
+    def __delitem__(self, index: Any) -> None:
+        self._change(index, lambda items, i: items.__delitem__(i))
+
+    def insert(self, index: int, value: tuple[str, str]) -> None:
+        self._change(index, lambda items, i: items.insert(i, value))
+
+    def __len__(self) -> int:
+        return len(CONSTRAINTS.get())
+
+    def __repr__(self) -> str:
+        return repr(list(CONSTRAINTS.get()))
+
+
 class Lexicon(object):
     """Klasa reprezentująca słownik budowanego leksera"""
 
-    STACK: list[tuple[str, str]] = []
     LITERALS = {"(", ")"}
+    # Przestarzałe - ograniczenia są przechowywane w `CONSTRAINTS`; zachowane dla istniejących pluginów
+    STACK: ClassVar[MutableSequence] = _ConstraintStack()
 
     def __init__(self) -> None:
         super().__init__()
@@ -59,20 +111,86 @@ class Lexicon(object):
 
     def __setitem__(self, type_: str, lexems: str | Iterable[str]) -> None:
         if isinstance(lexems, str):
-            self.rules.add(LexerRule(tuple(self.STACK), type_, (lexems,)))
+            self.rules.add(LexerRule(CONSTRAINTS.get(), type_, (lexems,)))
             self.needs_casing |= lexems.isupper()
         elif isinstance(lexems, Iterable):
-            self.rules.add(LexerRule(tuple(self.STACK), type_, tuple(lexems)))
+            self.rules.add(LexerRule(CONSTRAINTS.get(), type_, tuple(lexems)))
             self.needs_casing |= any((i.isupper() for i in lexems))
 
-    def compile(self, **constraints) -> "BuiltLexer":
-        return BuiltLexer(self, **constraints)
+    def fingerprint(self, constraints: dict[str, Any], backend: str = "ply") -> str:
+        """
+        Zwraca skrót reguł słownika i ograniczeń, niezależny od procesu (w przeciwieństwie do `hash`).
+        Obejmuje też `CACHE_VERSION` i wersję biblioteki silnika, więc zapisy starszego formatu lub innej wersji ply
+        nie są odczytywane.
+        """
+        rules = sorted((i.constraints, i.type_, i.lexems) for i in self.rules)
+        description = repr((
+            CACHE_VERSION,
+            rules,
+            sorted(sep_items(constraints)),
+            sorted(self.LITERALS),
+            self.needs_casing,
+            backend,
+            backend_version(backend),
+        ))
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def vocabulary(self) -> int:
+        """Liczba leksemów słownika"""
+        return sum(len(i.lexems) for i in self.rules)
+
+    def compile(self, backend: Optional[str] = None, **constraints) -> "BuiltLexer":
+        """
+        Buduje lekser dla reguł spełniających ograniczenia.
+        Wynik jest zapamiętywany według `fingerprint` - w procesie oraz na dysku (zob. `venice_turpentine.cache`),
+        więc kolejne kompilacje tego samego słownika nie budują wyrażeń regularnych od nowa.
+
+        :param backend: Silnik tokenizacji (zob. `scanners`) - "ply", "re", który nie wymaga ply, lub "longest";
+            domyślnie "ply", a dla słowników mających co najmniej `LARGE_VOCABULARY` leksemów "longest"
+        :raises LexiconError: Nieznany silnik
+        """
+        if backend is None:
+            backend = "longest" if self.vocabulary() >= LARGE_VOCABULARY else "ply"
+        if backend not in SCANNERS:
+            raise LexiconError(f"Unknown lexer backend '{backend}'")
+        key = self.fingerprint(constraints, backend)
+        with COMPILED_LOCK:
+            try:
+                built = COMPILED[key]
+            except KeyError:
+                pass
+            else:
+                COMPILED.move_to_end(key)
+                return built
+
+        data = read_json(f"lexer_{key}.json")
+        restored = BuiltLexer.restore(data) if data is not None else None
+        if restored is not None:
+            built = restored
+        else:
+            built = BuiltLexer(self, backend, **constraints)
+            write_json(f"lexer_{key}.json", built.dump())
+
+        with COMPILED_LOCK:
+            # Inny wątek mógł w tym czasie skompilować ten sam słownik - wszystkie dostają ten sam lekser
+            built = COMPILED.setdefault(key, built)
+            COMPILED.move_to_end(key)
+            if len(COMPILED) > COMPILED_SIZE:
+                COMPILED.popitem(last=False)
+        return built
+
+
+# Skompilowane leksery według `Lexicon.fingerprint`
+COMPILED: OrderedDict[str, "BuiltLexer"] = OrderedDict()
+COMPILED_SIZE = 32
+COMPILED_LOCK = Lock()
 
 
 class BuiltLexer(object):
 
-    def __init__(self, lex: Lexicon, **kwargs: dict[str, Any]) -> None:
+    def __init__(self, lex: Lexicon, backend: str = "ply", **kwargs: dict[str, Any]) -> None:
         super().__init__()
+        self.backend = backend
         self.needs_casing = lex.needs_casing
         self.LITERALS = lex.LITERALS
         self.find_new = self._get_find_new(lex)
@@ -81,49 +199,64 @@ class BuiltLexer(object):
         lex_re = [(i, j) for i, j, _ in filtered_rules]
         gen_re = [(i, j) for i, j, for_generation in filtered_rules if for_generation]
 
+        self.lexer_rules = self._join_rules(lex_re)
         self.lexer_regexes = {
             key: self._regex_from_list(val)
-            for key, val in self._join_rules(lex_re).items()
+            for key, val in self.lexer_rules.items()
         }
         self.generator_regexes = {
             key: self._regex_from_list(val)
             for key, val in self._join_rules(gen_re).items()
         }
+        self._setup()
+
+    def _setup(self, table: Optional[dict[str, Any]] = None) -> None:
+        # Tablica symboli wspólna dla formuł kodowanych tym lekserem
+        self.symbols = SymbolTable(sorted(self.lexer_regexes), sorted(self.LITERALS))
+        self.lexer: Scanner = SCANNERS[self.backend](self.lexer_rules, self.LITERALS, table)
+        # Silnik `tokenize_many`, budowany przy pierwszym użyciu
+        self._batch: Optional[Scanner] = None
+        # Wyliczenia leksemów dla typów find_new, współdzielone przez wszystkie `FreshSymbols` leksera
+        self._enumerations = {
+            type_: Enumeration(regex)
+            for type_, regex in self.generator_regexes.items()
+            if type_ in self.find_new
+        }
 
-        class _Lex:
-            _master_re = re
-            literals = lex.LITERALS
-            tokens = [i for i in self.lexer_regexes]
-            t_ignore = " \t"
-
-            def __init__(self) -> None:
-                self.num_count = 0
-                self.build()
-
-            def t_error(self, t):
-                raise LexiconError(f"{t.value} is not tokenizable")
-
-            def build(self, **kwargs):
-                self.lexer = plex.lex(object=self, **kwargs)
-
-            def tokenize(self, s: str):
-                self.lexer.input(s)
-                while i := self.lexer.token():
-                    if i.value in self.literals:
-                        yield Token.literal(i.value)
-                    else:
-                        yield Token(i.type, i.value)
-
-        for type_, lexems in sorted(
-            self.lexer_regexes.items(), key=lambda x: len(x[1]), reverse=True
-        ):
-            setattr(_Lex, f"t_{type_}", lexems)
+    def dump(self) -> dict[str, Any]:
+        """Zapisuje skompilowany lekser (razem z tablicami ply) jako dane JSON"""
+        return {
+            "backend": self.backend,
+            "needs_casing": self.needs_casing,
+            "literals": sorted(self.LITERALS),
+            "find_new": sorted(self.find_new),
+            "lexer_rules": self.lexer_rules,
+            "lexer_regexes": self.lexer_regexes,
+            "generator_regexes": self.generator_regexes,
+            "table": self.lexer.table(),
+        }
 
-        self.lexer = _Lex()
+    @classmethod
+    def restore(cls, data: Any) -> Optional[BuiltLexer]:
+        """Odtwarza lekser zapisany przez `dump`; None, jeśli dane są nieaktualne lub uszkodzone"""
+        try:
+            built = cls.__new__(cls)
+            built.backend = data["backend"]
+            built.needs_casing = data["needs_casing"]
+            built.LITERALS = set(data["literals"])
+            built.find_new = set(data["find_new"])
+            built.lexer_rules = {k: list(v) for k, v in data["lexer_rules"].items()}
+            built.lexer_regexes = dict(data["lexer_regexes"])
+            built.generator_regexes = dict(data["generator_regexes"])
+            built._setup(data["table"])
+        except (KeyError, TypeError, ValueError, IndexError, re.error, LexiconError) as error:
+            logger.debug(f"Cached lexer discarded: {error!r}")
+            return None
+        return built
 
     @staticmethod
-    def _regex_from_list(lst: Iterable[str]):
-        return r"|".join((f"({i})" for i in lst))
+    def _regex_from_list(lst: Iterable[str]) -> str:
+        return regex_from_list(lst)
 
     @staticmethod
     def _filter_constraints(
@@ -165,6 +298,19 @@ class BuiltLexer(object):
         d = join_items(rules)
         return {k: sorted(i, reverse=True) for k, i in d.items()}
 
+    def normalize(self, formula: str) -> str:
+        """Przygotowuje tekst do tokenizacji (zmienia wielkość liter, jeśli słownik jej nie rozróżnia)"""
+        return formula if self.needs_casing else formula.lower()
+
+    def scan_from(self, formula: str, pos: int) -> Iterator[tuple[Token, int, int]]:
+        """
+        Tokenizuje leniwie tekst przygotowany przez `normalize` od podanej pozycji
+
+        :raises LexiconError: Nie znaleziono tokenu
+        :return: Trójki (token, początek, koniec) - zakresy znaków tokenów w `formula`
+        """
+        return self.lexer.scan_from(formula, pos)
+
     def tokenize(self, formula: str) -> list[Token]:
         """
         Dla danego ciągu znaków generuje listę tokenów
@@ -178,12 +324,64 @@ class BuiltLexer(object):
         if not self.needs_casing:
             formula = formula.lower()
 
-        try:
-            sentence = list(self.lexer.tokenize(formula))
-        except LexError as e:
-            raise LexiconError from e
-        else:
-            return sentence
+        return self.lexer.scan(formula)
+
+    def tokenize_many(
+        self, formulas: Iterable[str]
+    ) -> Iterator[tuple[int, Union[tuple[Token, ...], LexiconError]]]:
+        """
+        Tokenizuje kolejne ciągi znaków jednym lekserem, zwracając wyniki w miarę przetwarzania.
+        Używa osobnego silnika (`scanners.BatchScanner`), budowanego raz dla leksera, który dopasowuje token razem
+        z poprzedzającymi go odstępami; dla silnika "longest" używany jest on sam.
+
+        :param formulas: Ciągi znaków do przetworzenia, np. wiersze pliku
+        :type formulas: Iterable[str]
+        :return: Pary (indeks ciągu, krotka tokenów); dla ciągów, których nie da się przetworzyć,
+            zamiast krotki zwracany jest `LexiconError` - błąd nie przerywa przetwarzania
+        :rtype: Iterator[tuple[int, tuple[Token, ...] | LexiconError]]
+        """
+        if self._batch is None:
+            if self.backend == "longest":
+                # Wyrażenie główne dużego słownika byłoby wolniejsze od wyszukiwania w zbiorach
+                self._batch = self.lexer
+            else:
+                table = self.lexer.table() if self.backend == "re" else None
+                self._batch = BatchScanner(self.lexer_rules, self.LITERALS, table)
+        scan = self._batch.scan
+        lower = not self.needs_casing
+        for index, formula in enumerate(formulas):
+            try:
+                tokens = scan(formula.lower() if lower else formula)
+            except LexiconError as error:
+                yield index, error
+            else:
+                yield index, tuple(tokens)
+
+    def tokenize_packed(self, formula: str, formal_system: FormalSystem) -> PackedFormula:
+        """
+        Dla danego ciągu znaków generuje formułę zakodowaną tablicą symboli leksera
+
+        :param formula: Ciąg znaków do przetworzenia
+        :type formula: str
+        :param formal_system: System formalny formuły
+        :type formal_system: FormalSystem
+        :raises LexiconError: Nie znaleziono tokenu
+        :return: Formuła w postaci kolumn liczb
+        :rtype: PackedFormula
+        """
+        return PackedFormula.from_tokens(
+            self.tokenize(formula), self.symbols, formal_system
+        )
+
+    def fresh_symbols(self, used: Iterable[str] = ()) -> FreshSymbols:
+        """
+        Zwraca obiekt przydzielający nowe symbole typów określonych w kontekście `find_new`.
+        Należy go przechowywać razem z formułą lub dowodem i przekazywać mu nowe leksemy (`FreshSymbols.use`),
+        wtedy kolejne przydziały nie przeglądają ponownie leksemów.
+
+        :param used: Leksemy już użyte, np. `Formula.getLexems()`
+        """
+        return FreshSymbols(self._enumerations, used)
 
     def generate(self, sentence: Formula, type_: str) -> Token:
         """
@@ -199,17 +397,7 @@ class BuiltLexer(object):
         if type_ not in self.generator_regexes:
             raise LexiconError(f"Type {type_} is not generatable")
         if type_ in self.find_new:
-            new_lexems = generate(self.generator_regexes[type_])
-            used_lexems = sentence.getLexems()
-
-            try:
-                while (new_lex := next(new_lexems)) in used_lexems:
-                    pass
-            except StopIteration:
-                raise LexiconError(f"Need more lexems for the {type_} type") from None
-            else:
-                return Token(type_, new_lex)
-
+            return self.fresh_symbols(sentence.getLexems()).take(type_)
         else:
             counted = Counter(
                 (token for t, token in sentence.getItems() if t == type_)
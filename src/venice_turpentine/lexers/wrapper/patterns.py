@@ -0,0 +1,109 @@
+"""
+Budowa wyrażeń regularnych dla typów tokenów z list leksemów.
+
+Leksemy będące zwykłymi napisami (np. "and", r"\\^") są łączone w drzewo prefiksowe, zapisywane jako
+zagnieżdżone grupy nieprzechwytujące, np. "imp", "if" -> ``i(?:f|mp)``. Dopasowanie kosztuje wtedy
+tyle kroków, ile znaków ma leksem, niezależnie od wielkości słownika. Pozostałe leksemy (np. r"[a-z]")
+są alternatywami w grupach nieprzechwytujących - wyrażenie nie zawiera grup przechwytujących, więc nie
+dotyczą go limit grup ply ani koszt zapamiętywania grup przez `re`.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, Optional, Union
+
+# Znaki specjalne wyrażeń; białe znaki i "#" mają znaczenie w trybie re.VERBOSE używanym przez ply
+_SPECIAL = frozenset(".^$*+?{}[]|()#") | frozenset(" \t\n\r\f\v")
+
+
+def literal(lexem: str) -> Optional[str]:
+    """Zwraca napis dopasowywany przez wyrażenie `lexem`, jeśli jest zwykłym napisem; w przeciwnym razie None"""
+    chars = []
+    escaped = False
+    for char in lexem:
+        if escaped:
+            if char.isalnum():
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _SPECIAL:
+            return None
+        else:
+            chars.append(char)
+    if escaped or not chars:
+        return None
+    return "".join(chars)
+
+
+class Trie(object):
+    """Drzewo prefiksowe napisów zapisywane jako wyrażenie regularne dopasowujące najdłuższy z nich"""
+
+    END = ""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.root: dict[str, dict] = {}
+
+    def add(self, word: str) -> None:
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self.END] = {}
+
+    def regex(self) -> str:
+        return self._regex(self.root)
+
+    @classmethod
+    def _regex(cls, node: dict[str, dict]) -> str:
+        # Rekurencja ma głębokość równą długości najdłuższego leksemu
+        branches = [re.escape(char) + cls._regex(child) for char, child in sorted(node.items()) if char != cls.END]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if cls.END in node:
+            return f"(?:{body})?"
+        return body
+
+
+def literal_runs(lexems: Iterable[str]) -> Iterator[Union[str, list[str]]]:
+    """
+    Dzieli leksemy na wyrażenia (zwracane bez zmian) i ciągi kolejnych zwykłych napisów (zwracane jako listy napisów).
+
+    Ciąg jest przerywany, gdy wcześniejszy napis jest prefiksem nowego - alternatywa dopasowałaby wtedy krótszy
+    napis, a dopasowanie najdłuższego napisu z ciągu dłuższy. Dla leksemów posortowanych malejąco
+    (jak w `BuiltLexer._join_rules`) dłuższy napis zwykle poprzedza swój prefiks, więc podziałów jest niewiele.
+    """
+    run: list[str] = []
+    seen: set[str] = set()
+    for lexem in lexems:
+        text = literal(lexem)
+        if text is None or any(text[:i] in seen for i in range(1, len(text) + 1)):
+            if run:
+                yield run
+            run, seen = [], set()
+        if text is None:
+            yield lexem
+        else:
+            run.append(text)
+            seen.add(text)
+    if run:
+        yield run
+
+
+def regex_from_list(lexems: Iterable[str]) -> str:
+    """
+    Łączy leksemy w jedno wyrażenie bez grup przechwytujących, zachowując kolejność dopasowań alternatywy:
+    każdy ciąg zwykłych napisów z `literal_runs` staje się jednym drzewem prefiksowym.
+    """
+    parts = []
+    for run in literal_runs(lexems):
+        if isinstance(run, str):
+            parts.append(f"(?:{run})")
+        else:
+            trie = Trie()
+            for text in run:
+                trie.add(text)
+            parts.append(trie.regex())
+    return "|".join(parts)
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
-from .lexer import Lexicon
+from .lexer import CONSTRAINTS
 
 
 class RuleConstraint(ABC):
@@ -11,12 +11,14 @@ class RuleConstraint(ABC):
         super().__init__()
         self.tag = tag
 
+    # Obiekt nie przechowuje stanu kontekstu, więc może być używany wielokrotnie i w wielu wątkach naraz
+
     def __enter__(self) -> None:
-        Lexicon.STACK.append((type(self).__name__, self.tag))
+        CONSTRAINTS.set(CONSTRAINTS.get() + ((type(self).__name__, self.tag),))
         return
 
     def __exit__(self, *args) -> None:
-        Lexicon.STACK.pop()
+        CONSTRAINTS.set(CONSTRAINTS.get()[:-1])
         return
 
 
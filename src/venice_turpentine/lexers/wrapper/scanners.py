@@ -0,0 +1,407 @@
+"""
+Silniki tokenizacji używane przez `BuiltLexer`:
+
+- "ply" - lekser budowany przez `ply.lex` (domyślny),
+- "re" - jedno wyrażenie główne z nazwanymi grupami dopasowywane bezpośrednio przez `re`; nie importuje ply,
+- "longest" - wyszukiwanie najdłuższego leksemu w zbiorach napisów, dla słowników z tysiącami leksemów
+  (`Lexicon.compile` wybiera go samodzielnie, zob. `LARGE_VOCABULARY`).
+
+Wszystkie silniki dają te same tokeny: reguły są sprawdzane w kolejności stosowanej przez ply (od najdłuższego
+wyrażenia, zob. `patterns.regex_from_list`), nawiasy są literałami sprawdzanymi po regułach, spacje i tabulacje są pomijane,
+a nierozpoznany tekst zgłasza `LexiconError`.
+Silniki przyjmują leksemy każdego typu (`rules`), a metoda `table` zwraca dane do zapisania w pamięci podręcznej,
+przyjmowane z powrotem przez konstruktor. Metoda `scan_from` tokenizuje leniwie od danej pozycji, zwracając
+też zakresy znaków tokenów (zob. `lexers.incremental`). Jeden silnik może tokenizować jednocześnie w wielu
+wątkach - stan tokenizacji jest lokalny dla wywołania (ply: dla wątku).
+"""
+from __future__ import annotations
+
+import re
+from threading import local
+from types import ModuleType
+from typing import Any, Callable, Iterable, Iterator, Optional, Protocol, Union
+
+from ...core.token import Token
+from ...exceptions import LexiconError
+from .patterns import literal_runs, regex_from_list
+
+IGNORE = " \t"
+# Liczba leksemów, od której `Lexicon.compile` domyślnie używa silnika "longest"
+LARGE_VOCABULARY = 2000
+
+
+class Scanner(Protocol):
+
+    def scan(self, text: str) -> list[Token]: ...
+
+    def tokenize(self, text: str) -> Iterator[Token]: ...
+
+    def scan_from(self, text: str, pos: int) -> Iterator[tuple[Token, int, int]]: ...
+
+    def table(self) -> dict[str, Any]: ...
+
+
+def rule_order(regexes: dict[str, str]) -> list[tuple[str, str]]:
+    """Kolejność reguł w wyrażeniu głównym ply: od najdłuższego wyrażenia, przy równej długości alfabetycznie"""
+    return sorted(sorted(regexes.items()), key=lambda x: len(x[1]), reverse=True)
+
+
+def rule_regexes(rules: dict[str, list[str]]) -> dict[str, str]:
+    return {type_: regex_from_list(lexems) for type_, lexems in rules.items()}
+
+
+# MARK: ply
+
+
+def ply_scanner(rules: dict[str, list[str]], literals: set[str], table: Optional[dict[str, Any]] = None) -> Scanner:
+    """Tworzy lekser ply; `table` pozwala pominąć budowę wyrażeń i sprawdzanie reguł"""
+    import ply.lex as plex
+
+    regexes = rule_regexes(rules)
+
+    class _Lex:
+        _master_re = re
+        tokens = list(regexes)
+        t_ignore = IGNORE
+
+        def __init__(self, table: Optional[dict[str, Any]] = None) -> None:
+            self.num_count = 0
+            self.literals = literals
+            self._made: dict[tuple[str, str], Token] = {}
+            # Lekser ply przechowuje stan tokenizacji (input/token), więc każdy wątek dostaje własną kopię
+            self._local = local()
+            self.build(table)
+
+        def t_error(self, t):
+            raise LexiconError(f"{t.value} is not tokenizable")
+
+        def build(self, table: Optional[dict[str, Any]] = None, **kwargs):
+            if table is None:
+                self.lexer = plex.lex(object=self, **kwargs)
+            else:
+                if table["tabversion"] != plex.__tabversion__:
+                    raise ValueError("Lexer table was written by another version of ply")
+                self.lexer = plex.Lexer()
+                self.lexer.readtab(_table_module(table), {"t_error": self.t_error})
+
+        def table(self) -> dict[str, Any]:
+            """Tablice zbudowanego leksera w formacie `Lexer.writetab`, do zapisania jako JSON"""
+            lexer = self.lexer
+            return {
+                "tabversion": plex.__tabversion__,
+                "lextokens": sorted(lexer.lextokens),
+                "lexreflags": int(lexer.lexreflags),
+                "lexliterals": "".join(sorted(lexer.lexliterals)),
+                "lexstatere": {
+                    state: [
+                        [text, [None if i is None else [i[0].__name__ if i[0] else None, i[1]] for i in func]]
+                        for (_, func), text in zip(patterns, lexer.lexstateretext[state])
+                    ]
+                    for state, patterns in lexer.lexstatere.items()
+                },
+                "lexstateignore": lexer.lexstateignore,
+                "lexstateinfo": lexer.lexstateinfo,
+            }
+
+        def _lexer(self):
+            """Kopia leksera dla bieżącego wątku; `Lexer.clone` współdzieli skompilowane wyrażenia"""
+            try:
+                return self._local.lexer
+            except AttributeError:
+                lexer = self._local.lexer = self.lexer.clone()
+                return lexer
+
+        def scan(self, s: str) -> list[Token]:
+            lexer, made, literals = self._lexer(), self._made, self.literals
+            lexer.input(s)
+            tokens = []
+            try:
+                while found := lexer.token():
+                    key = (found.type, found.value)
+                    token = made.get(key)
+                    if token is None:
+                        if found.value in literals:
+                            token = Token.literal(found.value)
+                        else:
+                            token = Token(found.type, found.value)
+                        made[key] = token
+                    tokens.append(token)
+            except plex.LexError as error:
+                raise LexiconError(str(error)) from error
+            return tokens
+
+        def scan_from(self, s: str, pos: int) -> Iterator[tuple[Token, int, int]]:
+            lexer = self.lexer.clone()
+            lexer.input(s)
+            lexer.lexpos = pos
+            try:
+                while found := lexer.token():
+                    if found.value in self.literals:
+                        yield Token.literal(found.value), found.lexpos, lexer.lexpos
+                    else:
+                        yield Token(found.type, found.value), found.lexpos, lexer.lexpos
+            except plex.LexError as error:
+                raise LexiconError(str(error)) from error
+
+        def tokenize(self, s: str):
+            # Generator może być przeplatany z innymi wywołaniami w tym samym wątku, więc używa własnej kopii
+            lexer = self.lexer.clone()
+            lexer.input(s)
+            while i := lexer.token():
+                if i.value in self.literals:
+                    yield Token.literal(i.value)
+                else:
+                    yield Token(i.type, i.value)
+
+    for type_, lexems in sorted(regexes.items(), key=lambda x: len(x[1]), reverse=True):
+        setattr(_Lex, f"t_{type_}", lexems)
+    return _Lex(table)
+
+
+def _table_module(table: dict[str, Any]) -> ModuleType:
+    """Odtwarza moduł tablic leksera (`lextab`), który `Lexer.readtab` przyjmuje zamiast importu"""
+    module = ModuleType("lextab")
+    module._tabversion = table["tabversion"]  # type: ignore[attr-defined]
+    module._lextokens = set(table["lextokens"])  # type: ignore[attr-defined]
+    module._lexreflags = table["lexreflags"]  # type: ignore[attr-defined]
+    module._lexliterals = table["lexliterals"]  # type: ignore[attr-defined]
+    module._lexstateinfo = table["lexstateinfo"]  # type: ignore[attr-defined]
+    module._lexstatere = {  # type: ignore[attr-defined]
+        state: [(text, [None if i is None else tuple(i) for i in names]) for text, names in patterns]
+        for state, patterns in table["lexstatere"].items()
+    }
+    module._lexstateignore = table["lexstateignore"]  # type: ignore[attr-defined]
+    module._lexstateerrorf = {state: "t_error" for state in table["lexstateinfo"]}  # type: ignore[attr-defined]
+    module._lexstateeoff = {}  # type: ignore[attr-defined]
+    return module
+
+
+# MARK: re
+
+
+class RegexScanner(object):
+    """Tokenizacja jednym wyrażeniem głównym `(?P<t_typ>...)|...|(?P<_literal>...)` bez udziału ply"""
+
+    def __init__(self, rules: dict[str, list[str]], literals: set[str], table: Optional[dict[str, Any]] = None) -> None:
+        super().__init__()
+        self.literals = literals
+        self.pattern = self.build_pattern(rule_regexes(rules), literals) if table is None else table["pattern"]
+        self._match = re.compile(self.pattern, re.VERBOSE).match
+        self._made: dict[tuple[Optional[str], str], Token] = {}
+
+    @staticmethod
+    def build_pattern(regexes: dict[str, str], literals: set[str]) -> str:
+        parts = []
+        for type_, regex in rule_order(regexes):
+            if re.compile(regex, re.VERBOSE).match(""):
+                raise LexiconError(f"Rule for {type_} matches the empty string")
+            parts.append(f"(?P<t_{type_}>{regex})")
+        if literals:
+            parts.append(f"(?P<_literal>{'|'.join(re.escape(i) for i in sorted(literals))})")
+        return "|".join(parts)
+
+    def table(self) -> dict[str, Any]:
+        return {"pattern": self.pattern}
+
+    def scan(self, text: str) -> list[Token]:
+        match, made, literals = self._match, self._made, self.literals
+        tokens = []
+        pos, end = 0, len(text)
+        while pos < end:
+            if text[pos] in IGNORE:
+                pos += 1
+                continue
+            found = match(text, pos)
+            if found is None:
+                raise LexiconError(f"{text[pos:]} is not tokenizable")
+            value = found.group()
+            key = (found.lastgroup, value)
+            token = made.get(key)
+            if token is None:
+                if value in literals:
+                    token = Token.literal(value)
+                else:
+                    assert found.lastgroup is not None
+                    token = Token(found.lastgroup[2:], value)
+                made[key] = token
+            tokens.append(token)
+            pos = found.end()
+        return tokens
+
+    def scan_from(self, text: str, pos: int) -> Iterator[tuple[Token, int, int]]:
+        end = len(text)
+        while pos < end:
+            if text[pos] in IGNORE:
+                pos += 1
+                continue
+            found = self._match(text, pos)
+            if found is None:
+                raise LexiconError(f"{text[pos:]} is not tokenizable")
+            value = found.group()
+            if value in self.literals:
+                yield Token.literal(value), pos, found.end()
+            else:
+                assert found.lastgroup is not None
+                yield Token(found.lastgroup[2:], value), pos, found.end()
+            pos = found.end()
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        return iter(self.scan(text))
+
+
+class BatchScanner(RegexScanner):
+    """
+    Wariant `RegexScanner` dla `BuiltLexer.tokenize_many`: odstępy przed tokenem są częścią wyrażenia głównego,
+    więc każdy token to jedno dopasowanie, bez sprawdzania kolejnych znaków w Pythonie.
+    Daje te same tokeny co pozostałe silniki, a zapamiętane tokeny są wspólne dla wszystkich ciągów.
+    """
+
+    def __init__(self, rules: dict[str, list[str]], literals: set[str], table: Optional[dict[str, Any]] = None) -> None:
+        super().__init__(rules, literals, table)
+        self._skipping = re.compile(f"[{IGNORE}]*(?:{self.pattern})", re.VERBOSE).match
+
+    def scan(self, text: str) -> list[Token]:
+        match, made, literals = self._skipping, self._made, self.literals
+        tokens: list[Token] = []
+        append = tokens.append
+        pos, end = 0, len(text.rstrip(IGNORE))
+        while pos < end:
+            found = match(text, pos)
+            if found is None:
+                raise LexiconError(f"{text[pos:].lstrip(IGNORE)} is not tokenizable")
+            # Klucz obejmuje poprzedzające odstępy, więc znany token nie wymaga wyodrębniania grupy
+            key = (found.lastgroup, found.group())
+            token = made.get(key)
+            if token is None:
+                name = found.lastgroup
+                assert name is not None
+                value = found.group(name)
+                token = Token.literal(value) if value in literals else Token(name[2:], value)
+                made[key] = token
+            append(token)
+            pos = found.end()
+        return tokens
+
+
+# MARK: longest
+
+
+class LongestMatchScanner(object):
+    """
+    Tokenizacja bez jednego dużego wyrażenia: dla każdej reguły (w kolejności `rule_order`) zwykłe napisy
+    są szukane w zbiorach według pierwszego znaku i długości - od najdłuższej - a pozostałe leksemy dopasowywane
+    osobnymi wyrażeniami. Koszt tokenu zależy od liczby typów i różnych długości leksemów, a nie od liczby leksemów.
+    """
+
+    def __init__(self, rules: dict[str, list[str]], literals: set[str], table: Optional[dict[str, Any]] = None) -> None:
+        super().__init__()
+        self.literals = literals
+        # Kolejne części reguł: (typ, pierwszy znak -> (długości od największej, zbiór napisów)) albo (typ, dopasowanie)
+        self._parts: list[tuple[str, Union[dict[str, tuple[list[int], set[str]]], Callable]]] = [
+            (type_, part) for type_, _ in rule_order(rule_regexes(rules)) for part in self._split(rules[type_])
+        ]
+        self._parts.append(("", self._by_first(literals)))
+        # Pierwszy znak -> części, które mogą pasować: (typ, długości, zbiór napisów) albo (typ, None, dopasowanie)
+        self._candidates: dict[str, list[tuple[str, Optional[list[int]], Any]]] = {}
+        self._made: dict[tuple[str, str], Token] = {}
+
+    @classmethod
+    def _split(cls, lexems: list[str]) -> Iterator[Union[dict[str, tuple[list[int], set[str]]], Callable]]:
+        for run in literal_runs(lexems):
+            if isinstance(run, str):
+                compiled = re.compile(run, re.VERBOSE)
+                if compiled.match(""):
+                    raise LexiconError(f"Rule {run} matches the empty string")
+                yield compiled.match
+            else:
+                yield cls._by_first(run)
+
+    @staticmethod
+    def _by_first(words: Iterable[str]) -> dict[str, tuple[list[int], set[str]]]:
+        grouped: dict[str, set[str]] = {}
+        for word in words:
+            grouped.setdefault(word[0], set()).add(word)
+        return {char: (sorted({len(i) for i in group}, reverse=True), group) for char, group in grouped.items()}
+
+    def table(self) -> dict[str, Any]:
+        return {}
+
+    def _candidatesFor(self, char: str) -> list[tuple[str, Optional[list[int]], Any]]:
+        candidates: list[tuple[str, Optional[list[int]], Any]] = []
+        for type_, part in self._parts:
+            if isinstance(part, dict):
+                if char in part:
+                    candidates.append((type_, *part[char]))
+            else:
+                candidates.append((type_, None, part))
+        self._candidates[char] = candidates
+        return candidates
+
+    def _match(self, text: str, pos: int) -> Optional[tuple[str, int]]:
+        candidates = self._candidates.get(text[pos])
+        if candidates is None:
+            candidates = self._candidatesFor(text[pos])
+        for type_, lengths, part in candidates:
+            if lengths is None:
+                if found := part(text, pos):
+                    return type_, found.end()
+            else:
+                for length in lengths:
+                    if text[pos:pos + length] in part:
+                        return type_, pos + length
+        return None
+
+    def scan(self, text: str) -> list[Token]:
+        made, match = self._made, self._match
+        tokens = []
+        pos, end = 0, len(text)
+        while pos < end:
+            if text[pos] in IGNORE:
+                pos += 1
+                continue
+            found = match(text, pos)
+            if found is None:
+                raise LexiconError(f"{text[pos:]} is not tokenizable")
+            type_, stop = found
+            value = text[pos:stop]
+            key = (type_, value)
+            token = made.get(key)
+            if token is None:
+                token = Token.literal(value) if value in self.literals else Token(type_, value)
+                made[key] = token
+            tokens.append(token)
+            pos = stop
+        return tokens
+
+    def scan_from(self, text: str, pos: int) -> Iterator[tuple[Token, int, int]]:
+        end = len(text)
+        while pos < end:
+            if text[pos] in IGNORE:
+                pos += 1
+                continue
+            found = self._match(text, pos)
+            if found is None:
+                raise LexiconError(f"{text[pos:]} is not tokenizable")
+            type_, stop = found
+            value = text[pos:stop]
+            yield (Token.literal(value) if value in self.literals else Token(type_, value)), pos, stop
+            pos = stop
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        return iter(self.scan(text))
+
+
+SCANNERS: dict[str, Callable[[dict[str, list[str]], set[str], Optional[dict[str, Any]]], Scanner]] = {
+    "ply": ply_scanner,
+    "re": RegexScanner,
+    "longest": LongestMatchScanner,
+}
+
+
+def backend_version(backend: str) -> Optional[str]:
+    """Wersja biblioteki, która buduje tablice silnika; None dla silników korzystających jedynie z `re`"""
+    if backend != "ply":
+        return None
+    import ply.lex as plex
+
+    return plex.__version__
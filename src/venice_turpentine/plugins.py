@@ -0,0 +1,232 @@
+"""
+Rejestr wtyczek: systemów formalnych, leksykonów oraz modułów zapisu drzew dowodu.
+
+Wtyczki są deklarowane jako punkty wejścia pakietów (`[project.entry-points."<grupa>"]` w pyproject.toml)
+w postaci "moduł:obiekt". Przy pierwszym użyciu rejestru odczytywane są jedynie metadane pakietów -
+moduł wtyczki jest importowany dopiero, gdy wtyczka jest potrzebna.
+
+Sprawdzenie interfejsu wtyczki jest zapamiętywane razem z czasem modyfikacji pliku modułu
+(także na dysku, zob. `cache`), więc nowy proces nie sprawdza ponownie niezmienionych wtyczek.
+Załadowane wtyczki są przechowywane w ograniczonej pamięci LRU; systemy formalne są przechowywane bez limitu,
+bo ich instancje muszą być współdzielone (`get_formal_system` zawsze zwraca ten sam obiekt).
+"""
+from __future__ import annotations
+
+import inspect
+import os
+from collections import OrderedDict
+from importlib import import_module
+from importlib.metadata import entry_points
+from types import ModuleType
+from typing import Any, Callable, Generic, Optional, TypeVar, Union
+
+from .cache import read_json, write_json
+from .exceptions import PluginError
+
+P = TypeVar("P")
+
+FORMAL_SYSTEMS = "venice_turpentine.formal_systems"
+LEXICONS = "venice_turpentine.lexicons"
+OUTPUT_WRITERS = "venice_turpentine.output_writers"
+
+VERIFIED_FILE = "verified_plugins.json"
+
+
+class _VerifiedCache(object):
+    """Wyniki sprawdzenia wtyczek: "grupa moduł:obiekt" -> [plik modułu, czas modyfikacji]"""
+
+    def __init__(self) -> None:
+        self._entries: Optional[dict[str, list[Any]]] = None
+
+    def _load(self) -> dict[str, list[Any]]:
+        if self._entries is None:
+            data = read_json(VERIFIED_FILE)
+            self._entries = data if isinstance(data, dict) else {}
+        return self._entries
+
+    def isVerified(self, key: str, stamp: list[Any]) -> bool:
+        return self._load().get(key) == stamp
+
+    def add(self, key: str, stamp: list[Any]) -> None:
+        self._load()[key] = stamp
+        write_json(VERIFIED_FILE, self._entries)
+
+    def clear(self) -> None:
+        self._entries = {}
+
+
+VERIFIED = _VerifiedCache()
+
+
+def _stamp(obj: Any) -> Optional[list[Any]]:
+    """Identyfikuje wersję pliku, w którym zdefiniowano obiekt; None jeśli nie ma go na dysku"""
+    module = obj if isinstance(obj, ModuleType) else inspect.getmodule(obj)
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return None
+    try:
+        return [path, os.stat(path).st_mtime_ns]
+    except OSError:
+        return None
+
+
+class PluginRegistry(Generic[P]):
+    """
+    Rejestr jednej grupy wtyczek.
+
+    :param group: Nazwa grupy punktów wejścia
+    :param verify: Sprawdza interfejs wtyczki; zgłasza `PluginError`, jeśli wtyczka nie pasuje
+    :param builtin: Wtyczki dostępne także bez instalacji pakietu ("nazwa" -> "moduł:obiekt")
+    :param create: Tworzy obiekt przechowywany w rejestrze z obiektu wskazanego przez punkt wejścia
+    :param maxsize: Liczba przechowywanych załadowanych wtyczek; None - wtyczki nie są usuwane z pamięci,
+        więc kolejne `get` zawsze zwracają ten sam obiekt
+    """
+
+    def __init__(
+        self,
+        group: str,
+        verify: Callable[[Any], None],
+        builtin: Optional[dict[str, str]] = None,
+        create: Optional[Callable[[Any], P]] = None,
+        maxsize: Optional[int] = 16,
+    ) -> None:
+        super().__init__()
+        self.group = group
+        self.maxsize = maxsize
+        self._verify = verify
+        self._create = create
+        self._builtin = dict(builtin or {})
+        # Nazwa -> ścieżka "moduł:obiekt" lub obiekt zarejestrowany bezpośrednio
+        self._targets: Optional[dict[str, Union[str, Any]]] = None
+        self._loaded: OrderedDict[str, P] = OrderedDict()
+
+    def _discover(self) -> dict[str, Union[str, Any]]:
+        """Odczytuje punkty wejścia grupy - bez importowania wtyczek"""
+        if self._targets is None:
+            targets: dict[str, Union[str, Any]] = dict(self._builtin)
+            for entry_point in entry_points(group=self.group):
+                targets[entry_point.name] = entry_point.value
+            self._targets = targets
+        return self._targets
+
+    def names(self) -> list[str]:
+        """Zwraca nazwy dostępnych wtyczek"""
+        return list(self._discover())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._discover()
+
+    def register(self, name: str, target: Union[str, Any]) -> None:
+        """Rejestruje wtyczkę pod nazwą; `target` to obiekt lub ścieżka "moduł:obiekt" importowana przy pierwszym użyciu"""
+        if not isinstance(target, str):
+            self._verify(target)
+        self._discover()[name] = target
+        self._loaded.pop(name, None)
+
+    def get(self, name: str) -> P:
+        """
+        Zwraca wtyczkę o podanej nazwie, importując ją przy pierwszym użyciu
+
+        :raises PluginError: Wtyczka nie istnieje lub nie pasuje do interfejsu grupy
+        """
+        try:
+            plugin = self._loaded[name]
+        except KeyError:
+            pass
+        else:
+            self._loaded.move_to_end(name)
+            return plugin
+
+        try:
+            target = self._discover()[name]
+        except KeyError:
+            raise PluginError(f"Plugin '{name}' is not registered in {self.group}") from None
+        if isinstance(target, str):
+            target = self._import(target)
+        plugin = target if self._create is None else self._create(target)
+
+        self._loaded[name] = plugin
+        if self.maxsize is not None and len(self._loaded) > self.maxsize:
+            self._loaded.popitem(last=False)
+        return plugin
+
+    def _import(self, path: str) -> Any:
+        module_name, _, attr = path.partition(":")
+        try:
+            obj: Any = import_module(module_name)
+            for part in attr.split(".") if attr else ():
+                obj = getattr(obj, part)
+        except (ImportError, AttributeError) as error:
+            raise PluginError(f"Plugin {path} can't be imported: {error}") from error
+
+        key = f"{self.group} {path}"
+        stamp = _stamp(obj)
+        if stamp is None or not VERIFIED.isVerified(key, stamp):
+            self._verify(obj)
+            if stamp is not None:
+                VERIFIED.add(key, stamp)
+        return obj
+
+    def nameOf(self, obj: Any) -> Optional[str]:
+        """Zwraca nazwę, pod którą zarejestrowano wtyczkę (lub jej klasę); None jeśli nie jest zarejestrowana"""
+        candidates = [obj] if isinstance(obj, type) or self._create is None else [obj, type(obj)]
+        for name, plugin in self._loaded.items():
+            if plugin is obj:
+                return name
+        for name, target in self._discover().items():
+            for candidate in candidates:
+                if target is candidate or target == f"{getattr(candidate, '__module__', None)}:{getattr(candidate, '__qualname__', None)}":
+                    return name
+        return None
+
+    def clear(self) -> None:
+        """Zapomina załadowane wtyczki i odczytane punkty wejścia"""
+        self._targets = None
+        self._loaded.clear()
+
+
+# MARK: Interfejsy grup
+
+
+def verify_formal_system(obj: Any) -> None:
+    from .formal_systems.base import FormalSystem
+
+    if not (isinstance(obj, type) and issubclass(obj, FormalSystem)):
+        raise PluginError(f"{obj!r} is not a FormalSystem subclass")
+    if inspect.isabstract(obj):
+        raise PluginError(f"{obj.__qualname__} doesn't implement {', '.join(sorted(obj.__abstractmethods__))}")
+
+
+def verify_lexicon(obj: Any) -> None:
+    from .lexers.wrapper import Lexicon
+
+    if not isinstance(obj, Lexicon):
+        raise PluginError(f"{obj!r} is not a Lexicon")
+
+
+def verify_output_writer(obj: Any) -> None:
+    """Moduł zapisu udostępnia `write_tree(tree) -> list[str]`"""
+    write_tree = getattr(obj, "write_tree", None)
+    if not callable(write_tree):
+        raise PluginError(f"{obj!r} doesn't define write_tree")
+    try:
+        inspect.signature(write_tree).bind(None)
+    except TypeError:
+        raise PluginError(f"{obj!r}.write_tree must accept a single tree argument") from None
+    except ValueError:
+        pass
+
+
+formal_systems: PluginRegistry[Any] = PluginRegistry(
+    FORMAL_SYSTEMS,
+    verify_formal_system,
+    {"debug": "venice_turpentine.formal_systems.debug:DebugFormalSystem"},
+    create=lambda cls: cls(),
+    maxsize=None,
+)
+lexicons: PluginRegistry[Any] = PluginRegistry(
+    LEXICONS,
+    verify_lexicon,
+    {"basic": "venice_turpentine.lexers.basic:Lex"},
+)
+output_writers: PluginRegistry[Any] = PluginRegistry(OUTPUT_WRITERS, verify_output_writer)
@@ -0,0 +1,27 @@
+import pytest
+
+from venice_turpentine.cache import ENVIRONMENT_VARIABLE
+from venice_turpentine.core.formula import Formula
+from venice_turpentine.core.token import Token
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+
+
+@pytest.fixture
+def to_formula():
+    """Buduje zdanie z tokenów-literałów rozdzielonych spacjami"""
+
+    def make(str_formula, formal_system=None):
+        return Formula(
+            [Token.literal(i) for i in str_formula.split()],
+            formal_system or DebugFormalSystem(),
+        )
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Pamięć podręczna na dysku w katalogu tymczasowym testu"""
+    directory = tmp_path / "cache"
+    monkeypatch.setenv(ENVIRONMENT_VARIABLE, str(directory))
+    return directory
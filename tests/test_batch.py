@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from venice_turpentine.core.packed import PackedFormula
+from venice_turpentine.core.symbols import SymbolTable
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+
+pytest.importorskip("numpy")
+
+from venice_turpentine.core.batch import (  # noqa: E402
+    FormulaBatch,
+    batch_main_connective,
+    batch_precedence,
+)
+
+
+def random_tokens(rng):
+    alphabet = ["(", ")", "a", "b", "and", "or", "imp", "neg", "unary"]
+    return " ".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 15)))
+
+
+@pytest.fixture
+def formulas(to_formula):
+    rng = random.Random(0)
+    return [to_formula(random_tokens(rng)) for _ in range(500)] + [
+        to_formula("neg neg ( a or neg b )"),
+        to_formula("neg a or neg b )"),
+        to_formula("a"),
+    ]
+
+
+def test_matches_scalar(formulas):
+    system = DebugFormalSystem()
+    assert batch_precedence(formulas, system) == [i.precedence() for i in formulas]
+    assert batch_main_connective(formulas, system) == [i.getMainConnective() for i in formulas]
+
+
+def test_packed_input(formulas):
+    symbols = SymbolTable()
+    packed = [PackedFormula.from_formula(i, symbols) for i in formulas]
+    system = DebugFormalSystem()
+    assert batch_main_connective(packed, system) == [i.getMainConnective() for i in formulas]
+
+
+def test_empty(to_formula):
+    assert batch_main_connective([], DebugFormalSystem()) == []
+    assert len(FormulaBatch([to_formula("")], DebugFormalSystem())) == 1
+    assert batch_main_connective([to_formula("")], DebugFormalSystem()) == [None]
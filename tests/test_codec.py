@@ -0,0 +1,103 @@
+import copy
+import pickle
+
+import pytest
+
+from venice_turpentine.core import codec
+from venice_turpentine.core.formula import Formula, dumps, loads
+from venice_turpentine.core.token import Token
+from venice_turpentine.exceptions import FormulaError
+from venice_turpentine.formal_systems import FormalSystem, get_formal_system
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+
+
+class UnregisteredFormalSystem(DebugFormalSystem):
+    pass
+
+
+FORMULAS = [
+    "( a and b ) imp neg c",
+    "neg neg ( a or neg b )",
+    "a ) or ( b",
+    "a",
+    "",
+]
+
+
+def test_roundtrip(to_formula):
+    formulas = [to_formula(i) for i in FORMULAS]
+    formulas[0].precedence()
+    formulas[2].precedence()
+    loaded = loads(dumps(formulas))
+    assert [i.getItems() for i in loaded] == [i.getItems() for i in formulas]
+    assert [i.precedenceBaked for i in loaded] == [i.precedenceBaked for i in formulas]
+    assert all(i.formal_system is get_formal_system("debug") for i in loaded)
+    assert loaded[0][0] is Token.LEFT_BRACKET()
+
+
+def test_tokens_are_interned():
+    formula = Formula([Token("sentvar", "p"), Token("and", "&"), Token("sentvar", "q")], DebugFormalSystem())
+    (loaded,) = loads(dumps([formula]))
+    assert all(i is j for i, j in zip(loaded, formula))
+
+
+@pytest.mark.parametrize("clone", [lambda x: pickle.loads(pickle.dumps(x)), copy.deepcopy])
+@pytest.mark.parametrize("freeze", [False, True])
+def test_pickle(clone, freeze, to_formula):
+    formula = to_formula("( a and b ) imp neg c")
+    formula.precedence()
+    if freeze:
+        formula = formula.freeze()
+    cloned = clone(formula)
+    assert type(cloned) is type(formula)
+    assert cloned.getItems() == formula.getItems()
+    assert cloned.precedenceBaked == formula.precedenceBaked
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy])
+def test_copy_keeps_formal_system(clone):
+    system = UnregisteredFormalSystem()
+    formula = Formula([Token.literal(i) for i in "a and b".split()], system)
+    formula.precedence()
+    cloned = clone(formula)
+    assert cloned is not formula
+    assert cloned.formal_system is system
+    assert cloned.precedenceBaked == formula.precedenceBaked
+    frozen = formula.freeze()
+    assert clone(frozen) is frozen
+
+
+def test_pickle_is_compact(to_formula):
+    formula = to_formula("( a and b ) imp neg c")
+    assert b"DebugFormalSystem" not in pickle.dumps(formula)
+
+
+def test_pickle_unregistered_system(to_formula):
+    formula = to_formula("a and b", UnregisteredFormalSystem())
+    cloned = pickle.loads(pickle.dumps(formula))
+    assert isinstance(cloned.formal_system, UnregisteredFormalSystem)
+    with pytest.raises(FormulaError):
+        dumps([formula])
+
+
+@pytest.mark.parametrize("make_data", [
+    lambda f: b"",
+    lambda f: b"nope",
+    lambda f: dumps([f("a and b")])[:-1],
+    # Rekord wskazuje nieistniejący system formalny
+    lambda f: codec.MAGIC + bytes([0, 0, 0, 0, 1, 1, 3, 0]),
+    # Siła wiązania przypisana indeksowi spoza formuły
+    lambda f: codec.encode([codec.Record([Token.literal("a")], "debug", {5: 0})]),
+])
+def test_corrupted(make_data, to_formula):
+    with pytest.raises(FormulaError):
+        loads(make_data(to_formula))
+
+
+def test_varint_levels():
+    record = codec.Record([Token.literal("a")] * 3, None, {0: -200, 2: 300})
+    assert codec.decode(codec.encode([record])) == [record]
+
+
+def test_registry():
+    assert isinstance(get_formal_system("debug"), FormalSystem)
@@ -0,0 +1,112 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Barrier, Thread
+
+import pytest
+
+from venice_turpentine.exceptions import LexiconError
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+from venice_turpentine.lexers import BasicLex
+from venice_turpentine.lexers.wrapper import Lexicon, find_new, use_language
+
+CORPUS = Path(__file__).parents[1] / "old_tests" / "tautologies_20_5-1.txt"
+CONSTRAINTS = {"use_language": ("propositional", "uses negation")}
+
+
+@pytest.fixture(autouse=True)
+def switch_often():
+    """Częste przełączanie wątków zwiększa szansę przeplotu w trakcie tokenizacji"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run(lexer, text):
+    try:
+        return lexer.tokenize(text)
+    except LexiconError as error:
+        return str(error)
+
+
+def test_constraints_per_thread():
+    barrier = Barrier(2)
+    lexicons = {}
+
+    def build(language):
+        lex = Lexicon()
+        with use_language(language):
+            barrier.wait()
+            lex["and"] = "and"
+            with find_new():
+                barrier.wait()
+                lex["sentvar"] = "[a-z]"
+            barrier.wait()
+            lex["or"] = "or"
+        lexicons[language] = lex
+
+    threads = [Thread(target=build, args=(i,)) for i in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for language, lex in lexicons.items():
+        constraints = {i.type_: i.constraints for i in lex.rules}
+        assert constraints == {
+            "and": (("use_language", language),),
+            "sentvar": (("use_language", language), ("find_new", "")),
+            "or": (("use_language", language),),
+        }
+
+
+def test_stack_alias():
+    lex = Lexicon()
+    with use_language("first"):
+        assert list(Lexicon.STACK) == [("use_language", "first")]
+        Lexicon.STACK.append(("find_new", ""))
+        lex["sentvar"] = "[a-z]"
+        assert Lexicon.STACK.pop() == ("find_new", "")
+        lex["and"] = "and"
+        done = []
+        thread = Thread(target=lambda: done.append(list(Lexicon.STACK)))
+        thread.start()
+        thread.join()
+        assert done == [[]]
+    assert len(Lexicon.STACK) == 0
+    constraints = {i.type_: i.constraints for i in lex.rules}
+    assert constraints == {
+        "sentvar": (("use_language", "first"), ("find_new", "")),
+        "and": (("use_language", "first"),),
+    }
+
+
+@pytest.mark.parametrize("backend", ["ply", "re", "longest"])
+def test_shared_lexer(backend):
+    lexer = BasicLex.compile(backend=backend, **CONSTRAINTS)
+    lines = CORPUS.read_text(encoding="utf-8").splitlines()
+    expected = [run(lexer, i) for i in lines]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(4):
+            assert list(pool.map(lambda text: run(lexer, text), lines, chunksize=4)) == expected
+
+
+def test_shared_symbol_table():
+    lexer = BasicLex.compile(backend="re", no_generation=("",), **CONSTRAINTS)
+    lines = [f"p{i} and q{i % 50}" for i in range(2000)]
+    system = DebugFormalSystem()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        packed = list(pool.map(lambda text: lexer.tokenize_packed(text, system), lines))
+    symbols = lexer.symbols
+    assert len(set(symbols.lexems)) == len(symbols.lexems)
+    assert all(symbols.lexem_id(i) == n for n, i in enumerate(symbols.lexems))
+    assert [list(i) for i in packed] == [lexer.tokenize(i) for i in lines]
+
+
+def test_interleaved_generators():
+    lexer = BasicLex.compile(backend="ply", **CONSTRAINTS)
+    first = lexer.lexer.tokenize("p and q")
+    second = lexer.lexer.tokenize("r or s")
+    pairs = list(zip(first, second))
+    assert [(i.lexem, j.lexem) for i, j in pairs] == [("p", "r"), ("and", "or"), ("q", "s")]
@@ -0,0 +1,51 @@
+from venice_turpentine.formal_systems import FormalSpec, FormalSystem
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+
+
+class CountingSystem(DebugFormalSystem):
+    """Zlicza odczyty tablic systemu formalnego"""
+
+    def __init__(self) -> None:
+        self.reads = 0
+
+    @property
+    def operator_precedence(self) -> dict[str, int]:
+        self.reads += 1
+        return super().operator_precedence
+
+
+def test_spec():
+    spec = DebugFormalSystem().spec
+    assert isinstance(spec, FormalSpec)
+    assert spec.types == ("neg", "unary", "and", "or", "imp")
+    assert spec.ids["and"] == 2
+    assert spec.precedence == (3, 3, 2, 2, 1)
+    assert spec.values == (0.75, 0.75, 0.5, 0.5, 0.25)
+    assert spec.arity == (1, 1, 2, 2, 2)
+    assert spec.unary == 0b11
+    assert spec.isUnary(1) and not spec.isUnary(2)
+    assert spec.unary_types == {"neg", "unary"}
+    assert spec.connective("a") is None
+    assert spec.value("imp", 2) == 2.25
+    assert DebugFormalSystem().operator_precedence_scale == 4
+
+
+def test_compiled_once(to_formula):
+    system = CountingSystem()
+    for _ in range(3):
+        formula = to_formula("( a and b ) imp neg c", system)
+        formula.precedence()
+        formula.getComponents()
+        formula.calcPrecedenceVal("and", 1)
+    assert system.spec is system.spec
+    assert system.operator_precedence_scale == 4
+    assert system.reads == 1
+
+
+def test_empty_system():
+    class Empty(FormalSystem):
+        operator_precedence = {}
+        unary_operators = []
+
+    assert Empty().spec.scale == 1
+    assert Empty().spec.types == ()
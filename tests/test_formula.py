@@ -1,7 +1,11 @@
+import copy
+import pickle
+
 import pytest
 
-from venice_turpentine.core.formula import Formula
+from venice_turpentine.core.formula import Formula, FrozenFormula
 from venice_turpentine.core.token import Token
+from venice_turpentine.exceptions import FormulaError
 from venice_turpentine.formal_systems.debug import DebugFormalSystem
 
 @pytest.mark.parametrize("original_str_formula, expected_precedence", [
@@ -57,7 +61,9 @@ def test_getMainConnective(str_formula, connective_index):
     ("neg neg ( neg b )", 0, None, "neg ( neg b )"),
     ("neg neg ( a or neg b )", 4, "neg neg ( a )", "neg b"),
     ("neg a or neg b", 2, "neg a", "neg b"),
-    ("a", 1, "a", None)
+    ("a", 1, "a", None),
+    ("( a and b ) or c", 2, "a", "( b ) or c"),
+    ("( ( a ) and b )", 4, "a", "b"),
 ])
 def test_splitByIndex(str_formula, index, expected_str_formula_left, expected_str_formula_right):
     formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
@@ -98,6 +104,7 @@ def test_splitByIndex(str_formula, index, expected_str_formula_left, expected_st
     ("a", None, None, None),
     ("a and b imp c and d", "imp", "a and b", "c and d"),
     ("a and b imp c and d", "imp", "a and b", "c and d"),
+    ("( a and b )", "and", "a", "b"),
 ])
 def test_getComponents(str_formula, expected_connective, expected_left_result, expected_right_result):
     formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
@@ -130,6 +137,16 @@ def test_getComponents(str_formula, expected_connective, expected_left_result, e
     else:
         assert formula_right.getTypes() == expected_formula_right
 
+
+def test_getComponents_returns_formulas(to_formula):
+    formula = to_formula("( p and q ) or neg r")
+    _, (left, right) = formula.getComponents()
+    assert type(left) is Formula and type(right) is Formula
+    assert not left.isLiteral() and right.isLiteral()
+    # Części są niezależnymi kopiami
+    left[0] = Token.literal("s")
+    assert formula.getTypes()[1] == "p"
+
 @pytest.mark.parametrize("str_formula, expected_str_formula", [
     ("neg neg c", "c"),
     ("neg neg ( neg b )", "b"),
@@ -160,4 +177,280 @@ def test_removeMainUnary_all(str_formula, expected_str_formula):
 def test_removeMainUnary_selected(str_formula, expected_str_formula):
     formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
     expected_formula = Formula([Token.literal(i) for i in expected_str_formula.split()], DebugFormalSystem())
-    assert formula.removeMainUnary(["neg"]).getTypes() == expected_formula.getTypes()
\ No newline at end of file
+    assert formula.removeMainUnary(["neg"]).getTypes() == expected_formula.getTypes()
+
+def test_removeMainUnary_deep():
+    # Więcej poziomów niż domyślny limit rekurencji
+    depth = 5_000
+    formula = Formula([Token.literal("neg")] * depth + [Token.literal("a")], DebugFormalSystem())
+    assert formula.removeMainUnary().getTypes() == ["a"]
+    assert formula.freeze().view().removeMainUnary().getTypes() == ["a"]
+
+def fresh_precedence(formula):
+    return Formula(list(formula), DebugFormalSystem()).precedence()
+
+@pytest.mark.parametrize("str_formula", [
+    "a and b or c",
+    "( a and b ) imp neg c",
+    "( ( neg a ) and ( neg b ) )",
+    "neg neg ( a or neg b )",
+    "a",
+])
+def test_precedence_derived(str_formula):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    formula.precedence()
+    derived = [
+        formula[2:],
+        formula[:-2],
+        formula[1:4],
+        formula * 3,
+        formula.combine(list(formula)),
+        formula.reduceBrackets(),
+        formula.removeMainUnary(),
+    ]
+    if (main := formula.getMainConnective()) is not None:
+        derived.extend(i for i in formula.splitByIndex(main) if i is not None)
+    for i in derived:
+        assert i.precedenceBaked is not None
+        assert i.precedenceBaked == fresh_precedence(i)
+    # Części z drzewa składniowego są widokami - siła wiązania jest wyznaczana z bufora
+    for i in formula.getComponents()[1]:
+        if i is not None:
+            assert i.precedence() == fresh_precedence(i)
+
+def test_precedence_empty_is_baked():
+    formula = Formula([Token.literal("a")], DebugFormalSystem())
+    assert formula.precedenceBaked is None
+    assert formula.precedence() == {}
+    assert formula.precedenceBaked == {}
+
+@pytest.mark.parametrize("mutate", [
+    lambda f: f.__iadd__([Token.literal("and"), Token.literal("b")]),
+    lambda f: f.extend([Token.literal("and"), Token.literal("b")]),
+    lambda f: (f.append(Token.literal("and")), f.append(Token.literal("b"))),
+    lambda f: (f.insert(0, Token.literal("and")), f.insert(0, Token.literal("b"))),
+    lambda f: f.__setitem__(slice(1, 1), [Token.literal("and"), Token.literal("b")]),
+])
+def test_mutation_resets_precedence(mutate):
+    formula = Formula([Token.literal("a")], DebugFormalSystem())
+    assert formula.getMainConnective() is None
+    mutate(formula)
+    assert formula.precedenceBaked is None
+    assert formula.getMainConnective() == 1
+    connective, (left, right) = formula.getComponents()
+    assert connective.type_ == "and"
+
+def test_mutation_resets_all_caches():
+    formula = Formula([Token.literal(i) for i in "a and b or c".split()], DebugFormalSystem())
+    formula.precedence()
+    for mutate in (
+        lambda f: f.pop(),
+        lambda f: f.remove(f[-1]),
+        lambda f: f.__delitem__(-1),
+        lambda f: f.reverse(),
+        lambda f: f.sort(key=lambda t: t.type_),
+        lambda f: f.__imul__(2),
+        lambda f: f.clear(),
+    ):
+        formula.precedence()
+        formula.brackets()
+        mutate(formula)
+        assert formula.precedenceBaked is None
+        assert formula.bracketsBaked is None
+        assert formula.treeBaked is None
+
+@pytest.mark.parametrize("str_formula, matches, outer", [
+    ("( a and ( b ) )", {0: 6, 3: 5, 5: 3, 6: 0}, 1),
+    ("( a ) and ( b )", {0: 2, 2: 0, 4: 6, 6: 4}, 0),
+    ("( ( ( a ) ) )", {0: 6, 1: 5, 2: 4, 4: 2, 5: 1, 6: 0}, 3),
+    ("neg ( a", {}, 0),
+    ("a ) and b", {}, 0),
+])
+def test_brackets(str_formula, matches, outer):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    for i in range(len(formula)):
+        assert formula.matchingBracket(i) == matches.get(i)
+    assert formula.outerBrackets() == outer
+    assert formula.isWrapped() == (outer > 0)
+
+@pytest.mark.parametrize("str_formula, expected_depths", [
+    ("( a and ( b ) )", [0, 1, 1, 1, 2, 2, 1, 0]),
+    ("neg ( a", [0, 0, 1, 1]),
+    ("a ) and b", [0, 0, -1, -1, -1]),
+])
+def test_depthAt(str_formula, expected_depths):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    assert [formula.depthAt(i) for i in range(len(formula) + 1)] == expected_depths
+
+@pytest.mark.parametrize("str_formula", [
+    "( ( a ) and ( b ) )",
+    "a ) or ( b",
+    ") ) ( (",
+    "( a and ( b or c ) ) imp ( d )",
+])
+def test_isBalanced(str_formula):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    index = formula.brackets()
+    for start in range(len(formula) + 1):
+        for stop in range(start, len(formula) + 1):
+            depth = index.depth[start : stop + 1]
+            assert index.isBalanced(start, stop) == (depth[-1] == depth[0] and min(depth) >= depth[0])
+
+def test_brackets_after_mutation():
+    formula = Formula([Token.literal(i) for i in "( a ) and b".split()], DebugFormalSystem())
+    assert formula.matchingBracket(0) == 2
+    formula.insert(0, Token.literal("("))
+    formula.append(Token.literal(")"))
+    assert formula.matchingBracket(0) == 6
+    assert formula.matchingBracket(1) == 3
+    assert formula.outerBrackets() == 1
+    frozen = formula.freeze()
+    assert frozen.brackets().match == (6, 3, -1, 1, -1, -1, 0)
+    assert frozen.reduceBrackets().getTypes() == ["(", "a", ")", "and", "b"]
+
+def test_slots():
+    formula = Formula([Token.literal("a")], DebugFormalSystem())
+    assert not hasattr(formula, "__dict__")
+    assert not hasattr(formula.freeze(), "__dict__")
+
+def test_frozen_matches_formula():
+    formula = Formula([Token.literal(i) for i in "( a and b ) imp neg c".split()], DebugFormalSystem())
+    frozen = formula.freeze()
+    assert isinstance(frozen, FrozenFormula)
+    assert frozen == formula and formula == frozen
+    assert hash(frozen) == hash(formula)
+    assert str(frozen) == str(formula)
+    assert frozen.getUnique() == formula.getUnique()
+    assert frozen.getMainConnective() == formula.getMainConnective()
+    assert frozen.freeze() is frozen
+
+@pytest.mark.parametrize("mutate", [
+    lambda f: f.append(Token.literal("a")),
+    lambda f: f.extend([Token.literal("a")]),
+    lambda f: f.insert(0, Token.literal("a")),
+    lambda f: f.pop(),
+    lambda f: f.clear(),
+    lambda f: f.reverse(),
+    lambda f: f.__setitem__(0, Token.literal("a")),
+    lambda f: f.__delitem__(0),
+    lambda f: f.__iadd__([Token.literal("a")]),
+])
+def test_frozen_is_immutable(mutate):
+    frozen = Formula([Token.literal(i) for i in "a and b".split()], DebugFormalSystem()).freeze()
+    with pytest.raises(FormulaError):
+        mutate(frozen)
+    assert frozen.getTypes() == ["a", "and", "b"]
+
+@pytest.mark.parametrize("clone", [lambda x: pickle.loads(pickle.dumps(x)), copy.copy, copy.deepcopy])
+def test_frozen_copy(clone):
+    frozen = Formula([Token.literal(i) for i in "a and b".split()], DebugFormalSystem()).freeze()
+    cloned = clone(frozen)
+    assert isinstance(cloned, FrozenFormula)
+    assert cloned == frozen
+
+@pytest.mark.parametrize("str_formula", [
+    "( a and b ) imp neg c",
+    "neg neg ( a or neg b )",
+    "( ( neg a ) and ( neg b ) )",
+    "a and b or c",
+])
+def test_view_matches_formula(str_formula):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    view = formula.view()
+    assert view == formula and formula == view
+    assert hash(view) == hash(formula)
+    assert view.precedence() == formula.precedence()
+    assert view.getMainConnective() == formula.getMainConnective()
+    assert view.reduceBrackets().getTypes() == formula.reduceBrackets().getTypes()
+    assert view.removeMainUnary().getTypes() == formula.removeMainUnary().getTypes()
+    connective, parts = view.getComponents()
+    expected_connective, expected_parts = formula.getComponents()
+    assert connective is expected_connective
+    for part, expected in zip(parts, expected_parts):
+        assert (part is None) == (expected is None)
+        if part is not None:
+            assert part.getTypes() == expected.getTypes()
+            assert part.precedence() == expected.precedence()
+
+def test_view_decomposition_shares_buffer():
+    formula = Formula([Token.literal(i) for i in "( ( a and b ) imp neg ( c ) )".split()], DebugFormalSystem())
+    view = formula.view()
+    stack = [view]
+    while stack:
+        part = stack.pop()
+        assert part.buffer is view.buffer
+        _, parts = part.getComponents()
+        stack.extend(i for i in parts if i is not None)
+
+def test_view_materialize():
+    formula = Formula([Token.literal(i) for i in "a and b".split()], DebugFormalSystem())
+    part = formula.view()[2:]
+    copied = part.materialize()
+    copied.append(Token.literal("c"))
+    assert part.getTypes() == ["b"]
+    assert copied.getTypes() == ["b", "c"]
+
+@pytest.mark.parametrize("str_formula, start, stop", [
+    ("( a and b ) imp neg c", 0, 9),
+    ("( a and b ) imp neg c", 0, 5),
+    ("( a and b ) imp neg c", 6, 9),
+    ("( a and b ) imp neg c", 1, 4),
+    ("( a and b ) imp neg c", 2, 7),
+    ("neg neg ( a or neg b )", 2, 9),
+])
+def test_view_read_api_matches_formula(str_formula, start, stop):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    view = formula.view()[start:stop]
+    expected = formula[start:stop]
+    assert view.isLiteral() == expected.isLiteral()
+    assert view.isWrapped() == expected.isWrapped()
+    assert view.brackets() == expected.brackets()
+    assert view.checkSyntax() == expected.checkSyntax()
+    if expected.checkSyntax() is None:
+        assert repr(view.tree()) == repr(expected.tree())
+        assert view.minimal() == expected.minimal()
+    else:
+        with pytest.raises(FormulaError):
+            view.tree()
+    extra = [Token.literal("and"), Token.literal("d")]
+    assert view.combine(extra).getTypes() == expected.combine(extra).getTypes()
+    assert (view * 2).getTypes() == (expected * 2).getTypes()
+    copied = view.copy()
+    assert copied == view and copied is not view
+
+@pytest.mark.parametrize("method, args", [
+    ("__setitem__", (0, Token.literal("d"))),
+    ("__delitem__", (0,)),
+    ("append", (Token.literal("d"),)),
+    ("extend", ([Token.literal("and"), Token.literal("d")],)),
+    ("insert", (0, Token.literal("neg"))),
+    ("pop", ()),
+    ("clear", ()),
+    ("reverse", ()),
+])
+def test_view_copy_on_write(method, args):
+    formula = Formula([Token.literal(i) for i in "( a and b ) or c".split()], DebugFormalSystem())
+    view = formula.view()
+    part = view[1:4]
+    sibling = view[1:4]
+    buffer = part.buffer
+    part.checkSyntax()
+
+    expected = formula[1:4]
+    assert getattr(part, method)(*args) == getattr(expected, method)(*args)
+    assert part.getTypes() == expected.getTypes()
+    assert part.precedence() == expected.precedence()
+    assert part.checkSyntax() == expected.checkSyntax()
+    # Bufor i pozostałe widoki nie widzą zmiany
+    assert part.buffer is not buffer
+    assert buffer.getTypes() == formula.getTypes()
+    assert sibling.getTypes() == ["a", "and", "b"]
+
+def test_view_inplace_operators():
+    formula = Formula([Token.literal(i) for i in "a and b".split()], DebugFormalSystem())
+    view = formula.view()
+    alias = view
+    view += [Token.literal("or"), Token.literal("c")]
+    assert view is alias
+    assert view.getTypes() == ["a", "and", "b", "or", "c"]
+    assert formula.getTypes() == ["a", "and", "b"]
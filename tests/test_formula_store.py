@@ -0,0 +1,38 @@
+from venice_turpentine.core.formula_store import FormulaStore
+from venice_turpentine.core.token import Token
+
+
+def test_intern_shares_instances(to_formula):
+    store = FormulaStore()
+    first = store.intern(to_formula("a and b"))
+    second = store.intern(to_formula("a and b"))
+    other = store.intern(to_formula("a or b"))
+    assert first is second
+    assert first is not other
+    assert len(store) == 2
+
+
+def test_ids_are_stable(to_formula):
+    store = FormulaStore()
+    ids = [store.get_id(to_formula(i)) for i in ("a", "neg a", "a", "neg a")]
+    assert ids == [0, 1, 0, 1]
+    assert store[1].getTypes() == ["neg", "a"]
+    assert store.find_id(to_formula("b")) is None
+    assert to_formula("a") in store
+    assert store.get_ids([to_formula("a"), to_formula("neg a")]) == {0, 1}
+
+
+def test_canonical_copy(to_formula):
+    store = FormulaStore()
+    formula = to_formula("a")
+    canonical = store.intern(formula)
+    formula.append(Token.literal("b"))
+    assert canonical.getTypes() == ["a"]
+
+
+def test_components_are_shared(to_formula):
+    store = FormulaStore()
+    connective, (left, right) = store.components(to_formula("neg a and neg a"))
+    assert connective.type_ == "and"
+    assert left is right is store.intern(to_formula("neg a"))
+    assert store.components(to_formula("( neg a and neg a )"))[1][0] is left
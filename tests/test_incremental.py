@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from venice_turpentine.core.formula import Formula
+from venice_turpentine.exceptions import LexiconError
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+from venice_turpentine.lexers import incremental
+from venice_turpentine.lexers.incremental import IncrementalFormula
+from venice_turpentine.lexers.wrapper import Lexicon
+
+PIECES = ["p", "q", "r1", "s", "~", "&", "|", "->", "(", ")", " ", "  ", "-", ">", "1"]
+# Kawałki na końcu listy są rzadkie - zwykle nie dają się stokenizować, chyba że połączą się z sąsiednimi
+WEIGHTS = [20] * (len(PIECES) - 3) + [1, 1, 1]
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    lex = Lexicon()
+    lex["neg"] = "~"
+    lex["and"] = "&"
+    lex["or"] = r"\|"
+    lex["imp"] = "->"
+    lex["sentvar"] = r"[p-z]\d*"
+    return lex
+
+
+@pytest.fixture(params=[4, 64])
+def block(request, monkeypatch):
+    monkeypatch.setattr(incremental, "BLOCK", request.param)
+    return request.param
+
+
+def expected(lexer, text):
+    try:
+        tokens = lexer.tokenize(text)
+    except LexiconError:
+        return None, "not tokenizable", None
+    formula = Formula(tokens, DebugFormalSystem())
+    mistake = formula.checkSyntax()
+    return tokens, mistake and mistake.name, formula.getMainConnective()
+
+
+def pieces(rng, count):
+    return "".join(rng.choices(PIECES, WEIGHTS, k=count))
+
+
+def check(live, lexer):
+    tokens, mistake, main = expected(lexer, live.text)
+    assert (live.mistake and live.mistake.name) == mistake, live.text
+    if tokens is not None:
+        assert live.tokens() == tokens, live.text
+        assert live.main_connective == main, live.text
+        if live.mistake is not None:
+            assert live.mistake == live.formula().checkSyntax()
+
+
+@pytest.mark.parametrize("backend", ["ply", "re", "longest"])
+def test_random_edits(lexicon, block, backend):
+    lexer = lexicon.compile(backend=backend)
+    rng = random.Random(11)
+    for _ in range(40):
+        live = IncrementalFormula(lexer, DebugFormalSystem(), pieces(rng, rng.randint(0, 30)))
+        check(live, lexer)
+        for _ in range(25):
+            before = live.tokens()
+            if live.mistake is not None and live.mistake.name == "not tokenizable" and rng.random() < 0.7:
+                # Usunięcie nierozpoznanego znaku, jak zrobiłby to użytkownik
+                start = live.mistake.additional["pos"]
+                update = live.edit(start, start + 1, "")
+            else:
+                start = rng.randint(0, len(live.text))
+                stop = rng.randint(start, min(len(live.text), start + 3))
+                update = live.edit(start, stop, pieces(rng, rng.randint(0, 2)))
+            check(live, lexer)
+            assert before[: update.start] + list(update.inserted) + before[update.start + update.removed :] == live.tokens()
+
+
+def test_edit_is_local(lexicon, block):
+    lexer = lexicon.compile(backend="re")
+    text = " & ".join(f"(p{i} -> q{i})" for i in range(200))
+    live = IncrementalFormula(lexer, DebugFormalSystem(), text)
+    assert live.mistake is None
+    position = text.index("p100")
+
+    update = live.edit(position + 1, position + 1, "7")
+    assert update.removed <= 3 and len(update.inserted) <= 3
+    assert [i.lexem for i in update.inserted if i.type_ == "sentvar"] == ["p7100"]
+
+    update = live.edit(position, position, "~ ")
+    assert update.mistake is None
+    update = live.edit(position, position, "& ")
+    assert update.mistake.name == "no left"
+    assert update.main_connective == live.formula().getMainConnective()
+
+
+def test_errors(lexicon):
+    lexer = lexicon.compile(backend="re")
+    live = IncrementalFormula(lexer, DebugFormalSystem())
+    assert live.mistake.name == "no variables"
+    live.edit(0, 0, "p & % q")
+    assert live.mistake.name == "not tokenizable"
+    assert live.mistake.additional == {"pos": 4}
+    live.edit(4, 5, "")
+    assert live.mistake is None
+    assert [i.lexem for i in live.tokens()] == ["p", "&", "q"]
+    with pytest.raises(IndexError):
+        live.edit(3, 100, "")
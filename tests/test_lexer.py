@@ -1,7 +1,17 @@
+from collections import OrderedDict
+from pathlib import Path
+
 import pytest
 
+from venice_turpentine.core.formula import Formula
 from venice_turpentine.core.token import Token
+from venice_turpentine.exceptions import LexiconError, SymbolsExhausted
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
 from venice_turpentine.lexers import BasicLex
+from venice_turpentine.lexers.wrapper import Lexicon
+from venice_turpentine.lexers.wrapper import lexer as lexer_module
+
+CORPUS = Path(__file__).parents[1] / "old_tests" / "tautologies_20_5-1.txt"
 
 
 @pytest.fixture
@@ -61,3 +71,153 @@ def test_full_symbol(lexer, input_text, expected_tokens):
 )
 def test_bracket(lexer, input_text, expected_tokens):
     assert lexer.tokenize(input_text) == tokens_from_list(expected_tokens)
+
+
+@pytest.fixture
+def fresh_compiled(monkeypatch):
+    """Pusta pamięć skompilowanych lekserów, jak w nowym procesie"""
+    compiled = OrderedDict()
+    monkeypatch.setattr(lexer_module, "COMPILED", compiled)
+    return compiled
+
+
+def test_compile_memoised(fresh_compiled):
+    built = BasicLex.compile(use_language=("propositional", "uses negation"))
+    assert BasicLex.compile(use_language=("propositional", "uses negation")) is built
+    assert BasicLex.compile(use_language=("propositional",)) is not built
+    assert len(fresh_compiled) == 2
+
+
+def test_fingerprint():
+    lex = Lexicon()
+    lex["and"] = "and"
+    key = lex.fingerprint({"use_language": ("propositional",)})
+    assert key == lex.fingerprint({"use_language": ["propositional"]})
+    lex["or"] = "or"
+    assert key != lex.fingerprint({"use_language": ("propositional",)})
+
+
+def test_fingerprint_versions(monkeypatch):
+    lex = Lexicon()
+    lex["and"] = "and"
+    ply_key, re_key = lex.fingerprint({}, "ply"), lex.fingerprint({}, "re")
+    monkeypatch.setattr("ply.lex.__version__", "0.0")
+    assert lex.fingerprint({}, "ply") != ply_key
+    assert lex.fingerprint({}, "re") == re_key
+    monkeypatch.setattr(lexer_module, "CACHE_VERSION", lexer_module.CACHE_VERSION + 1)
+    assert lex.fingerprint({}, "re") != re_key
+
+
+def test_stale_cache_format_ignored(fresh_compiled, monkeypatch, cache_dir):
+    constraints = {"use_language": ("propositional",)}
+    version = lexer_module.CACHE_VERSION
+    monkeypatch.setattr(lexer_module, "CACHE_VERSION", version - 1)
+    BasicLex.compile(**constraints)
+    # Zapis w starszym formacie, którego nie da się odtworzyć
+    for path in cache_dir.glob("lexer_*.json"):
+        path.write_text('{"backend": "ply", "table": {}}')
+    fresh_compiled.clear()
+    monkeypatch.setattr(lexer_module, "CACHE_VERSION", version)
+
+    def fail(data):
+        raise AssertionError("lexer written in an older format was read")
+
+    monkeypatch.setattr(lexer_module.BuiltLexer, "restore", fail)
+    assert BasicLex.compile(**constraints).tokenize("p and q") == tokens_from_list(["sentvar_p", "and_and", "sentvar_q"])
+
+
+def test_compile_from_disk(fresh_compiled, monkeypatch, cache_dir):
+    constraints = {"use_language": ("propositional", "uses negation")}
+    built = BasicLex.compile(**constraints)
+    assert list(cache_dir.glob("lexer_*.json"))
+
+    fresh_compiled.clear()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ply.lex.lex called for a cached lexer")
+
+    monkeypatch.setattr("ply.lex.lex", fail)
+    restored = BasicLex.compile(**constraints)
+    assert restored is not built
+    for text in ("(p v q) -> ~r", "p oraz q lub not s", "p & (q | r)"):
+        assert restored.tokenize(text) == built.tokenize(text)
+    assert restored.generator_regexes == built.generator_regexes
+    with pytest.raises(LexiconError):
+        restored.tokenize("p % q")
+
+
+def test_write_json_concurrent(cache_dir):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from venice_turpentine.cache import read_json, write_json
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: write_json("shared.json", {"writer": i}), range(64)))
+    assert read_json("shared.json")["writer"] in range(64)
+    assert [i.name for i in cache_dir.iterdir()] == ["shared.json"]
+
+
+def test_corrupted_cache(fresh_compiled, cache_dir):
+    constraints = {"use_language": ("propositional",)}
+    BasicLex.compile(**constraints)
+    fresh_compiled.clear()
+    for path in cache_dir.glob("lexer_*.json"):
+        path.write_text('{"version": "3.10", "table": []}')
+    assert BasicLex.compile(**constraints).tokenize("p and q") == tokens_from_list(["sentvar_p", "and_and", "sentvar_q"])
+
+
+@pytest.mark.parametrize("backend", ["ply", "re", "longest"])
+def test_tokenize_many(backend):
+    lexer = BasicLex.compile(backend=backend, use_language=("propositional", "uses negation"))
+    with open(CORPUS, encoding="utf-8") as file:
+        lines = file.read().splitlines()[:200] + ["  p  and\tq "]
+    results = list(lexer.tokenize_many(iter(lines)))
+    assert [i for i, _ in results] == list(range(len(lines)))
+    for (_, tokens), line in zip(results, lines):
+        assert tokens == tuple(lexer.tokenize(line))
+
+
+@pytest.mark.parametrize("backend", ["ply", "re", "longest"])
+def test_tokenize_many_errors(backend):
+    lexer = BasicLex.compile(backend=backend, use_language=("propositional", "uses negation"))
+    results = dict(lexer.tokenize_many(["p and q", "p % q", "", "~p"]))
+    assert results[0] == tuple(tokens_from_list(["sentvar_p", "and_and", "sentvar_q"]))
+    assert isinstance(results[1], LexiconError)
+    with pytest.raises(LexiconError) as error:
+        lexer.tokenize("p % q")
+    assert str(results[1]) == str(error.value)
+    assert results[2] == ()
+    assert results[3] == tuple(lexer.tokenize("~ p"))
+
+
+def test_generate_fresh(lexer):
+    formula = Formula(lexer.tokenize("a and ( b or d )"), DebugFormalSystem())
+    assert lexer.generate(formula, "sentvar") == Token("sentvar", "c")
+    assert lexer.generate(formula, "and") == Token("and", "and")
+
+
+def test_fresh_symbols_batch(lexer):
+    fresh = lexer.fresh_symbols(["a", "c"])
+    assert [i.lexem for i in fresh.take_many("sentvar", 3)] == ["b", "d", "e"]
+    assert fresh.take("sentvar").lexem == "f"
+    fresh.use(["g", "h"])
+    assert fresh.take("sentvar").lexem == "i"
+    # Wyliczenie leksemów jest współdzielone przez przydziały leksera
+    other = lexer.fresh_symbols()
+    assert other.take("sentvar").lexem == "a"
+    assert other._enumerations is fresh._enumerations
+    assert len(lexer._enumerations["sentvar"].items) >= 9
+
+
+def test_fresh_symbols_exhausted(lexer):
+    fresh = lexer.fresh_symbols("abcdefghijklmnopqrstuvw")
+    assert not fresh.isExhausted("sentvar")
+    with pytest.raises(SymbolsExhausted):
+        fresh.take_many("sentvar", 4)
+    # Nieudany przydział niczego nie zajmuje
+    assert [i.lexem for i in fresh.take_many("sentvar", 3)] == ["x", "y", "z"]
+    assert fresh.isExhausted("sentvar")
+    with pytest.raises(LexiconError):
+        fresh.take("sentvar")
+    with pytest.raises(LexiconError):
+        fresh.take("and")
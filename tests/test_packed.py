@@ -0,0 +1,61 @@
+import pytest
+
+from venice_turpentine.core.formula import Formula
+from venice_turpentine.core.packed import PackedFormula
+from venice_turpentine.core.symbols import SymbolTable
+from venice_turpentine.core.token import Token
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+from venice_turpentine.lexers import BasicLex
+
+FORMULAS = [
+    "a and b or c",
+    "a and neg c",
+    "( a ) and ( b )",
+    "( a and b ) imp neg c",
+    "a and neg ( neg b )",
+    "neg neg ( a or neg b )",
+    "a",
+]
+
+
+def packed_and_formula(str_formula, symbols):
+    formula = Formula([Token.literal(i) for i in str_formula.split()], DebugFormalSystem())
+    return PackedFormula.from_formula(formula, symbols), formula
+
+
+@pytest.mark.parametrize("str_formula", FORMULAS)
+def test_matches_formula(str_formula):
+    packed, formula = packed_and_formula(str_formula, SymbolTable())
+    assert packed.getTypes() == formula.getTypes()
+    assert packed.getLexems() == formula.getLexems()
+    assert packed.getItems() == formula.getItems()
+    assert packed.getUnique() == formula.getUnique()
+    assert packed.precedence() == formula.precedence()
+    assert packed.getMainConnective() == formula.getMainConnective()
+    assert packed.unpack() == formula
+    assert str(packed) == str(formula)
+
+
+def test_roundtrip_interned_tokens():
+    packed, formula = packed_and_formula("( a and b )", SymbolTable())
+    assert all(i is j for i, j in zip(packed, formula))
+    assert packed[0] is Token.LEFT_BRACKET()
+
+
+def test_equality_and_hash():
+    symbols = SymbolTable()
+    first, _ = packed_and_formula("a and b", symbols)
+    second, _ = packed_and_formula("a and b", symbols)
+    other, _ = packed_and_formula("a or b", symbols)
+    foreign, _ = packed_and_formula("a and b", SymbolTable())
+    assert first == second == foreign
+    assert first != other
+    assert hash(first) == hash(second) == hash(foreign)
+
+
+def test_lexer_symbols():
+    lexer = BasicLex.compile(use_language=("propositional", "uses negation"))
+    packed = lexer.tokenize_packed("(p and q) or r", DebugFormalSystem())
+    assert packed.symbols is lexer.symbols
+    assert list(packed) == lexer.tokenize("(p and q) or r")
+    assert packed.nbytes == 2 * 2 * len(packed)
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from venice_turpentine.core.parser import check_syntax, parse
+
+
+@pytest.mark.parametrize("str_formula", [
+    "a and b or c",
+    "neg neg ( neg b )",
+    "( ( a and b ) ) imp c",
+    "neg unary ( unary a or neg b )",
+    "a",
+])
+def test_valid(str_formula, to_formula):
+    formula = to_formula(str_formula)
+    result = parse(formula)
+    assert result.mistake is None
+    assert result.precedence == to_formula(str_formula).precedence()
+    assert result.tree.connective == formula.getMainConnective()
+
+
+@pytest.mark.parametrize("str_formula, name, pos", [
+    ("", "no variables", None),
+    ("( and )", "no variables", None),
+    ("a ( b )", "nothing between formulas", 1),
+    ("a neg b", "nothing between formulas", 1),
+    ("( a ) b", "nothing between formulas", 3),
+    ("( a and b", "bracket left open", 0),
+    ("a ) and ( b", "bracket left open", 3),
+    ("a and b )", "bracket not opened", 3),
+    ("a b and c", "nothing between formulas", 1),
+    ("p q", "nothing between formulas", 1),
+    ("a and ( )", "bracket left open", 2),
+    ("a and", "no right", 1),
+    ("( a or ) and b", "no right", 2),
+    ("neg", "no variables", None),
+    ("neg ( neg ) and a", "no right", 2),
+    ("and a", "no left", 0),
+    ("a and ( or b )", "no left", 3),
+])
+def test_mistakes(str_formula, name, pos, to_formula):
+    formula = to_formula(str_formula)
+    mistake = check_syntax(formula)
+    assert mistake is not None
+    assert mistake.name == name
+    if pos is not None:
+        assert mistake.additional == {"pos": pos}
+    assert parse(formula).tree is None
+
+
+def test_precedence_of_malformed(to_formula):
+    formula = to_formula("( a and ( b or")
+    assert parse(formula).precedence == to_formula("( a and ( b or").precedence()
+
+
+def test_formula_check_syntax_bakes(to_formula):
+    formula = to_formula("a and ( b or c )")
+    assert formula.checkSyntax() is None
+    assert formula.precedenceBaked is not None
+    assert formula.treeBaked is not None
+    assert to_formula("a and").checkSyntax().name == "no right"
+
+
+def test_formula_check_syntax_caches_mistake(to_formula, monkeypatch):
+    from venice_turpentine.core import formula as formula_module
+
+    calls = []
+    monkeypatch.setattr(formula_module, "parse", lambda f: calls.append(f) or parse(f))
+    formula = to_formula("a and")
+    assert formula.checkSyntax().name == "no right"
+    assert formula.checkSyntax().name == "no right"
+    assert formula.removeMainUnary().getTypes() == ["a", "and"]
+    assert len(calls) == 1
+    formula.append(formula[0])
+    assert formula.checkSyntax() is None
+    assert len(calls) == 2
+
+
+def test_deep_nesting(to_formula):
+    depth = 20_000
+    formula = to_formula("( " * depth + "a" + " )" * depth + " and " + "neg " * depth + "b")
+    result = parse(formula)
+    assert result.mistake is None
+    assert formula[result.tree.connective].type_ == "and"
+
+
+def test_random_agrees_with_main_connective(to_formula):
+    rng = random.Random(11)
+    parts = ["a", "b", "and", "or", "imp", "neg", "(", ")"]
+    for _ in range(500):
+        formula = to_formula(" ".join(rng.choices(parts, k=rng.randint(1, 9))))
+        result = parse(formula)
+        if result.mistake is None:
+            assert result.tree.connective == formula.getMainConnective()
@@ -0,0 +1,130 @@
+import os
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from venice_turpentine import plugins
+from venice_turpentine.exceptions import FormalError, PluginError
+from venice_turpentine.formal_systems import get_formal_system, register_formal_system
+from venice_turpentine.formal_systems.debug import DebugFormalSystem
+from venice_turpentine.plugins import PluginRegistry, verify_output_writer
+
+WRITER = """
+def write_tree(tree):
+    return [str(tree)]
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_verified(monkeypatch):
+    monkeypatch.setattr(plugins, "VERIFIED", plugins._VerifiedCache())
+
+
+@pytest.fixture
+def plugin_module(tmp_path, monkeypatch):
+    """Tworzy moduł wtyczki, którego jeszcze nie zaimportowano"""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    created = []
+
+    def make(name, source=WRITER):
+        (tmp_path / f"{name}.py").write_text(source)
+        created.append(name)
+        return tmp_path / f"{name}.py"
+
+    yield make
+    for name in created:
+        sys.modules.pop(name, None)
+
+
+def counting_registry(group="test.writers", **kwargs):
+    calls = []
+
+    def verify(obj):
+        calls.append(obj)
+        verify_output_writer(obj)
+
+    return PluginRegistry(group, verify, **kwargs), calls
+
+
+def test_lazy_import(plugin_module, monkeypatch):
+    plugin_module("lazy_writer")
+    monkeypatch.setattr(plugins, "entry_points", lambda group: [EntryPoint("lazy", "lazy_writer", group)])
+    registry, _ = counting_registry()
+    assert registry.names() == ["lazy"]
+    assert "lazy_writer" not in sys.modules
+    assert registry.get("lazy").write_tree("x") == ["x"]
+    assert "lazy_writer" in sys.modules
+
+
+def test_verification_cached_by_mtime(plugin_module):
+    path = plugin_module("cached_writer")
+    registry, calls = counting_registry(builtin={"cached": "cached_writer"})
+    registry.get("cached")
+    assert len(calls) == 1
+
+    # Nowy proces: pamięć podręczna odczytana z dysku
+    plugins.VERIFIED = plugins._VerifiedCache()
+    registry, calls = counting_registry(builtin={"cached": "cached_writer"})
+    registry.get("cached")
+    assert calls == []
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    registry, calls = counting_registry(builtin={"cached": "cached_writer"})
+    registry.get("cached")
+    assert len(calls) == 1
+
+
+def test_lru(plugin_module):
+    for i in range(3):
+        plugin_module(f"lru_writer_{i}")
+    created = []
+    registry, _ = counting_registry(
+        builtin={str(i): f"lru_writer_{i}" for i in range(3)},
+        create=lambda module: created.append(module) or module,
+        maxsize=2,
+    )
+    for name in ("0", "1", "0", "2", "0", "1"):
+        registry.get(name)
+    assert [i.__name__ for i in created] == ["lru_writer_0", "lru_writer_1", "lru_writer_2", "lru_writer_1"]
+
+
+def test_formal_systems_are_not_evicted(monkeypatch):
+    registry = plugins.formal_systems
+    system = registry.get("debug")
+    monkeypatch.setattr(registry, "_targets", dict(registry._discover()))
+    monkeypatch.setattr(registry, "_loaded", registry._loaded.copy())
+    for i in range(32):
+        registry.register(f"pinned_{i}", DebugFormalSystem)
+        registry.get(f"pinned_{i}")
+    assert get_formal_system("debug") is system
+
+
+def test_errors(plugin_module):
+    plugin_module("bad_writer", "def write_tree(tree, reader): pass\n")
+    registry, _ = counting_registry(builtin={"bad": "bad_writer", "missing": "no_such_module_here"})
+    with pytest.raises(PluginError):
+        registry.get("bad")
+    with pytest.raises(PluginError):
+        registry.get("missing")
+    with pytest.raises(PluginError):
+        registry.get("unknown")
+    with pytest.raises(PluginError):
+        registry.register("object", object())
+
+
+def test_formal_systems():
+    system = get_formal_system("debug")
+    assert isinstance(system, DebugFormalSystem)
+    assert get_formal_system("debug") is system
+    with pytest.raises(FormalError):
+        get_formal_system("unknown")
+    with pytest.raises(FormalError):
+        register_formal_system("broken", int)
+
+
+def test_lexicons():
+    from venice_turpentine.lexers import BasicLex
+
+    assert plugins.lexicons.get("basic") is BasicLex
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from venice_turpentine.core.formula import Formula, FrozenFormula
+from venice_turpentine.core.parser import parse
+from venice_turpentine.formal_systems import FormalSystem
+
+
+class WeakUnarySystem(FormalSystem):
+    """Spójnik jednoargumentowy wiąże słabiej od części dwuargumentowych"""
+
+    @property
+    def operator_precedence(self) -> dict[str, int]:
+        return {"neg": 2, "imp": 1, "and": 2, "or": 3}
+
+    @property
+    def unary_operators(self) -> list[str]:
+        return ["neg"]
+
+
+def structure(node):
+    """Struktura drzewa niezależna od zapisu nawiasów"""
+    stack, result = [node], []
+    while stack:
+        node = stack.pop()
+        if node.isAtom():
+            result.append(tuple(i.lexem for i in node.toFormula()))
+        else:
+            result.append(node.token.type_)
+            stack.extend(node.children)
+    return result
+
+
+def random_formula(rng, atoms, unary, binary, size):
+    parts = [rng.choice(atoms)]
+    for _ in range(size):
+        if rng.random() < 0.3:
+            parts = [rng.choice(unary)] + (["("] + parts + [")"] if rng.random() < 0.5 else parts)
+        else:
+            right = [rng.choice(atoms)]
+            parts = ["("] + parts + [")", rng.choice(binary)] + right
+            if rng.random() < 0.5:
+                parts = ["("] + parts + [")"]
+    return " ".join(parts)
+
+
+@pytest.mark.parametrize("str_formula, expected", [
+    ("a", "a"),
+    ("( ( a ) )", "a"),
+    ("( a and b ) or c", "a and b or c"),
+    ("a and ( b or c )", "a and ( b or c )"),
+    ("( a imp b ) imp c", "a imp b imp c"),
+    ("a imp ( b imp c )", "a imp ( b imp c )"),
+    ("( neg a ) and ( neg ( b ) )", "neg a and neg b"),
+    ("neg ( neg ( a and b ) )", "neg neg ( a and b )"),
+    ("( a ) and ( ( b ) imp c )", "a and ( b imp c )"),
+])
+def test_minimal(str_formula, expected, to_formula):
+    assert to_formula(str_formula).minimal().getTypes() == expected.split()
+
+
+@pytest.mark.parametrize("str_formula, expected", [
+    ("( neg a ) or b", "( neg a ) or b"),
+    ("a or ( neg b )", "a or neg b"),
+    ("( a or neg b ) or c", "( a or neg b ) or c"),
+    ("neg ( a or b )", "neg a or b"),
+    ("neg ( a and b )", "neg ( a and b )"),
+    ("( neg a ) imp b", "neg a imp b"),
+])
+def test_minimal_weak_unary(str_formula, expected, to_formula):
+    assert to_formula(str_formula, WeakUnarySystem()).minimal().getTypes() == expected.split()
+
+
+@pytest.mark.parametrize("formal_system", [None, WeakUnarySystem()])
+def test_random_roundtrip(formal_system, to_formula):
+    """Zapis minimalny zachowuje strukturę zdania, a usunięcie dowolnej pary nawiasów ją zmienia"""
+    rng = random.Random(5)
+    for _ in range(300):
+        formula = to_formula(random_formula(rng, ["a", "b"], ["neg"], ["and", "or", "imp"], rng.randint(0, 6)), formal_system)
+        printed = formula.minimal()
+        assert isinstance(printed, FrozenFormula)
+        assert structure(parse(printed).tree) == structure(formula.tree())
+        for i in range(len(printed)):
+            if printed[i].type_ == "(":
+                j = printed.matchingBracket(i)
+                reduced = Formula(printed[:i] + printed[i + 1 : j] + printed[j + 1 :], printed.formal_system)
+                tree = parse(reduced).tree
+                assert tree is None or structure(tree) != structure(formula.tree())
+
+
+def test_cached(to_formula):
+    formula = to_formula("( a and b ) or ( neg ( c ) )")
+    assert formula.minimal() is formula.minimal()
+    _, (left, right) = formula.componentsView()
+    assert left.minimal() is formula.tree().left.minimal()
+    assert right.minimal().getTypes() == ["neg", "c"]
+
+
+def test_view(to_formula):
+    view = to_formula("a or ( ( b and c ) imp d )").view()
+    assert view.minimal().getTypes() == "a or ( b and c imp d )".split()
+    assert view[3:10].minimal().getTypes() == "b and c imp d".split()
+
+
+def test_deep(to_formula):
+    depth = 20_000
+    formula = to_formula("neg ( " * depth + "a" + " )" * depth)
+    assert formula.minimal().getTypes() == ["neg"] * depth + ["a"]
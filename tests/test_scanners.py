@@ -0,0 +1,121 @@
+import os
+import random
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from venice_turpentine.core.token import Token
+from venice_turpentine.exceptions import LexiconError
+from venice_turpentine.lexers import BasicLex
+from venice_turpentine.lexers.wrapper import Lexicon
+from venice_turpentine.lexers.wrapper import lexer as lexer_module
+from venice_turpentine.lexers.wrapper.patterns import literal, regex_from_list
+from venice_turpentine.lexers.wrapper.scanners import LongestMatchScanner, RegexScanner, rule_order
+
+CONSTRAINTS = [
+    {"use_language": ("propositional", "uses negation")},
+    {"use_language": ("propositional",), "no_generation": ("",)},
+    {"use_language": ("signed", "propositional")},
+    {"use_language": ("signed", "propositional", "sequent calculus")},
+]
+PIECES = [
+    "p", "q", "x", "P", "Q", "a", "7", "pq", "not", "~", "!", "and", "oraz", "^", "&", "or", "lub", "v", "|",
+    "imp", "->", "-", ">", "T", "F", "=>", "|-", ";", "bot",
+    "(", ")", " ", "  ", "\t", "%", "$",
+]
+
+
+def run(lexer, text):
+    try:
+        return lexer.tokenize(text)
+    except LexiconError as error:
+        return str(error)
+
+
+@pytest.mark.parametrize("constraints", CONSTRAINTS)
+def test_matches_ply(constraints):
+    ply_lexer = BasicLex.compile(backend="ply", **constraints)
+    re_lexer = BasicLex.compile(backend="re", **constraints)
+    longest_lexer = BasicLex.compile(backend="longest", **constraints)
+    assert re_lexer is not ply_lexer
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = "".join(rng.choices(PIECES, k=rng.randint(0, 12)))
+        expected = run(ply_lexer, text)
+        assert run(re_lexer, text) == expected, text
+        assert run(longest_lexer, text) == expected, text
+
+
+def test_rule_order():
+    regexes = {"b": "xy", "a": "zw", "c": "xyz"}
+    assert [i for i, _ in rule_order(regexes)] == ["c", "a", "b"]
+
+
+def test_empty_match():
+    with pytest.raises(LexiconError):
+        RegexScanner({"bad": [r"a*"]}, {"(", ")"})
+    with pytest.raises(LexiconError):
+        LongestMatchScanner({"bad": ["b", r"a*"]}, {"(", ")"})
+
+
+def test_unknown_backend():
+    lex = Lexicon()
+    lex["and"] = "and"
+    with pytest.raises(LexiconError):
+        lex.compile(backend="lalr")
+
+
+def test_no_ply_import(cache_dir):
+    """Silnik "re" nie importuje ply"""
+    code = (
+        "import sys\n"
+        "from venice_turpentine.lexers import BasicLex\n"
+        "BasicLex.compile(backend='re', use_language=('propositional',)).tokenize('p and q')\n"
+        "print('ply' in sys.modules)\n"
+    )
+    src = Path(__file__).parents[1] / "src"
+    env = {**os.environ, "PYTHONPATH": str(src), "VENICE_TURPENTINE_CACHE": str(cache_dir)}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == "False"
+
+
+LEXEMS = ["a", "ab", "abc", "b", "->", r"\-", "-", r"\^", "^x", r"[a-c]", r"\w+", r"\d", "ba", "x y"]
+
+
+def test_regex_from_list_matches_alternation():
+    """Wyrażenie bez grup przechwytujących dopasowuje to samo co alternatywa leksemów w grupach"""
+    rng = random.Random(3)
+    for _ in range(300):
+        lexems = sorted(rng.sample(LEXEMS, rng.randint(1, len(LEXEMS))), reverse=rng.random() < 0.8)
+        legacy = re.compile("|".join(f"({i})" for i in lexems), re.VERBOSE)
+        compiled = re.compile(regex_from_list(lexems), re.VERBOSE)
+        assert compiled.groups == 0
+        for _ in range(20):
+            text = "".join(rng.choices("abcx-^>9 ", k=rng.randint(1, 5)))
+            expected = legacy.match(text)
+            found = compiled.match(text)
+            assert (found and found.group()) == (expected and expected.group()), (lexems, text)
+
+
+def test_literal():
+    assert literal(r"\^") == "^"
+    assert literal("imp") == "imp"
+    assert literal(r"\w+") is None
+    assert literal(r"[a-z]") is None
+    assert literal("a b") is None
+
+
+def test_large_vocabulary(monkeypatch):
+    monkeypatch.setattr(lexer_module, "LARGE_VOCABULARY", 50)
+    lex = Lexicon()
+    lex["and"] = "and", "&"
+    lex["predicate"] = [f"p{i}x" for i in range(100)] + [f"p{i}" for i in range(100)]
+    lexers = [lex.compile(), lex.compile(backend="ply"), lex.compile(backend="re")]
+    assert lexers[0].backend == "longest"
+    text = " & ".join(f"p{i}x & p{i}" for i in range(100))
+    expected = lexers[1].tokenize(text)
+    assert expected[:3] == [Token("predicate", "p0x"), Token("and", "&"), Token("predicate", "p0")]
+    assert all(i.tokenize(text) == expected for i in lexers)
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from venice_turpentine.core.formula import FormulaView
+from venice_turpentine.core.token import Token
+from venice_turpentine.exceptions import FormulaError
+
+
+def types_or_none(formula):
+    return None if formula is None else formula.getTypes()
+
+
+def scan_components(formula):
+    """Rozkład zdania wyznaczony przeglądaniem tokenów, bez drzewa składniowego"""
+    sentence = formula.reduceBrackets()
+    index = sentence.getMainConnective()
+    if index is None:
+        return None, (None, None)
+    return sentence[index], sentence.splitByIndex(index)
+
+
+def assert_same_decomposition(node, formula):
+    """Porównuje rozkład drzewa z rozkładem wyznaczonym przez przeglądanie tokenów"""
+    connective, (left, right) = scan_components(formula)
+    tree_connective, (tree_left, tree_right) = node.getComponents()
+    assert tree_connective is connective
+    assert types_or_none(tree_left) == types_or_none(left)
+    assert types_or_none(tree_right) == types_or_none(right)
+    if node.left is not None:
+        assert_same_decomposition(node.left, left)
+    if node.right is not None:
+        assert_same_decomposition(node.right, right)
+
+
+@pytest.mark.parametrize("str_formula", [
+    "a and b or c",
+    "a and neg c",
+    "( a ) and ( b )",
+    "a and b imp c",
+    "neg neg c",
+    "neg neg ( neg b )",
+    "neg neg ( a ) or neg b",
+    "neg a or neg b",
+    "neg ( a or b )",
+    "a",
+    "a and b imp c and d",
+    "( ( a and b ) )",
+    "neg unary ( unary a or neg b )",
+])
+def test_matches_getComponents(str_formula, to_formula):
+    formula = to_formula(str_formula)
+    assert_same_decomposition(formula.tree(), formula)
+
+
+def random_formula(rng, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice("abc")
+    kind = rng.choice(["neg", "unary", "and", "or", "imp", "()"])
+    if kind in ("neg", "unary"):
+        return f"{kind} {random_formula(rng, depth - 1)}"
+    if kind == "()":
+        return f"( {random_formula(rng, depth - 1)} )"
+    return f"{random_formula(rng, depth - 1)} {kind} {random_formula(rng, depth - 1)}"
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_getComponents_random(seed, to_formula):
+    formula = to_formula(random_formula(random.Random(seed), 6))
+    assert_same_decomposition(formula.tree(), formula)
+
+
+def test_spans(to_formula):
+    formula = to_formula("( a and b ) imp neg c")
+    root = formula.tree()
+    assert root.token.type_ == "imp"
+    assert (root.start, root.stop, root.size) == (0, 8, 8)
+    assert (root.left.start, root.left.stop) == (1, 4)
+    assert root.right.children[0].isAtom()
+    assert formula.tree() is root
+
+
+def test_tree_survives_mutation(to_formula):
+    formula = to_formula("a and b")
+    root = formula.tree()
+    formula[0] = Token.literal("c")
+    assert repr(root) == "AND(Atom[a], Atom[b])"
+    assert repr(formula.tree()) == "AND(Atom[c], Atom[b])"
+
+
+def test_getComponents_from_tree(to_formula):
+    formula = to_formula("neg ( a and ( b or c ) ) imp d")
+    formula.tree()
+    connective, (left, right) = formula.componentsView()
+    assert connective.type_ == "imp"
+    assert isinstance(left, FormulaView) and isinstance(right, FormulaView)
+    # Dalszy rozkład widoków korzysta z węzłów drzewa
+    connective, (_, inner) = left.getComponents()
+    assert connective.type_ == "neg"
+    assert inner.getTypes() == ["a", "and", "(", "b", "or", "c", ")"]
+    connective, (a, b_or_c) = inner.getComponents()
+    assert connective.type_ == "and"
+    assert b_or_c.getTypes() == ["b", "or", "c"]
+    assert b_or_c.buffer is left.buffer
+
+
+@pytest.mark.parametrize("str_formula", [
+    "a and",
+    "and a",
+    "( a",
+    "a )",
+    "a ( b )",
+    "a neg b",
+    "( )",
+    "",
+])
+def test_malformed(str_formula, to_formula):
+    with pytest.raises(FormulaError):
+        to_formula(str_formula).tree()
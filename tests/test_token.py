@@ -0,0 +1,45 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from venice_turpentine.core.token import LEFT_BRACKET, RIGHT_BRACKET, Token
+from venice_turpentine.lexers import BasicLex
+
+
+def test_interned():
+    assert Token("sentvar", "p") is Token("sentvar", "p")
+    assert Token("sentvar", "p") is not Token("sentvar", "q")
+    assert Token("(", "(") is not Token.literal("(")
+
+
+def test_brackets():
+    assert Token.LEFT_BRACKET() is LEFT_BRACKET is Token.literal("(")
+    assert Token.RIGHT_BRACKET() is RIGHT_BRACKET is Token.literal(")")
+
+
+def test_slots():
+    assert not hasattr(Token("sentvar", "p"), "__dict__")
+
+
+def test_frozen():
+    token = Token("sentvar", "p")
+    with pytest.raises(FrozenInstanceError):
+        token.lexem = "q"
+
+
+@pytest.mark.parametrize(
+    "clone", [lambda x: pickle.loads(pickle.dumps(x)), copy.copy, copy.deepcopy]
+)
+def test_copy_keeps_identity(clone):
+    token = Token("sentvar", "p")
+    assert clone(token) is token
+
+
+def test_lexer_returns_interned():
+    lexer = BasicLex.compile(use_language=("propositional", "uses negation"))
+    first = lexer.tokenize("(p or q)")
+    second = lexer.tokenize("(p or q)")
+    assert all(i is j for i, j in zip(first, second))
+    assert first[0] is LEFT_BRACKET